@@ -0,0 +1,107 @@
+"""
+Write Coalescing Benchmark
+
+Compares throughput and per-call latency of single-row creates with one commit
+per row against the same load through `WriteCoalescer` group commits.
+
+Usage:
+    PYTHONPATH=src python benchmarks/coalescing.py [--threads 32] [--rows 50] [--window-ms 2] [--max-rows 64]
+
+Environment Variables:
+    DATABASE_URL - Database to benchmark against (default: a temporary SQLite file).
+                   Use PostgreSQL for meaningful numbers; the table is dropped afterwards.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, UTC
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from framework.db import Base
+from framework.coalescing import WriteCoalescer
+from models.${{values.app_name}} import ${{values.app_name_capitalized}}
+
+TABLE = ${{values.app_name_capitalized}}.__table__
+
+
+def make_row():
+    name = uuid.uuid4().hex[:20]
+    now = datetime.now(UTC)
+    return {"username": name, "email": f"{name}@example.com", "create_date": now, "update_date": now}
+
+
+def run(label, threads, rows_per_thread, create):
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        local = []
+        barrier.wait()
+        for _ in range(rows_per_thread):
+            start = time.perf_counter()
+            create(make_row())
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<12} {len(latencies) / elapsed:>10.0f} rows/s   "
+          f"p50 {statistics.median(latencies) * 1000:>7.2f} ms   p99 {p99 * 1000:>7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=50, help="rows per thread")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-rows", type=int, default=64)
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/coalescing.db"
+        engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 30})
+    else:
+        engine = create_engine(database_url, pool_size=args.threads, max_overflow=0)
+
+    Base.metadata.create_all(bind=engine, tables=[TABLE])
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def create_direct(row):
+        with SessionLocal() as session:
+            session.execute(insert(TABLE).returning(*TABLE.c), row).one()
+            session.commit()
+
+    coalescer = WriteCoalescer(TABLE, SessionLocal, window_ms=args.window_ms, max_rows=args.max_rows)
+
+    try:
+        print(f"{args.threads} threads x {args.rows} rows against {engine.dialect.name}")
+        run("direct", args.threads, args.rows, create_direct)
+        run("coalesced", args.threads, args.rows, coalescer.submit)
+        stats = coalescer.stats
+        print(f"coalesced batches: {stats['batches']}, avg batch {stats['rows'] / max(stats['batches'], 1):.1f}, "
+              f"max batch {stats['max_batch']}")
+    finally:
+        Base.metadata.drop_all(bind=engine, tables=[TABLE])
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Hot-Path Statement Benchmark
+
+Compares the per-request cost of the CRUD read/write paths built as ORM queries on
+every call (the previous handler code) against the module-level cached Core
+statements in `api/${{values.app_name}}.py`. Reports CPU time per operation, which
+is what the application server pays regardless of database latency.
+
+Usage:
+    PYTHONPATH=src python benchmarks/statement_cache.py [--rows 1000] [--iterations 5000]
+
+Environment Variables:
+    DATABASE_URL - Database to benchmark against (default: a temporary SQLite file).
+                   Use e.g. postgresql+psycopg://... to include server-side prepared
+                   statements; the table is dropped afterwards.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, UTC
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("TESTING", "true")
+
+from framework.db import Base
+from models.${{values.app_name}} import ${{values.app_name_capitalized}}
+from api.${{values.app_name}} import SELECT_BY_ID, SELECT_PAGE, UPDATE_BY_ID, serialize_sqlalchemy_obj
+
+TABLE = ${{values.app_name_capitalized}}.__table__
+
+
+def measure(label, iterations, operation):
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    print(f"{label:<24} {cpu / iterations * 1e6:>8.1f} us CPU/op   {wall / iterations * 1e6:>8.1f} us wall/op")
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/statements.db"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine, tables=[TABLE])
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    now = datetime.now(UTC)
+    with SessionLocal() as session:
+        names = [uuid.uuid4().hex[:20] for _ in range(args.rows)]
+        ids = session.execute(insert(TABLE).returning(TABLE.c.id), [
+            {"username": n, "email": f"{n}@example.com", "create_date": now, "update_date": now}
+            for n in names
+        ]).scalars().all()
+        session.commit()
+
+    Model = ${{values.app_name_capitalized}}
+    session = SessionLocal()
+
+    def orm_get():
+        record = session.query(Model).filter(Model.id == random.choice(ids)).first()
+        serialize_sqlalchemy_obj(record)
+        session.expunge_all()
+
+    def core_get():
+        dict(session.execute(SELECT_BY_ID, {"id": random.choice(ids)}).first()._mapping)
+
+    def orm_list():
+        records = session.query(Model).offset(random.randrange(args.rows - 10)).limit(10).all()
+        [serialize_sqlalchemy_obj(r) for r in records]
+        session.expunge_all()
+
+    def core_list():
+        rows = session.execute(SELECT_PAGE, {"offset": random.randrange(args.rows - 10), "limit": 10})
+        [dict(r._mapping) for r in rows]
+
+    def orm_update():
+        record = session.query(Model).filter(Model.id == random.choice(ids)).first()
+        record.email = f"{uuid.uuid4().hex[:8]}@example.com"
+        record.version += 1
+        session.flush()
+        serialize_sqlalchemy_obj(record)
+        session.expunge_all()
+
+    def core_update():
+        session.execute(UPDATE_BY_ID, {
+            "email": f"{uuid.uuid4().hex[:8]}@example.com",
+            "update_date": now,
+            "match_id": random.choice(ids),
+        }).first()
+
+    try:
+        print(f"{args.iterations} iterations against {engine.dialect.name} ({engine.driver})")
+        for name, orm_op, core_op in (
+            ("get by id", orm_get, core_get),
+            ("list page", orm_list, core_list),
+            ("update", orm_update, core_update),
+        ):
+            orm_op(), core_op()  # warm up caches
+            orm_cpu = measure(f"{name} (ORM query)", args.iterations, orm_op)
+            core_cpu = measure(f"{name} (cached Core)", args.iterations, core_op)
+            print(f"{'':<24} {(1 - core_cpu / orm_cpu) * 100:>7.1f}% CPU saved")
+        session.rollback()
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine, tables=[TABLE])
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from typing import Literal, Optional
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Header, Request, Response
+from sqlalchemy import bindparam, delete, select, update
 from sqlalchemy.orm import Session
-from framework.db import get_db
-from models.${{values.app_name}} import ${{values.app_name_capitalized}}, ${{values.app_name_capitalized}}Create
+from framework.db import get_db, get_lazy_db, get_read_db, pin_to_primary
+from framework.counting import exact_count, estimate_count, invalidate_count
+from framework.coalescing import coalescer_from_env
+from framework.deadlines import time_budget
+from models.${{values.app_name}} import ${{values.app_name_capitalized}}, ${{values.app_name_capitalized}}Create, ${{values.app_name_capitalized}}Update
 from datetime import datetime, UTC
 
 router = APIRouter()
 
+# Optional group-commit stage for create_record (None unless DB_WRITE_COALESCE=true)
+write_coalescer = coalescer_from_env(${{values.app_name_capitalized}}.__table__)
+
+
+async def get_create_db(request: Request):
+    """
+    Session for `create_record`: `get_db`, or `get_lazy_db` when writes are coalesced.
+
+    Coalesced creates are written by the batch leader's own session, so the request
+    must not hold a pooled connection while it waits: with enough concurrent creates
+    every connection would be held by a waiter and the leader could not get one.
+    """
+    dependency = get_lazy_db if write_coalescer is not None else get_db
+    async with asynccontextmanager(dependency)(request) as db:
+        yield db
+
+TABLE = ${{values.app_name_capitalized}}.__table__
+
+# Hot-path statements, built once. Every request binds only parameters, so SQLAlchemy's
+# compiled cache always hits, rows skip ORM hydration, and with DB_DRIVER=psycopg the
+# statements become server-side prepared statements on each pooled connection.
+SELECT_BY_ID = select(TABLE).where(TABLE.c.id == bindparam("id"))
+SELECT_PAGE = select(TABLE).offset(bindparam("offset")).limit(bindparam("limit"))
+SELECT_VERSION = select(TABLE.c.version).where(TABLE.c.id == bindparam("id"))
+DELETE_BY_ID = delete(TABLE).where(TABLE.c.id == bindparam("match_id")).returning(TABLE.c.id)
+# Updated columns come from the execution parameters; bind names must differ from column names
+UPDATE_BY_ID = (
+    update(TABLE)
+    .where(TABLE.c.id == bindparam("match_id"))
+    .values(version=TABLE.c.version + 1)
+    .returning(*TABLE.c)
+)
+UPDATE_BY_ID_AND_VERSION = UPDATE_BY_ID.where(TABLE.c.version == bindparam("match_version"))
+
+# Database time budgets (ms), applied as statement timeouts; other routes use DB_STATEMENT_TIMEOUT_MS
+LIST_BUDGET_MS = 5000
+COUNT_BUDGET_MS = 5000
+GET_BUDGET_MS = 1000
+
 def serialize_sqlalchemy_obj(obj):
     """
     Convert a SQLAlchemy ORM model instance into a dictionary.
@@ -19,11 +64,79 @@ def serialize_sqlalchemy_obj(obj):
     return {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
 
 
-@router.get("/api/v1/${{values.app_name}}")
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    Parse an `If-Match` header into an expected row version.
+
+    Accepts strong or weak entity tags (`"3"`, `W/"3"`) or a bare integer.
+    `*` and a missing header mean "no version check".
+
+    Args:
+        if_match (str | None): Raw `If-Match` header value.
+
+    Returns:
+        int | None: The expected version, or None when no check is requested.
+
+    Raises:
+        HTTPException: 400 if the header is not a version entity tag.
+    """
+    if if_match is None or if_match.strip() in ("", "*"):
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {if_match}")
+
+
+def versioned_update(db: Session, id: int, values: dict, expected_version: Optional[int]) -> dict:
+    """
+    Apply an update in a single `UPDATE ... WHERE id AND version RETURNING` statement.
+
+    The version column is incremented in the same statement, so concurrent writers
+    never need to lock or re-read the row. Only when no row matches is a second
+    lookup made to tell a missing record (404) from a stale version (409).
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        id (int): The ID of the record to update.
+        values (dict): Column values to set.
+        expected_version (int | None): Required current version, or None to skip the check.
+
+    Returns:
+        dict: The updated record.
+
+    Raises:
+        HTTPException: 404 if the record does not exist, 409 on a version conflict.
+    """
+    params = {**values, "update_date": datetime.now(UTC), "match_id": id}
+    if expected_version is None:
+        statement = UPDATE_BY_ID
+    else:
+        statement = UPDATE_BY_ID_AND_VERSION
+        params["match_version"] = expected_version
+
+    row = db.execute(statement, params).first()
+    if row is None:
+        current_version = db.execute(SELECT_VERSION, {"id": id}).scalar()
+        if current_version is None:
+            raise HTTPException(status_code=404, detail=f"${{values.app_name_capitalized}} with id {id} not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"${{values.app_name_capitalized}} with id {id} was modified: expected version {expected_version}, current version {current_version}",
+            headers={"ETag": f'"{current_version}"'}
+        )
+    db.commit()
+    return dict(row._mapping)
+
+
+@router.get("/api/v1/${{values.app_name}}", dependencies=[Depends(time_budget(LIST_BUDGET_MS))])
 def list_${{values.app_name}}(
     page: int = Query(1, ge=1, description="Page number to retrieve"),
     limit: int = Query(10, ge=1, le=100, description="Number of records per page"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve a paginated list of ${{values.app_name_capitalized}} records.
@@ -31,28 +144,60 @@ def list_${{values.app_name}}(
     Args:
         page (int): Page number starting from 1.
         limit (int): Maximum number of records to return per page.
-        db (Session): SQLAlchemy database session.
+        db (Session): SQLAlchemy read session (replica when configured).
 
     Returns:
         list[dict]: A list of serialized ${{values.app_name_capitalized}} records.
     """
     try:
         offset = (page - 1) * limit
-        ${{values.app_name}}_records = db.query(${{values.app_name_capitalized}}).offset(offset).limit(limit).all()
-        return [serialize_sqlalchemy_obj(item) for item in ${{values.app_name}}_records]
+        rows = db.execute(SELECT_PAGE, {"offset": offset, "limit": limit})
+        return [dict(row._mapping) for row in rows]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/api/v1/${{values.app_name}}/count", dependencies=[Depends(time_budget(COUNT_BUDGET_MS))])
+def count_${{values.app_name}}(
+    mode: Literal["exact", "estimate"] = Query("exact", description="'exact' for a cached count(*), 'estimate' for planner statistics"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Return the total number of ${{values.app_name_capitalized}} records for pagination metadata.
+
+    Args:
+        mode (str): "exact" returns a `count(*)` cached for a short TTL.
+                    "estimate" returns PostgreSQL's statistics-based estimate,
+                    which costs a single catalog lookup at any table size.
+        db (Session): SQLAlchemy read session (replica when configured).
+
+    Returns:
+        dict: The record count and the mode used to compute it.
+    """
+    try:
+        if mode == "estimate":
+            count = estimate_count(db, ${{values.app_name_capitalized}})
+        else:
+            count = exact_count(db, ${{values.app_name_capitalized}})
+        return {"count": count, "mode": mode}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.post("/api/v1/${{values.app_name}}")
 def create_record(
+    response: Response,
     ${{values.app_name}}_data: ${{values.app_name_capitalized}}Create = Body(..., description="Data for the new record"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_create_db)
 ):
     """
     Create a new ${{values.app_name_capitalized}} record.
 
+    When write coalescing is enabled, concurrent creates are merged into a single
+    multi-row INSERT and commit; each caller still receives its own record or error.
+
     Args:
+        response (Response): Outgoing response, used to pin the client's reads to the primary.
         ${{values.app_name}}_data (${{values.app_name_capitalized}}Create): Data model for the record to create.
         db (Session): SQLAlchemy database session.
 
@@ -61,6 +206,13 @@ def create_record(
     """
     try:
         data = ${{values.app_name}}_data.model_dump(exclude_unset=True)
+        if write_coalescer is not None:
+            now = datetime.now(UTC)
+            record = write_coalescer.submit({**data, "create_date": now, "update_date": now})
+            invalidate_count(${{values.app_name_capitalized}})
+            pin_to_primary(response)
+            return record
+
         new_record = ${{values.app_name_capitalized}}(**data)
         new_record.create_date = datetime.now(UTC)
         new_record.update_date = datetime.now(UTC)
@@ -68,6 +220,8 @@ def create_record(
         db.add(new_record)
         db.commit()
         db.refresh(new_record)
+        invalidate_count(${{values.app_name_capitalized}})
+        pin_to_primary(response)
         return serialize_sqlalchemy_obj(new_record)
     except HTTPException:
         raise
@@ -76,14 +230,17 @@ def create_record(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/api/v1/${{values.app_name}}/{id}")
-def get_${{values.app_name}}_by_id(id: int, db: Session = Depends(get_db)):
+@router.get("/api/v1/${{values.app_name}}/{id}", dependencies=[Depends(time_budget(GET_BUDGET_MS))])
+def get_${{values.app_name}}_by_id(id: int, response: Response, db: Session = Depends(get_read_db)):
     """
     Retrieve a single ${{values.app_name_capitalized}} record by ID.
 
+    The record's version is returned in the `ETag` header for use with `If-Match`.
+
     Args:
         id (int): The ID of the record.
-        db (Session): SQLAlchemy database session.
+        response (Response): Outgoing response, used to set the `ETag` header.
+        db (Session): SQLAlchemy read session (replica when configured).
 
     Returns:
         dict: The matching ${{values.app_name_capitalized}} record.
@@ -92,10 +249,11 @@ def get_${{values.app_name}}_by_id(id: int, db: Session = Depends(get_db)):
         HTTPException: If the record is not found.
     """
     try:
-        record = db.query(${{values.app_name_capitalized}}).filter(${{values.app_name_capitalized}}.id == id).first()
-        if not record:
+        row = db.execute(SELECT_BY_ID, {"id": id}).first()
+        if row is None:
             raise HTTPException(status_code=404, detail=f"${{values.app_name_capitalized}} with id {id} not found")
-        return serialize_sqlalchemy_obj(record)
+        response.headers["ETag"] = f'"{row.version}"'
+        return dict(row._mapping)
     except HTTPException:
         raise
     except Exception as e:
@@ -105,36 +263,41 @@ def get_${{values.app_name}}_by_id(id: int, db: Session = Depends(get_db)):
 @router.put("/api/v1/${{values.app_name}}/{id}")
 def update_${{values.app_name}}_full(
     id: int,
-    ${{values.app_name}}_data: ${{values.app_name_capitalized}}Create = Body(..., description="Updated data for the record"),
+    response: Response,
+    ${{values.app_name}}_data: ${{values.app_name_capitalized}}Update = Body(..., description="Updated data for the record"),
+    if_match: Optional[str] = Header(None, description="Expected record version as an ETag, e.g. \"3\""),
     db: Session = Depends(get_db)
 ):
     """
     Fully update an existing ${{values.app_name_capitalized}} record (all fields required).
 
+    The expected version may be sent as an `If-Match` header (takes precedence)
+    or as the `version` body field. Without either, the update is unconditional.
+
     Args:
         id (int): The ID of the record to update.
-        ${{values.app_name}}_data (${{values.app_name_capitalized}}Create): Updated record data (all fields).
+        response (Response): Outgoing response, used to set the `ETag` header and pin reads to the primary.
+        ${{values.app_name}}_data (${{values.app_name_capitalized}}Update): Updated record data (all fields).
+        if_match (str | None): Expected record version.
         db (Session): SQLAlchemy database session.
 
     Returns:
         dict: The updated ${{values.app_name_capitalized}} record.
 
     Raises:
-        HTTPException: If the record is not found.
+        HTTPException: 404 if the record is not found, 409 on a version conflict.
     """
     try:
-        record = db.query(${{values.app_name_capitalized}}).filter(${{values.app_name_capitalized}}.id == id).first()
-        if not record:
-            raise HTTPException(status_code=404, detail=f"${{values.app_name_capitalized}} with id {id} not found")
-
         data = ${{values.app_name}}_data.model_dump(exclude_unset=False)
-        for key, value in data.items():
-            setattr(record, key, value)
-
-        record.update_date = datetime.now(UTC)
-        db.commit()
-        db.refresh(record)
-        return serialize_sqlalchemy_obj(record)
+        body_version = data.pop("version")
+        expected_version = parse_if_match(if_match)
+        if expected_version is None:
+            expected_version = body_version
+
+        record = versioned_update(db, id, data, expected_version)
+        response.headers["ETag"] = f'"{record["version"]}"'
+        pin_to_primary(response)
+        return record
     except HTTPException:
         raise
     except Exception as e:
@@ -145,36 +308,41 @@ def update_${{values.app_name}}_full(
 @router.patch("/api/v1/${{values.app_name}}/{id}")
 def update_${{values.app_name}}_partial(
     id: int,
-    ${{values.app_name}}_data: ${{values.app_name_capitalized}}Create = Body(..., description="Partial updated data for the record"),
+    response: Response,
+    ${{values.app_name}}_data: ${{values.app_name_capitalized}}Update = Body(..., description="Partial updated data for the record"),
+    if_match: Optional[str] = Header(None, description="Expected record version as an ETag, e.g. \"3\""),
     db: Session = Depends(get_db)
 ):
     """
     Partially update an existing ${{values.app_name_capitalized}} record (only provided fields are updated).
 
+    The expected version may be sent as an `If-Match` header (takes precedence)
+    or as the `version` body field. Without either, the update is unconditional.
+
     Args:
         id (int): The ID of the record to update.
-        ${{values.app_name_capitalized}}_data (${{values.app_name_capitalized}}Create): Partial updated data.
+        response (Response): Outgoing response, used to set the `ETag` header and pin reads to the primary.
+        ${{values.app_name_capitalized}}_data (${{values.app_name_capitalized}}Update): Partial updated data.
+        if_match (str | None): Expected record version.
         db (Session): SQLAlchemy database session.
 
     Returns:
         dict: The updated ${{values.app_name_capitalized}} record.
 
     Raises:
-        HTTPException: If the record is not found.
+        HTTPException: 404 if the record is not found, 409 on a version conflict.
     """
     try:
-        record = db.query(${{values.app_name_capitalized}}).filter(${{values.app_name_capitalized}}.id == id).first()
-        if not record:
-            raise HTTPException(status_code=404, detail=f"${{values.app_name_capitalized}} with id {id} not found")
-
         data = ${{values.app_name}}_data.model_dump(exclude_unset=True)
-        for key, value in data.items():
-            setattr(record, key, value)
-
-        record.update_date = datetime.now(UTC)
-        db.commit()
-        db.refresh(record)
-        return serialize_sqlalchemy_obj(record)
+        body_version = data.pop("version", None)
+        expected_version = parse_if_match(if_match)
+        if expected_version is None:
+            expected_version = body_version
+
+        record = versioned_update(db, id, data, expected_version)
+        response.headers["ETag"] = f'"{record["version"]}"'
+        pin_to_primary(response)
+        return record
     except HTTPException:
         raise
     except Exception as e:
@@ -183,12 +351,13 @@ def update_${{values.app_name}}_partial(
 
 
 @router.delete("/api/v1/${{values.app_name}}/{id}")
-def delete_${{values.app_name}}(id: int, db: Session = Depends(get_db)):
+def delete_${{values.app_name}}(id: int, response: Response, db: Session = Depends(get_db)):
     """
     Delete a ${{values.app_name_capitalized}} record by ID.
 
     Args:
         id (int): The ID of the record to delete.
+        response (Response): Outgoing response, used to pin the client's reads to the primary.
         db (Session): SQLAlchemy database session.
 
     Returns:
@@ -198,12 +367,12 @@ def delete_${{values.app_name}}(id: int, db: Session = Depends(get_db)):
         HTTPException: If the record is not found.
     """
     try:
-        record = db.query(${{values.app_name_capitalized}}).filter(${{values.app_name_capitalized}}.id == id).first()
-        if not record:
+        if db.execute(DELETE_BY_ID, {"match_id": id}).first() is None:
             raise HTTPException(status_code=404, detail=f"${{values.app_name_capitalized}} with id {id} not found")
 
-        db.delete(record)
         db.commit()
+        invalidate_count(${{values.app_name_capitalized}})
+        pin_to_primary(response)
         return {"detail": f"${{values.app_name_capitalized}} with id {id} deleted successfully"}
     except HTTPException:
         raise
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Query
+from framework import slow_queries
+
+router = APIRouter()
+
+@router.get("/api/v1/${{values.app_name}}/debug/slow-queries")
+def slow_query_log(limit: int = Query(10, ge=1, le=100)):
+    """
+    Slow-query log endpoint.
+
+    Args:
+        limit (int): Maximum number of statement shapes to return (1-100, default 10).
+
+    Returns:
+        dict: A dictionary containing:
+              - threshold_ms (float): Latency above which statements are recorded.
+              - queries (list): Normalized statements ordered by total time, each with
+                count, total/mean/max milliseconds, last_seen (epoch seconds), and
+                the captured `EXPLAIN (FORMAT JSON)` plan (null until captured or
+                when not running on PostgreSQL).
+    """
+    return {
+        "threshold_ms": slow_queries.SLOW_QUERY_MS,
+        "queries": slow_queries.store.top(limit)
+    }
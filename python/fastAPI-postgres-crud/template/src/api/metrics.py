@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from framework import pool_metrics
+
+router = APIRouter()
+
+@router.get("/api/v1/${{values.app_name}}/metrics")
+def metrics():
+    """
+    Runtime metrics endpoint.
+
+    Returns:
+        dict: A dictionary of in-process metrics.
+              Includes:
+                - db_pools (dict): Per-pool checkout telemetry keyed by pool name
+                  ("primary", "replica-0", ...): capacity, in-use and overflow gauges,
+                  checkout/timeout/rejection counters, and a cumulative histogram
+                  of checkout wait times in milliseconds.
+    """
+    return {
+        "db_pools": pool_metrics.snapshot_all()
+    }
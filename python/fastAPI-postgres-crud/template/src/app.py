@@ -11,19 +11,26 @@ This application follows a modular architecture:
 
 Environment Variables:
     TESTING (str): If set to `"true"`, disables middleware and OpenTelemetry, and uses basic logging.
+    DB_CONNECT_MAX_RETRIES (int): Startup connection attempts before failing (default: 5).
+    DB_CONNECT_BACKOFF_BASE (float): Base delay in seconds for exponential backoff (default: 0.5).
+    DB_CONNECT_BACKOFF_MAX (float): Maximum delay in seconds between attempts (default: 10).
+    DB_SCHEMA_MODE (str): "fingerprint", "create_all", or "none" (default: fingerprint).
 
 """
 
 import os
+import random
+import asyncio
 import logging
-from time import sleep
 from fastapi import FastAPI
-from sqlalchemy import text
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 import framework.db
+from framework.partitioning import MAINTENANCE_INTERVAL, PARTITIONING_ENABLED, run_maintenance
+from framework.schema import ensure_schema
+from framework.query_stats import TimedJSONResponse
 from models.${{values.app_name}} import Base
-from api import health, info, ${{values.app_name}}
+from api import health, info, metrics, debug, ${{values.app_name}}
 
 # Setup logging before anything else uses it
 logger = logging.getLogger(__name__)
@@ -43,6 +50,53 @@ else:
     otel_enabled = False
 
 
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Return the delay before retry number `attempt` (0-based).
+
+    Uses exponential backoff with "full jitter": a uniform random delay between
+    zero and `min(cap, base * 2 ** attempt)`, so replicas restarting together
+    do not retry in lockstep.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def connect_database() -> int:
+    """
+    Initialize the database and warm every connection pool.
+
+    Runs in a worker thread so the blocking connects do not stall the event loop.
+    A replica that cannot be warmed is taken out of rotation instead of failing startup.
+
+    Returns:
+        int: Number of pooled connections opened.
+    """
+    framework.db.init_db()
+    ensure_schema(framework.db.engine, Base.metadata)
+    run_maintenance(framework.db.engine, Base.metadata)
+    warmed = framework.db.warm_pool()
+
+    if framework.db.read_router is not None:
+        for index, replica in enumerate(framework.db.read_router.engines):
+            try:
+                warmed += framework.db.warm_pool(replica)
+            except Exception as e:
+                logger.error(f"Failed to warm read replica {index}: {str(e)}")
+                framework.db.read_router.mark_unhealthy(index)
+    return warmed
+
+
+async def partition_maintenance_loop() -> None:
+    """Re-run partition maintenance every `DB_PARTITION_MAINTENANCE_SECONDS`, so long-lived
+    replicas keep creating partitions ahead of time between deploys."""
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+        try:
+            await asyncio.to_thread(run_maintenance, framework.db.engine, Base.metadata)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {str(e)}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -50,9 +104,15 @@ async def lifespan(app: FastAPI):
 
     Handles startup and shutdown events for the FastAPI application.
     On startup:
-        - Attempts to establish a database connection.
-        - Retries connection up to `max_retries` times with `retry_delay` seconds between attempts.
-        - Initializes database tables if they do not exist.
+        - Attempts to establish a database connection without blocking the event loop.
+        - Retries up to `DB_CONNECT_MAX_RETRIES` times with exponential backoff and jitter.
+        - Brings the schema up to date. A single query compares the stored schema
+          fingerprint; table creation and migrations only run when it differs.
+        - Creates upcoming table partitions and drops expired ones (when partitioning is enabled),
+          then repeats that every `DB_PARTITION_MAINTENANCE_SECONDS` in the background.
+        - Pre-opens `pool_size` connections per pool so the first requests after a rollout
+          do not pay connect/TLS/auth costs. The app only starts serving (and passing its
+          readiness probe) once warm-up completes.
 
     Args:
         app (FastAPI): The FastAPI application instance.
@@ -63,34 +123,40 @@ async def lifespan(app: FastAPI):
     Yields:
         None: Control is returned to the application after startup logic completes.
     """
-    max_retries = 5
-    retry_delay = 2
+    max_retries = int(os.getenv("DB_CONNECT_MAX_RETRIES", 5))
+    backoff_base = float(os.getenv("DB_CONNECT_BACKOFF_BASE", 0.5))
+    backoff_max = float(os.getenv("DB_CONNECT_BACKOFF_MAX", 10))
 
     if os.getenv("TESTING") != "true":
         for attempt in range(max_retries):
             try:
                 logger.info(f"Attempting database connection (attempt {attempt + 1}/{max_retries})")
-                framework.db.init_db()
-                Base.metadata.create_all(bind=framework.db.engine)
-                with framework.db.SessionLocal() as session:
-                    session.execute(text("SELECT 1"))
-                logger.info("Database connection established successfully")
+                warmed = await asyncio.to_thread(connect_database)
+                logger.info(f"Database connection established successfully ({warmed} pooled connections warmed)")
                 break
             except Exception as e:
                 logger.error(f"Database connection failed: {str(e)}")
                 if attempt == max_retries - 1:
                     logger.error("Max retries reached, failing startup")
                     raise
-                sleep(retry_delay)
+                await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_max))
+
+    maintenance = None
+    if os.getenv("TESTING") != "true" and PARTITIONING_ENABLED and MAINTENANCE_INTERVAL > 0:
+        maintenance = asyncio.create_task(partition_maintenance_loop())
 
     yield
 
+    if maintenance is not None:
+        maintenance.cancel()
+
 
 app = FastAPI(
     title="${{values.app_name_capitalized}} API",
     version="1.0.0",
     openapi_url="/api/v1/${{values.app_name}}/openapi.json",
     docs_url="/api/v1/${{values.app_name}}/docs",
+    default_response_class=TimedJSONResponse,
     lifespan=lifespan
 )
 
@@ -104,5 +170,9 @@ if os.getenv("TESTING") != "true":
 # Register routes
 app.include_router(health.router, tags=["Health"])
 app.include_router(info.router, tags=["Info"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(${{values.app_name}}.router, tags=["${{values.app_name}}"])
+# Debug endpoints expose query internals; they are opt-in and should stay off in production
+if os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true":
+    app.include_router(debug.router, tags=["Debug"])
 app.mount("/${{values.app_name}}/test", StaticFiles(directory="static", html=True), name="test")
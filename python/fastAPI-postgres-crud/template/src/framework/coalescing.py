@@ -0,0 +1,199 @@
+"""
+Group-Commit Write Coalescing
+
+This module provides:
+- `WriteCoalescer`, which merges single-row inserts arriving from concurrent
+  request threads into one multi-row `INSERT ... RETURNING` and one commit.
+- `coalescer_from_env()`, which builds a coalescer when enabled by configuration.
+
+The first caller to arrive becomes the batch "leader": it waits up to the
+coalescing window (or until `max_rows` rows are queued), writes the whole batch,
+and hands every caller back its own row. If the batch violates a constraint it
+is retried row by row inside savepoints, still under a single commit, so each
+caller receives either its own row or its own `IntegrityError`.
+
+Environment Variables:
+    DB_WRITE_COALESCE           - Set to "true" to enable coalescing (default: false)
+    DB_WRITE_COALESCE_WINDOW_MS - Max time to wait for more rows (default: 2)
+    DB_WRITE_COALESCE_MAX_ROWS  - Max rows per batch (default: 64)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from framework import db as framework_db
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingWrite:
+    __slots__ = ("row", "result", "error", "queued", "done")
+
+    def __init__(self, row: dict):
+        self.row = row
+        self.result: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+        self.queued = True
+        self.done = False
+
+
+class WriteCoalescer:
+    """
+    Coalesce concurrent single-row inserts into batched group commits.
+
+    Args:
+        table: SQLAlchemy `Table` to insert into.
+        session_factory (Callable, optional): Returns a new `Session`.
+            Defaults to `framework.db.SessionLocal`.
+        window_ms (float): Max time the batch leader waits for more rows.
+        max_rows (int): Max rows written per batch.
+
+    Example:
+        >>> coalescer = WriteCoalescer(User.__table__, window_ms=2, max_rows=64)
+        >>> coalescer.submit({"username": "johndoe", "email": "john@example.com"})
+        {'id': 1, 'username': 'johndoe', ...}
+    """
+
+    def __init__(self, table, session_factory: Callable[[], Session] = None,
+                 window_ms: float = 2.0, max_rows: int = 64):
+        self.table = table
+        self.session_factory = session_factory or (lambda: framework_db.SessionLocal())
+        self.window = window_ms / 1000.0
+        self.max_rows = max(1, max_rows)
+        self.stats = {"batches": 0, "rows": 0, "max_batch": 0, "fallbacks": 0}
+
+        self._cond = threading.Condition(threading.Lock())
+        self._pending: List[_PendingWrite] = []
+        self._leader_active = False
+
+    def submit(self, row: dict) -> dict:
+        """
+        Queue a row for insertion and block until its batch has committed.
+
+        Args:
+            row (dict): Column values for the new row.
+
+        Returns:
+            dict: The inserted row, including server-generated columns.
+
+        Raises:
+            IntegrityError: If this row violates a constraint.
+            Exception: Any other error raised while writing the batch.
+        """
+        item = _PendingWrite(row)
+        with self._cond:
+            self._pending.append(item)
+            self._cond.notify_all()
+            while not item.done:
+                # Wait if someone else is collecting, or our row is already in a batch
+                if self._leader_active or not item.queued:
+                    self._cond.wait()
+                    continue
+
+                self._leader_active = True
+                batch = self._collect_batch()
+                # Leftover rows (beyond max_rows) can elect the next leader right away
+                self._leader_active = False
+                self._cond.notify_all()
+
+                self._cond.release()
+                try:
+                    self._write_batch(batch)
+                finally:
+                    self._cond.acquire()
+                    for pending in batch:
+                        pending.done = True
+                    self.stats["batches"] += 1
+                    self.stats["rows"] += len(batch)
+                    self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+                    self._cond.notify_all()
+
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _collect_batch(self) -> List[_PendingWrite]:
+        """Wait (lock held) for the window to elapse or the batch to fill."""
+        deadline = time.monotonic() + self.window
+        while len(self._pending) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        batch = self._pending[:self.max_rows]
+        del self._pending[:self.max_rows]
+        for pending in batch:
+            pending.queued = False
+        return batch
+
+    def _write_batch(self, batch: List[_PendingWrite]) -> None:
+        """Insert the batch with one commit, isolating per-row constraint errors."""
+        session = self.session_factory()
+        try:
+            try:
+                self._insert_many(session, batch)
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                self.stats["fallbacks"] += 1
+                self._insert_each(session, batch)
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Coalesced write of {len(batch)} rows failed: {str(e)}")
+            for pending in batch:
+                if pending.error is None:
+                    pending.result = None
+                    pending.error = e
+        finally:
+            session.close()
+
+    def _insert_many(self, session: Session, batch: List[_PendingWrite]) -> None:
+        # executemany requires identical keys, so group rows by the columns they set
+        groups: Dict[tuple, List[_PendingWrite]] = defaultdict(list)
+        for pending in batch:
+            groups[tuple(sorted(pending.row))].append(pending)
+
+        for group in groups.values():
+            statement = insert(self.table).returning(*self.table.c, sort_by_parameter_order=True)
+            result = session.execute(statement, [pending.row for pending in group])
+            for pending, record in zip(group, result):
+                pending.result = dict(record._mapping)
+
+    def _insert_each(self, session: Session, batch: List[_PendingWrite]) -> None:
+        statement = insert(self.table).returning(*self.table.c)
+        for pending in batch:
+            pending.result = None
+            try:
+                with session.begin_nested():
+                    record = session.execute(statement, pending.row).one()
+                pending.result = dict(record._mapping)
+            except IntegrityError as e:
+                pending.error = e
+
+
+def coalescer_from_env(table) -> Optional[WriteCoalescer]:
+    """
+    Build a `WriteCoalescer` for `table` if `DB_WRITE_COALESCE` is enabled.
+
+    Args:
+        table: SQLAlchemy `Table` to insert into.
+
+    Returns:
+        WriteCoalescer | None: The coalescer, or None when coalescing is disabled.
+    """
+    if os.getenv("DB_WRITE_COALESCE", "false").lower() != "true":
+        return None
+    return WriteCoalescer(
+        table,
+        window_ms=float(os.getenv("DB_WRITE_COALESCE_WINDOW_MS", 2)),
+        max_rows=int(os.getenv("DB_WRITE_COALESCE_MAX_ROWS", 64))
+    )
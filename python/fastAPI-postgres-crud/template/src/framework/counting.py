@@ -0,0 +1,133 @@
+"""
+Row Counting Helpers for Pagination
+
+This module provides:
+- An exact row count backed by a short TTL cache, so repeated pagination
+  requests do not each pay for a full `SELECT count(*)` scan.
+- An estimated row count read from PostgreSQL statistics (`pg_class.reltuples`)
+  or, for filtered queries, from the planner's row estimate.
+
+Estimates are only available on PostgreSQL. On other databases (e.g. SQLite in
+tests) the estimate helpers fall back to the cached exact count.
+
+Environment Variables:
+    COUNT_CACHE_TTL - Seconds an exact count is reused before re-counting (default: 5)
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", 5))
+
+# table name -> (expires_at, count)
+_count_cache: Dict[str, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def exact_count(db: Session, model, ttl: float = None) -> int:
+    """
+    Return the exact number of rows in the model's table, cached for `ttl` seconds.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        model: SQLAlchemy ORM model class.
+        ttl (float, optional): Cache lifetime in seconds. Defaults to `COUNT_CACHE_TTL`.
+
+    Returns:
+        int: Number of rows in the table.
+    """
+    ttl = COUNT_CACHE_TTL if ttl is None else ttl
+    key = model.__tablename__
+    now = time.monotonic()
+
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    count = db.execute(select(func.count()).select_from(model)).scalar_one()
+    if ttl > 0:
+        with _count_cache_lock:
+            _count_cache[key] = (now + ttl, count)
+    return count
+
+
+# Autovacuum never analyzes a partitioned parent (relkind 'p'), so its reltuples stays -1;
+# the estimate for one is the sum over its partitions (unanalyzed partitions count as 0)
+RELTUPLES_SQL = text(
+    "SELECT CASE WHEN c.relkind = 'p' THEN ("
+    "SELECT sum(greatest(child.reltuples, 0)) FROM pg_inherits i "
+    "JOIN pg_class child ON child.oid = i.inhrelid WHERE i.inhparent = c.oid"
+    ") ELSE c.reltuples END::bigint "
+    "FROM pg_class c WHERE c.oid = to_regclass(:table)"
+)
+
+
+def estimate_count(db: Session, model, *criteria) -> int:
+    """
+    Return an estimated number of rows for the model's table.
+
+    Without criteria the estimate is read from `pg_class.reltuples` (summed over the
+    partitions of a partitioned table), which is a single catalog lookup regardless
+    of table size. With criteria the planner's
+    row estimate for the filtered query is used instead.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        model: SQLAlchemy ORM model class.
+        *criteria: Optional SQLAlchemy filter expressions.
+
+    Returns:
+        int: Estimated number of matching rows.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        if criteria:
+            return db.execute(select(func.count()).select_from(model).where(*criteria)).scalar_one()
+        return exact_count(db, model)
+
+    if criteria:
+        return planner_estimate(db, select(model).where(*criteria))
+
+    reltuples = db.execute(RELTUPLES_SQL, {"table": model.__tablename__}).scalar()
+
+    # reltuples is -1 (PG14+) or 0 for a table that has never been vacuumed/analyzed
+    if reltuples is None or reltuples <= 0:
+        return exact_count(db, model)
+    return int(reltuples)
+
+
+def planner_estimate(db: Session, statement) -> int:
+    """
+    Return the PostgreSQL planner's row estimate for a SELECT statement.
+
+    Args:
+        db (Session): SQLAlchemy database session bound to PostgreSQL.
+        statement: SQLAlchemy selectable to estimate.
+
+    Returns:
+        int: The "Plan Rows" value of the top plan node.
+    """
+    connection = db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def invalidate_count(model) -> None:
+    """
+    Drop any cached exact count for the model's table.
+
+    Called after inserts and deletes so the next exact count is fresh.
+
+    Args:
+        model: SQLAlchemy ORM model class.
+    """
+    with _count_cache_lock:
+        _count_cache.pop(model.__tablename__, None)
@@ -5,6 +5,12 @@ This module provides:
 - A global SQLAlchemy `Base` class for ORM models.
 - Database initialization logic that supports both production and testing environments.
 - A dependency function for FastAPI routes to get a database session.
+- Optional read-replica routing with a dependency for read-only routes.
+- Pool pre-warming so the first requests after startup do not pay connection setup.
+- Per-request statement timeouts and query cancellation on client disconnect
+  (see `framework.deadlines`).
+- Engine hooks for pool telemetry, per-request SQL accounting, and the slow-query log
+  (see `framework.pool_metrics`, `framework.query_stats`, `framework.slow_queries`).
 
 Environment Variables for Production:
     POSTGRES_USER     - PostgreSQL username
@@ -15,6 +21,18 @@ Environment Variables for Production:
     DB_POOL_SIZE      - SQLAlchemy pool size (default: 10)
     DB_MAX_OVERFLOW   - Max overflow connections beyond pool_size (default: 20)
     DB_POOL_RECYCLE   - Connection lifetime in seconds before recycling (default: 3600)
+    DB_DRIVER         - "psycopg2" (default) or "psycopg" (psycopg 3, server-side prepared statements)
+    DB_PREPARE_THRESHOLD - With psycopg 3, executions of a statement on a connection before it is
+                           prepared server-side; "none" disables preparing, which is required
+                           behind PgBouncer in transaction pooling mode (default: 5)
+
+Environment Variables for Read Replicas (optional):
+    POSTGRES_REPLICA_HOSTS      - Comma-separated replica hosts, each `host` or `host:port`
+                                  (same user, password and database as the primary)
+    DB_REPLICA_STRATEGY         - "round_robin" or "least_connections" (default: round_robin)
+    DB_REPLICA_RETRY_SECONDS    - How long a failed replica is skipped (default: 30)
+    DB_READ_YOUR_WRITES_SECONDS - Pin a client's reads to the primary for this many seconds
+                                  after it writes; 0 disables (default: 0)
 
 Environment Variables for Testing:
     DATABASE_URL - Full SQLAlchemy database URL (e.g., sqlite:///./test.db)
@@ -22,9 +40,22 @@ Environment Variables for Testing:
 """
 
 import os
-from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import create_engine
-from typing import Optional, Any
+import time
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from fastapi import Request, Response
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from framework.pool_metrics import instrument_engine, checkout_connection
+from framework.query_stats import instrument_queries
+from framework.slow_queries import instrument_slow_queries
+from framework.deadlines import request_deadline, watch_disconnect
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Any, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,6 +67,75 @@ Base = declarative_base()
 SessionLocal: Optional[sessionmaker] = None
 engine: Optional[Any] = None
 
+# Read replica router (None when no replicas are configured)
+read_router: Optional["ReplicaRouter"] = None
+
+READ_YOUR_WRITES_SECONDS = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 0))
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+
+class ReplicaRouter:
+    """
+    Route read-only sessions across replica engines.
+
+    Replicas whose connections fail are skipped for `retry_seconds`, after
+    which they are tried again. When no replica is healthy, callers fall back
+    to the primary.
+
+    Args:
+        engines (list): One SQLAlchemy engine (and pool) per replica.
+        strategy (str): "round_robin" or "least_connections" (fewest checked-out connections).
+        retry_seconds (float): How long a failed replica is taken out of rotation.
+    """
+
+    def __init__(self, engines: List[Any], strategy: str = "round_robin", retry_seconds: float = 30):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unsupported replica strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self.sessions = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in engines
+        ]
+        self._unhealthy_until = [0.0] * len(engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+        for index, replica in enumerate(engines):
+            event.listen(replica, "handle_error", self._error_listener(index))
+
+    def _error_listener(self, index: int):
+        def on_error(context):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+                self.mark_unhealthy(index)
+        return on_error
+
+    def mark_unhealthy(self, index: int) -> None:
+        """Take a replica out of rotation for `retry_seconds`."""
+        with self._lock:
+            self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning(f"Read replica {index} marked unhealthy for {self.retry_seconds}s")
+
+    def healthy(self) -> List[int]:
+        """Return the indexes of replicas currently in rotation."""
+        now = time.monotonic()
+        with self._lock:
+            return [i for i, until in enumerate(self._unhealthy_until) if until <= now]
+
+    def choose(self) -> Optional[int]:
+        """Return the index of the replica to use, or None if none is healthy."""
+        candidates = self.healthy()
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda i: self.engines[i].pool.checkedout())
+        return candidates[next(self._counter) % len(candidates)]
+
+    def session(self) -> Optional[Session]:
+        """Return a new session on a healthy replica, or None to use the primary."""
+        index = self.choose()
+        return None if index is None else self.sessions[index]()
+
 
 def init_db(database_url: str = None, **engine_kwargs):
     """
@@ -45,6 +145,8 @@ def init_db(database_url: str = None, **engine_kwargs):
     - Reads database configuration from environment variables if `database_url` is not provided.
     - Creates an SQLAlchemy engine with appropriate connection pooling.
     - Configures `SessionLocal` for use in request-scoped database sessions.
+    - Creates one engine per `POSTGRES_REPLICA_HOSTS` entry and a `read_router` across them.
+    - Instruments every pool for checkout telemetry (see `framework.pool_metrics`).
 
     Args:
         database_url (str, optional):
@@ -63,8 +165,9 @@ def init_db(database_url: str = None, **engine_kwargs):
         >>> from framework.db import SessionLocal
         >>> session = SessionLocal()
     """
-    global SessionLocal, engine
+    global SessionLocal, engine, read_router
 
+    replica_urls = []
     try:
         if database_url is None:
             database_url = os.getenv("DATABASE_URL")
@@ -90,13 +193,19 @@ def init_db(database_url: str = None, **engine_kwargs):
                         f"Missing required environment variables: {', '.join(missing_vars)}"
                     )
 
-                database_url = (
-                    f"postgresql+psycopg2://{required_keys['POSTGRES_USER']}:"
-                    f"{required_keys['POSTGRES_PASSWORD']}@"
-                    f"{required_keys['POSTGRES_HOST']}:"
-                    f"{required_keys['POSTGRES_PORT']}/"
-                    f"{required_keys['POSTGRES_DB']}"
-                )
+                driver = os.getenv("DB_DRIVER", "psycopg2")
+                if driver not in ("psycopg2", "psycopg"):
+                    raise EnvironmentError(f"Unsupported DB_DRIVER: {driver}")
+
+                def build_url(host, port):
+                    return (
+                        f"postgresql+{driver}://{required_keys['POSTGRES_USER']}:"
+                        f"{required_keys['POSTGRES_PASSWORD']}@"
+                        f"{host}:{port}/"
+                        f"{required_keys['POSTGRES_DB']}"
+                    )
+
+                database_url = build_url(required_keys["POSTGRES_HOST"], required_keys["POSTGRES_PORT"])
 
                 # Default production pool config
                 pool_config = {
@@ -105,7 +214,19 @@ def init_db(database_url: str = None, **engine_kwargs):
                     "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
                     "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 3600))
                 }
+                if driver == "psycopg":
+                    # Server-side prepared statements after N executions per connection;
+                    # "none" disables them for PgBouncer transaction pooling
+                    threshold = os.getenv("DB_PREPARE_THRESHOLD", "5")
+                    pool_config["connect_args"] = {
+                        "prepare_threshold": None if threshold.lower() == "none" else int(threshold)
+                    }
                 pool_config.update(engine_kwargs)
+
+                # Optional read replicas, each with its own pool
+                for replica in filter(None, (h.strip() for h in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(","))):
+                    host, _, port = replica.partition(":")
+                    replica_urls.append(build_url(host, port or required_keys["POSTGRES_PORT"]))
             else:
                 # Testing: use DATABASE_URL as is
                 pool_config = engine_kwargs
@@ -115,13 +236,31 @@ def init_db(database_url: str = None, **engine_kwargs):
 
         logger.info(f"Initializing database with URL: {database_url.split('@')[0]}...@...")  # Mask password
         engine = create_engine(database_url, **pool_config)
+        instrument_engine(engine, "primary")
+        instrument_queries(engine)
+        instrument_slow_queries(engine)
         SessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
             bind=engine
         )
+
+        read_router = None
+        if replica_urls:
+            replica_engines = [create_engine(url, **pool_config) for url in replica_urls]
+            for index, replica in enumerate(replica_engines):
+                instrument_engine(replica, f"replica-{index}")
+                instrument_queries(replica)
+                instrument_slow_queries(replica)
+            read_router = ReplicaRouter(
+                replica_engines,
+                strategy=os.getenv("DB_REPLICA_STRATEGY", "round_robin"),
+                retry_seconds=float(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
+            )
+            logger.info(f"Routing reads across {len(replica_urls)} replica(s)")
+
+        # Register models on Base.metadata; the schema itself is managed by framework.schema
         import models.${{values.app_name}}
-        Base.metadata.create_all(engine)
         logger.info("Database initialized successfully")
 
     except Exception as e:
@@ -129,12 +268,96 @@ def init_db(database_url: str = None, **engine_kwargs):
         raise
 
 
-def get_db():
+def warm_pool(target_engine=None, size: int = None) -> int:
+    """
+    Pre-open pool connections concurrently so they are ready before traffic arrives.
+
+    Opens `size` connections in parallel (each runs `SELECT 1`, so connect, TLS and
+    authentication are all paid up front), then returns them to the pool.
+
+    Args:
+        target_engine (optional): Engine to warm. Defaults to the primary `engine`.
+        size (int, optional): Connections to open. Defaults to the pool's `pool_size`.
+
+    Returns:
+        int: Number of connections opened.
+
+    Raises:
+        RuntimeError:
+            If the database has not been initialized via `init_db()`.
+        Exception:
+            The first connection error, after any opened connections are returned.
+    """
+    target_engine = target_engine or engine
+    if target_engine is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+
+    if size is None:
+        size = target_engine.pool.size() if hasattr(target_engine.pool, "size") else 1
+    if size <= 0:
+        return 0
+
+    def open_connection(_):
+        connection = target_engine.connect()
+        connection.exec_driver_sql("SELECT 1")
+        return connection
+
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        futures = [executor.submit(open_connection, i) for i in range(size)]
+
+    connections, errors = [], []
+    for future in futures:
+        try:
+            connections.append(future.result())
+        except Exception as e:
+            errors.append(e)
+    for connection in connections:
+        connection.close()
+    if errors:
+        raise errors[0]
+    return len(connections)
+
+
+def _checkout_driver_connection(db: Session):
+    """Check out the session's connection and return the underlying DBAPI connection."""
+    checkout_connection(db)
+    return db.connection().connection.driver_connection
+
+
+@asynccontextmanager
+async def request_session(request: Request, db: Session):
+    """
+    Serve `db` for the duration of a request.
+
+    Attaches the request deadline (applied as `statement_timeout` once per checked-out
+    connection, see `framework.deadlines`), checks out the connection in a worker thread, and watches
+    for client disconnects. The watcher is stopped before the session is closed and
+    its connection returned to the pool.
+    """
+    try:
+        db.info["deadline"] = request_deadline(request)
+        driver_connection = await run_in_threadpool(_checkout_driver_connection, db)
+        watcher = asyncio.create_task(watch_disconnect(request, driver_connection))
+        try:
+            yield db
+        finally:
+            watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await watcher
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def get_db(request: Request):
     """
     Dependency function for FastAPI to get a database session.
 
     This function is designed for use in FastAPI routes:
     - Yields a database session bound to the current request.
+    - Checks out the session's connection up front, recording the pool wait and
+      failing fast with 503 when the pool is saturated (see `framework.pool_metrics`).
+    - Applies the request's time budget as a statement timeout and cancels the running
+      query if the client disconnects (see `framework.deadlines`).
     - Ensures the session is closed after the request finishes.
 
     Yields:
@@ -153,8 +376,94 @@ def get_db():
     if SessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
 
+    db = SessionLocal()
+    async with request_session(request, db):
+        yield db
+
+
+async def get_lazy_db(request: Request):
+    """
+    Dependency function for FastAPI to get a database session that connects on first use.
+
+    Unlike `get_db`, no connection is checked out before the handler runs, so there is
+    no admission control or disconnect watcher; the request deadline still applies.
+    For routes that may not touch the session at all, such as coalesced creates: those
+    wait on a batch leader that writes through its own session, and must not hold a
+    pooled connection the leader needs meanwhile.
+
+    Yields:
+        sqlalchemy.orm.Session: A SQLAlchemy session object.
+
+    Raises:
+        RuntimeError:
+            If the database has not been initialized via `init_db()`.
+    """
+    if SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+
     db = SessionLocal()
     try:
+        db.info["deadline"] = request_deadline(request)
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
+
+
+def pin_to_primary(response: Response) -> None:
+    """
+    Pin the client's subsequent reads to the primary after a write.
+
+    Sets a short-lived cookie so that, for `DB_READ_YOUR_WRITES_SECONDS`, reads
+    from the same client are not served by a replica that may still lag behind.
+    Does nothing when read-your-writes is disabled.
+
+    Args:
+        response (Response): Outgoing response of the write request.
+    """
+    if READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            str(time.time() + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True
+        )
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """Return True if the client wrote recently and must read from the primary."""
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency function for FastAPI to get a read-only database session.
+
+    Sessions are served by a healthy read replica when replicas are configured,
+    and by the primary otherwise, when every replica is unhealthy, or when the
+    client is pinned to the primary after a recent write.
+
+    Yields:
+        sqlalchemy.orm.Session: A SQLAlchemy session object.
+
+    Raises:
+        RuntimeError:
+            If the database has not been initialized via `init_db()`.
+
+    Example:
+        >>> @app.get("/items/")
+        ... def read_items(db: Session = Depends(get_read_db)):
+        ...     return db.query(Item).all()
+    """
+    if SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+
+    db = None
+    if read_router is not None and not is_pinned_to_primary(request):
+        db = read_router.session()
+    if db is None:
+        db = SessionLocal()
+    async with request_session(request, db):
+        yield db
@@ -0,0 +1,162 @@
+"""
+Statement Timeouts and Deadline Propagation
+
+This module bounds how long a request can keep a pooled connection busy:
+- Every request gets a deadline: now + its route's time budget (`time_budget()`), or
+  `DB_STATEMENT_TIMEOUT_MS` for routes without one, capped by an incoming
+  `X-Request-Deadline` header (absolute Unix time in seconds, e.g. "1760000000.25")
+  so upstream callers can pass on what is left of their own deadline.
+- When a request first begins a transaction on PostgreSQL, the time remaining until the
+  deadline becomes its statement timeout, or the request fails with 504 if none is left.
+  The timeout is set with `SET statement_timeout` once per checked-out connection, so
+  later transactions on it (e.g. a refresh after a commit) cost no extra round trip and
+  cannot fail after the request's writes committed. Connections checked out again later
+  in the request get the same timeout. It is reset when the connection is checked in, so
+  it never leaks to the next user of the pooled connection.
+- `watch_disconnect()` cancels the in-flight query server-side when the client goes
+  away, instead of finishing work nobody will read.
+
+Example:
+    >>> @router.get("/items", dependencies=[Depends(time_budget(2000))])
+    ... def list_items(db: Session = Depends(get_db)):
+    ...     ...
+
+Environment Variables:
+    DB_STATEMENT_TIMEOUT_MS    - Default budget for routes without `time_budget()`; 0 disables (default: 30000)
+    DB_DISCONNECT_POLL_SECONDS - How often to check whether the client is still connected (default: 0.5)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+DISCONNECT_POLL_SECONDS = float(os.getenv("DB_DISCONNECT_POLL_SECONDS", 0.5))
+DEADLINE_HEADER = "X-Request-Deadline"
+
+# Session info: the request's statement timeout. Connection info: the timeout in effect
+# on that connection during this checkout, and whether it must be reset on checkin.
+TIMEOUT_KEY = "statement_timeout_ms"
+RESET_KEY = "reset_statement_timeout"
+
+
+def time_budget(budget_ms: int):
+    """
+    Return a route dependency that gives the route `budget_ms` of database time.
+
+    Add it to the route's `dependencies` so it is resolved before the session dependency.
+    """
+    def set_budget(request: Request) -> None:
+        request.state.db_budget_ms = budget_ms
+    return set_budget
+
+
+def request_deadline(request: Request) -> Optional[float]:
+    """
+    Return the request's deadline as Unix time, or None when it has none.
+
+    Raises:
+        HTTPException: 400 for a malformed deadline header, 504 if the deadline has passed.
+    """
+    now = time.time()
+    candidates = []
+
+    budget_ms = getattr(request.state, "db_budget_ms", STATEMENT_TIMEOUT_MS)
+    if budget_ms > 0:
+        candidates.append(now + budget_ms / 1000)
+
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            candidates.append(float(header))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid {DEADLINE_HEADER} header: {header}")
+
+    if not candidates:
+        return None
+    deadline = min(candidates)
+    if deadline <= now:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    return deadline
+
+
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection) -> None:
+    """
+    Set the request's statement timeout on the connection unless it is already in effect (PostgreSQL only).
+
+    Raises:
+        HTTPException: 504 if the deadline passed before the request issued any SQL.
+    """
+    deadline = session.info.get("deadline")
+    if deadline is None or connection.dialect.name != "postgresql":
+        return
+    timeout_ms = session.info.get(TIMEOUT_KEY)
+    if timeout_ms is None:
+        timeout_ms = int((deadline - time.time()) * 1000)
+        if timeout_ms <= 0:
+            raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        session.info[TIMEOUT_KEY] = timeout_ms
+    if connection.info.get(TIMEOUT_KEY) != timeout_ms:
+        connection.exec_driver_sql(f"SET statement_timeout = {timeout_ms}")
+        connection.info[TIMEOUT_KEY] = timeout_ms
+        connection.info[RESET_KEY] = True
+
+
+@event.listens_for(Engine, "rollback")
+def forget_statement_timeout(connection) -> None:
+    """A rollback may undo the SET, so the next transaction on the connection sets it again."""
+    connection.info.pop(TIMEOUT_KEY, None)
+
+
+def _reset_statement_timeout(dbapi_connection) -> None:
+    # The pool has already rolled back: run RESET in autocommit, so it is not left in an
+    # open transaction (psycopg2 and psycopg both expose `autocommit`)
+    autocommit = dbapi_connection.autocommit
+    dbapi_connection.autocommit = True
+    try:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("RESET statement_timeout")
+        cursor.close()
+    finally:
+        dbapi_connection.autocommit = autocommit
+
+
+@event.listens_for(Pool, "checkin")
+def restore_statement_timeout(dbapi_connection, connection_record) -> None:
+    """Reset a statement timeout set during the checkout before the connection is reused."""
+    connection_record.info.pop(TIMEOUT_KEY, None)
+    if dbapi_connection is None or not connection_record.info.pop(RESET_KEY, False):
+        return
+    try:
+        _reset_statement_timeout(dbapi_connection)
+    except Exception as e:
+        logger.warning(f"Failed to reset statement_timeout, discarding connection: {str(e)}")
+        connection_record.invalidate(e)
+
+
+async def watch_disconnect(request: Request, driver_connection) -> None:
+    """
+    Cancel the query running on `driver_connection` once the client disconnects.
+
+    Runs until cancelled by the session dependency, which must await it before the
+    connection goes back to the pool so a late cancel cannot hit another request.
+    """
+    cancel = getattr(driver_connection, "cancel", None)
+    if cancel is None:
+        return
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+    logger.warning(f"Client disconnected from {request.url.path}, cancelling in-flight query")
+    await run_in_threadpool(cancel)
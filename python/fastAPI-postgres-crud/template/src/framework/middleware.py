@@ -10,6 +10,7 @@ from fastapi import Request
 from opentelemetry.sdk._logs import LoggingHandler
 from starlette.responses import StreamingResponse
 import json
+from framework import query_stats
 
 # Configure logger
 middleware_logger = logging.getLogger("middleware")
@@ -34,6 +35,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     - Log structured details for both the request and response.
     - Optionally parse JSON request/response bodies.
     - Append the `transaction_id` header to the HTTP response for correlation.
+    - Account for SQL statements and JSON rendering per request (see `framework.query_stats`),
+      emit a `Server-Timing` header, and warn when a request runs more than
+      `DB_QUERY_WARN_THRESHOLD` statements (a likely N+1 pattern).
 
     Logging fields include:
         - level: log severity (INFO/ERROR)
@@ -50,6 +54,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         - query_params: dictionary of query parameters
         - duration_seconds: request processing time (response only)
         - status: HTTP status code (response only)
+        - db_queries: number of SQL statements executed (response only)
+        - db_seconds: time spent executing SQL (response only)
+        - serialize_seconds: time spent rendering the JSON response (response only)
         - response_body: parsed JSON or raw string (response only)
         - exception: exception string (error cases)
         - stack_trace: traceback string (error cases)
@@ -70,8 +77,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             "query_params": {}
         }
 
-    Example response header:
+    Example response headers:
         transaction_id: f1a2c3d4-5678-90ab-cdef-1234567890ab
+        Server-Timing: db;dur=3.2;desc="2 queries", serialize;dur=0.1, total;dur=5.8
 
     Notes:
         - Numeric path segments are replaced with `{id}` to avoid logging sensitive or unique IDs.
@@ -82,6 +90,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         transaction_id = str(uuid.uuid4())
         start_time = time.time()
+        stats_token = query_stats.begin_request()
+        stats = query_stats.current_stats.get()
 
         path = request.url.path
         method = request.method
@@ -148,6 +158,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 "transaction_id": transaction_id,
                 "request_body": request_body
             })
+            query_stats.end_request(stats_token)
             raise e
 
         # Add transaction_id to response header
@@ -182,6 +193,24 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                     parsed_response_body = str(response_body)
 
         duration = time.time() - start_time
+        query_stats.end_request(stats_token)
+        response.headers["Server-Timing"] = stats.server_timing(duration)
+
+        if 0 < query_stats.QUERY_WARN_THRESHOLD < stats.queries:
+            middleware_logger.warning({
+                "level": "WARNING",
+                "event": "Excessive Queries",
+                "method": method,
+                "version": version,
+                "service": "${{values.app_name}}",
+                "endpoint": endpoint,
+                "path": path,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "db_queries": stats.queries,
+                "threshold": query_stats.QUERY_WARN_THRESHOLD,
+                "transaction_id": transaction_id
+            })
+
         middleware_logger.info({
             "level": "INFO",
             "event": "Response",
@@ -193,6 +222,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
             "duration_seconds": round(duration, 4),
             "status": response.status_code,
+            "db_queries": stats.queries,
+            "db_seconds": round(stats.db_seconds, 4),
+            "serialize_seconds": round(stats.serialize_seconds, 4),
             "transaction_id": transaction_id,
             "response_body": parsed_response_body
         })
@@ -0,0 +1,255 @@
+"""
+Time-Based Table Partitioning and Retention
+
+This module provides opt-in PostgreSQL declarative range partitioning for tables
+keyed on a timestamp column (e.g. `create_date`):
+- `partition_table_args()` adds `PARTITION BY RANGE (<column>)` to a model's table.
+- `ensure_partitions()` creates the current and upcoming partitions ahead of time, plus a
+  DEFAULT partition that catches rows outside them (e.g. when maintenance has not run for
+  longer than the premade intervals) instead of failing the INSERT. Rows that land there
+  are moved into their partition once it is created.
+- `drop_expired_partitions()` enforces retention by detaching and dropping whole
+  partitions, which is O(1) per partition instead of a mass DELETE followed by vacuum.
+- `run_maintenance()` does both for every partitioned table in `Base.metadata`.
+  It runs at startup and then every `DB_PARTITION_MAINTENANCE_SECONDS` in each replica
+  (serialized by an advisory lock), and can also be run on its own with:
+      python -m framework.partitioning
+
+Notes:
+    PostgreSQL requires primary keys and unique constraints on a partitioned table
+    to include the partition key. When partitioning is enabled, models therefore
+    add the timestamp column to their primary key, and single-column unique
+    constraints can only be enforced per partition (they become plain indexes).
+    Queries that do not filter on the partition key, such as lookups by `id`, cannot
+    be pruned and probe the index of every partition, so keep the partition count
+    bounded (monthly partitions, or a retention window).
+
+Environment Variables:
+    DB_PARTITIONING        - Set to "true" to partition tables (default: false)
+    DB_PARTITION_INTERVAL  - Partition width: "day" or "month" (default: month)
+    DB_PARTITION_PREMAKE   - Number of future partitions to keep created (default: 3)
+    DB_PARTITION_RETENTION - Number of past partitions to keep; 0 keeps all (default: 0)
+    DB_PARTITION_MAINTENANCE_SECONDS - Interval between in-process maintenance runs;
+                             0 only runs it at startup (default: 3600)
+"""
+
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta, UTC
+from typing import List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+PARTITIONING_ENABLED = os.getenv("DB_PARTITIONING", "false").lower() == "true"
+PARTITION_INTERVAL = os.getenv("DB_PARTITION_INTERVAL", "month")
+PARTITION_PREMAKE = int(os.getenv("DB_PARTITION_PREMAKE", 3))
+PARTITION_RETENTION = int(os.getenv("DB_PARTITION_RETENTION", 0))
+MAINTENANCE_INTERVAL = float(os.getenv("DB_PARTITION_MAINTENANCE_SECONDS", 3600))
+
+_NAME_FORMATS = {"day": "%Y%m%d", "month": "%Y%m"}
+
+
+def partition_table_args(column_name: str) -> dict:
+    """
+    Return `__table_args__` entries that range-partition a table on `column_name`.
+
+    Args:
+        column_name (str): Timestamp column used as the partition key.
+
+    Returns:
+        dict: Dialect options for `__table_args__`, empty when partitioning is disabled.
+    """
+    if not PARTITIONING_ENABLED:
+        return {}
+    return {"postgresql_partition_by": f"RANGE ({column_name})"}
+
+
+def partition_start(day: date, interval: str = None) -> date:
+    """Return the first day of the partition containing `day`."""
+    interval = interval or PARTITION_INTERVAL
+    if interval == "day":
+        return day
+    if interval == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+
+def shift_partition(start: date, count: int, interval: str = None) -> date:
+    """Return the start of the partition `count` intervals after (or before) `start`."""
+    interval = interval or PARTITION_INTERVAL
+    if interval == "day":
+        return start + timedelta(days=count)
+    if interval == "month":
+        months = start.year * 12 + (start.month - 1) + count
+        return date(months // 12, months % 12 + 1, 1)
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+
+def partition_name(table_name: str, start: date, interval: str = None) -> str:
+    """Return the child table name for the partition starting at `start`."""
+    interval = interval or PARTITION_INTERVAL
+    return f"{table_name}_p{start.strftime(_NAME_FORMATS[interval])}"
+
+
+def parse_partition_name(table_name: str, name: str, interval: str = None) -> Optional[date]:
+    """Return the start date encoded in a partition name, or None if it is not one of ours."""
+    interval = interval or PARTITION_INTERVAL
+    prefix = f"{table_name}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], _NAME_FORMATS[interval]).date()
+    except ValueError:
+        return None
+
+
+def default_partition_name(table_name: str) -> str:
+    """Return the name of the DEFAULT partition of `table_name`."""
+    return f"{table_name}_default"
+
+
+def partition_column(table) -> str:
+    """Return the partition key column of a table declared with `RANGE (<column>)`."""
+    match = re.fullmatch(r"RANGE \((\w+)\)", table.dialect_options["postgresql"]["partition_by"])
+    if match is None:
+        raise ValueError(f"Unsupported partitioning for {table.name}")
+    return match.group(1)
+
+
+def partitioned_tables(metadata) -> list:
+    """Return the tables in `metadata` declared with `postgresql_partition_by`."""
+    return [
+        table for table in metadata.sorted_tables
+        if table.dialect_options["postgresql"].get("partition_by")
+    ]
+
+
+def ensure_partitions(connection, table_name: str, column: str, today: date = None,
+                      premake: int = None, interval: str = None) -> List[str]:
+    """
+    Create the DEFAULT partition, the current partition and the next `premake` partitions if missing.
+
+    PostgreSQL refuses to create a partition while the DEFAULT partition holds rows in
+    its range, so such rows are moved: the DEFAULT partition is detached, the new
+    partition created, the rows re-inserted through the parent, and DEFAULT reattached.
+
+    Args:
+        connection: SQLAlchemy connection (PostgreSQL).
+        table_name (str): Partitioned parent table.
+        column (str): Partition key column.
+        today (date, optional): Reference date (default: today, UTC).
+        premake (int, optional): Future partitions to create (default: `DB_PARTITION_PREMAKE`).
+        interval (str, optional): "day" or "month" (default: `DB_PARTITION_INTERVAL`).
+
+    Returns:
+        list[str]: Names of the partitions ensured.
+    """
+    today = today or datetime.now(UTC).date()
+    premake = PARTITION_PREMAKE if premake is None else premake
+    start = partition_start(today, interval)
+
+    default = default_partition_name(table_name)
+    connection.execute(text(f'CREATE TABLE IF NOT EXISTS "{default}" PARTITION OF "{table_name}" DEFAULT'))
+
+    names = []
+    for offset in range(premake + 1):
+        lower = shift_partition(start, offset, interval)
+        upper = shift_partition(lower, 1, interval)
+        name = partition_name(table_name, lower, interval)
+        names.append(name)
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+
+        in_range = f'"{column}" >= :lower AND "{column}" < :upper'
+        bounds = {"lower": lower, "upper": upper}
+        stray = connection.execute(
+            text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_range})'), bounds
+        ).scalar()
+        if stray:
+            connection.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{default}"'))
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table_name}" '
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        if stray:
+            connection.execute(text(
+                f'WITH moved AS (DELETE FROM "{default}" WHERE {in_range} RETURNING *) '
+                f'INSERT INTO "{table_name}" SELECT * FROM moved'
+            ), bounds)
+            connection.execute(text(f'ALTER TABLE "{table_name}" ATTACH PARTITION "{default}" DEFAULT'))
+            logger.warning(f"Moved rows of {name} out of {default}")
+    return names
+
+
+def drop_expired_partitions(connection, table_name: str, today: date = None,
+                            retention: int = None, interval: str = None) -> List[str]:
+    """
+    Detach and drop partitions older than the retention window.
+
+    A partition is expired when it ends on or before the start of the oldest
+    retained partition (`retention` intervals before the current one).
+
+    Args:
+        connection: SQLAlchemy connection (PostgreSQL).
+        table_name (str): Partitioned parent table.
+        today (date, optional): Reference date (default: today, UTC).
+        retention (int, optional): Past partitions to keep; 0 keeps all (default: `DB_PARTITION_RETENTION`).
+        interval (str, optional): "day" or "month" (default: `DB_PARTITION_INTERVAL`).
+
+    Returns:
+        list[str]: Names of the partitions dropped.
+    """
+    retention = PARTITION_RETENTION if retention is None else retention
+    if retention <= 0:
+        return []
+
+    today = today or datetime.now(UTC).date()
+    cutoff = shift_partition(partition_start(today, interval), -retention, interval)
+
+    children = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": table_name}).scalars().all()
+
+    dropped = []
+    for name in sorted(children):
+        start = parse_partition_name(table_name, name, interval)
+        if start is None or shift_partition(start, 1, interval) > cutoff:
+            continue
+        connection.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{name}"'))
+        connection.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append(name)
+    return dropped
+
+
+def run_maintenance(engine, metadata) -> None:
+    """
+    Create upcoming partitions and drop expired ones for every partitioned table.
+
+    Does nothing unless partitioning is enabled and the engine is PostgreSQL. Each table
+    is maintained in one transaction under an advisory lock, so replicas running this
+    at the same time take turns.
+
+    Args:
+        engine: SQLAlchemy engine.
+        metadata: `MetaData` holding the model tables (usually `Base.metadata`).
+    """
+    if not PARTITIONING_ENABLED or engine.dialect.name != "postgresql":
+        return
+
+    for table in partitioned_tables(metadata):
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": table.name})
+            created = ensure_partitions(connection, table.name, partition_column(table))
+            dropped = drop_expired_partitions(connection, table.name)
+        logger.info(f"Partition maintenance for {table.name}: ensured {created}, dropped {dropped}")
+
+
+if __name__ == "__main__":
+    import framework.db
+    framework.db.init_db()
+    run_maintenance(framework.db.engine, framework.db.Base.metadata)
@@ -0,0 +1,194 @@
+"""
+Connection Pool Telemetry and Admission Control
+
+This module provides:
+- `PoolMetrics`, which tracks checkout wait times (histogram and moving average),
+  in-use and overflow gauges, and checkout timeouts for one SQLAlchemy pool.
+- `instrument_engine()`, which attaches pool event listeners to an engine and
+  registers its metrics for the metrics endpoint.
+- `checkout_connection()`, which acquires a session's connection while timing the
+  wait and, when an admission budget is set, fails fast with 503 + `Retry-After`
+  instead of letting requests queue for up to `pool_timeout` seconds.
+
+Environment Variables:
+    DB_ADMISSION_BUDGET_MS - Reject requests when the pool is exhausted and the estimated
+                             checkout wait exceeds this many milliseconds; 0 disables (default: 0)
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+ADMISSION_BUDGET_MS = float(os.getenv("DB_ADMISSION_BUDGET_MS", 0))
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Weight of the newest sample in the moving average of checkout waits
+EWMA_ALPHA = 0.2
+
+# pool -> metrics, for every instrumented engine
+registry: Dict[object, "PoolMetrics"] = {}
+
+
+class PoolMetrics:
+    """
+    Checkout telemetry for a single connection pool.
+
+    Args:
+        name (str): Label used on the metrics endpoint (e.g. "primary", "replica-0").
+        pool: The SQLAlchemy pool being measured.
+    """
+
+    def __init__(self, name: str, pool):
+        self.name = name
+        self.pool = pool
+        # Pools without a fixed size (e.g. StaticPool, NullPool) never report saturation
+        self.capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0) if hasattr(pool, "size") else None
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_ewma_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def observe_wait(self, seconds: float) -> None:
+        """Record how long one checkout waited for a connection."""
+        wait_ms = seconds * 1000
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_buckets[index] += 1
+            self.wait_ewma_ms += EWMA_ALPHA * (wait_ms - self.wait_ewma_ms)
+
+    def record_timeout(self, seconds: float) -> None:
+        """Record a checkout that gave up after `seconds`."""
+        with self._lock:
+            self.timeouts += 1
+        self.observe_wait(seconds)
+
+    def record_rejection(self) -> None:
+        """Record a request turned away by admission control."""
+        with self._lock:
+            self.rejected += 1
+
+    def estimated_wait_ms(self) -> float:
+        """Estimate how long a new checkout would wait: zero while the pool has spare capacity."""
+        if self.capacity is None or self.in_use < self.capacity:
+            return 0.0
+        return self.wait_ewma_ms
+
+    def snapshot(self) -> dict:
+        """Return the current metrics as a JSON-serializable dict."""
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(list(WAIT_BUCKETS_MS) + ["+Inf"], self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "capacity": self.capacity,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "overflow": max(self.pool.overflow(), 0) if hasattr(self.pool, "overflow") else 0,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "checkout_wait_ms": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                    "ewma": round(self.wait_ewma_ms, 3),
+                    "buckets": buckets,
+                },
+            }
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """
+    Attach pool event listeners to `engine` and register its metrics.
+
+    Args:
+        engine: SQLAlchemy engine.
+        name (str): Label for the metrics endpoint.
+
+    Returns:
+        PoolMetrics: The metrics object for the engine's pool.
+    """
+    for pool, existing in list(registry.items()):
+        if existing.name == name:
+            del registry[pool]
+
+    metrics = PoolMetrics(name, engine.pool)
+    event.listen(engine.pool, "checkout", metrics.on_checkout)
+    event.listen(engine.pool, "checkin", metrics.on_checkin)
+    registry[engine.pool] = metrics
+    return metrics
+
+
+def checkout_connection(db: Session, budget_ms: Optional[float] = None) -> None:
+    """
+    Check out the session's connection, timing the wait and applying admission control.
+
+    Sessions bound to engines that were not instrumented are left untouched and
+    connect lazily as usual.
+
+    Args:
+        db (Session): Session about to be used by a request.
+        budget_ms (float, optional): Admission budget (default: `DB_ADMISSION_BUDGET_MS`).
+
+    Raises:
+        HTTPException: 503 with `Retry-After` when the pool is exhausted and the
+            estimated wait exceeds the budget, or when the checkout times out.
+    """
+    metrics = registry.get(getattr(db.get_bind(), "pool", None))
+    if metrics is None:
+        return
+
+    budget_ms = ADMISSION_BUDGET_MS if budget_ms is None else budget_ms
+    if budget_ms > 0:
+        estimated = metrics.estimated_wait_ms()
+        if estimated > budget_ms:
+            metrics.record_rejection()
+            raise HTTPException(
+                status_code=503,
+                detail="Database connection pool saturated, retry later",
+                headers={"Retry-After": str(max(1, math.ceil(estimated / 1000)))}
+            )
+
+    start = time.perf_counter()
+    try:
+        db.connection()
+    except PoolTimeoutError:
+        metrics.record_timeout(time.perf_counter() - start)
+        raise HTTPException(
+            status_code=503,
+            detail="Timed out waiting for a database connection",
+            headers={"Retry-After": "1"}
+        )
+    metrics.observe_wait(time.perf_counter() - start)
+
+
+def snapshot_all() -> dict:
+    """Return metrics for every instrumented pool, keyed by name."""
+    return {metrics.name: metrics.snapshot() for metrics in list(registry.values())}
@@ -0,0 +1,118 @@
+"""
+Per-Request SQL Accounting
+
+This module attributes database work to the request that caused it:
+- `instrument_queries()` attaches `before/after_cursor_execute` hooks to an engine
+  that add each statement's count and duration to the current request's stats.
+  These are the only statement timing hooks: other consumers (e.g. the slow-query
+  log) register with `add_statement_observer()` and receive the measured duration.
+- `TimedJSONResponse` records how long JSON rendering of the response took.
+- `begin_request()` / `end_request()` install and remove the stats for a request.
+  `LoggingMiddleware` uses them to add the numbers to its Response log record and
+  to emit a `Server-Timing` header, e.g.:
+      Server-Timing: db;dur=12.4;desc="3 queries", serialize;dur=0.6, total;dur=18.9
+
+The stats live in a context variable holding a mutable object, so work done in
+threadpool-executed dependencies and endpoints (which run in a copy of the context)
+is still visible to the middleware.
+
+Environment Variables:
+    DB_QUERY_WARN_THRESHOLD - Log an N+1 warning when a request runs more than this
+                              many statements; 0 disables (default: 20)
+"""
+
+import os
+import time
+from contextvars import ContextVar, Token
+from typing import Callable, List, Optional
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+
+QUERY_WARN_THRESHOLD = int(os.getenv("DB_QUERY_WARN_THRESHOLD", 20))
+
+
+class RequestQueryStats:
+    """Statement count and timings accumulated for one request."""
+
+    __slots__ = ("queries", "db_seconds", "serialize_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Return a `Server-Timing` header value for these stats."""
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}, "
+            f"total;dur={total_seconds * 1000:.1f}"
+        )
+
+
+current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def begin_request() -> Token:
+    """Start accounting for a new request in the current context."""
+    return current_stats.set(RequestQueryStats())
+
+
+def end_request(token: Token) -> None:
+    """Stop accounting for the request started with `begin_request()`."""
+    current_stats.reset(token)
+
+
+# Called as observer(conn, statement, parameters, executemany, seconds) after every
+# statement on an instrumented engine
+_observers: List[Callable] = []
+
+
+def add_statement_observer(observer: Callable) -> None:
+    """Have `observer` called with the duration of every statement timed by these hooks (idempotent)."""
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += duration
+    for observer in _observers:
+        observer(conn, statement, parameters, executemany, duration)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time so
+    # it does not stay in the pooled connection's info
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+
+def instrument_queries(engine) -> None:
+    """Attach the per-request accounting hooks to `engine` (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class TimedJSONResponse(JSONResponse):
+    """`JSONResponse` that adds its rendering time to the current request's stats."""
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+        stats = current_stats.get()
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - start
+        return body
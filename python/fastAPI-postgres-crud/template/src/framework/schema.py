@@ -0,0 +1,159 @@
+"""
+Schema Management with Versioned Migrations and Fingerprinting
+
+Running `Base.metadata.create_all` on every pod start reflects every table against
+the catalog, which adds noticeable time to cold starts. This module instead:
+- Computes a fingerprint (SHA-256) of the DDL for all model tables plus the list of
+  versioned migrations.
+- Compares it with the fingerprint stored in the database using a single query.
+- Only when they differ, takes a transaction-scoped PostgreSQL advisory lock (so a
+  single replica does the work), creates missing tables, applies pending
+  migrations in version order, and stores the new fingerprint.
+
+Migrations are `(version, description, [sql, ...])` tuples in `MIGRATIONS`. Append
+new entries with increasing versions; never edit or reorder applied ones. Write
+statements idempotently (e.g. `ADD COLUMN IF NOT EXISTS`), since databases created
+after a migration was added already have its effects from `create_all`.
+
+Environment Variables:
+    DB_SCHEMA_MODE - "fingerprint" (default), "create_all" (always run create_all),
+                     or "none" (schema is managed externally)
+"""
+
+import hashlib
+import logging
+import os
+from datetime import datetime, UTC
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "fingerprint")
+
+# Arbitrary constant identifying this application's schema lock
+ADVISORY_LOCK_KEY = 7_240_531_633
+
+Migration = Tuple[int, str, Sequence[str]]
+
+MIGRATIONS: List[Migration] = [
+    (1, "Add version column for optimistic concurrency", [
+        'ALTER TABLE "${{values.app_name}}" ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1',
+    ]),
+]
+
+# Bookkeeping tables live outside Base.metadata so they never affect the fingerprint
+schema_metadata = MetaData()
+
+schema_fingerprint_table = Table(
+    "schema_fingerprint", schema_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+schema_migrations_table = Table(
+    "schema_migrations", schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def schema_fingerprint(metadata, dialect, migrations: Sequence[Migration] = None) -> str:
+    """
+    Return a SHA-256 fingerprint of the model DDL and the migration list.
+
+    Args:
+        metadata: `MetaData` holding the model tables (usually `Base.metadata`).
+        dialect: SQLAlchemy dialect used to compile the DDL.
+        migrations (list, optional): Versioned migrations (default: `MIGRATIONS`).
+
+    Returns:
+        str: Hex digest identifying the expected schema.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    digest = hashlib.sha256()
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for version, description, statements in migrations:
+        digest.update(f"{version}:{description}:{'|'.join(statements)}".encode())
+    return digest.hexdigest()
+
+
+def stored_fingerprint(connection) -> Optional[str]:
+    """Return the stored fingerprint, or None if there is none yet."""
+    try:
+        with connection.begin_nested() if connection.in_transaction() else connection.begin():
+            return connection.execute(
+                select(schema_fingerprint_table.c.fingerprint).where(schema_fingerprint_table.c.id == 1)
+            ).scalar()
+    except DBAPIError:
+        # Bookkeeping table does not exist yet
+        return None
+
+
+def ensure_schema(engine, metadata, migrations: Sequence[Migration] = None, mode: str = None) -> bool:
+    """
+    Bring the database schema up to date, skipping all DDL when it already is.
+
+    Args:
+        engine: SQLAlchemy engine.
+        metadata: `MetaData` holding the model tables (usually `Base.metadata`).
+        migrations (list, optional): Versioned migrations (default: `MIGRATIONS`).
+        mode (str, optional): Overrides `DB_SCHEMA_MODE`.
+
+    Returns:
+        bool: True if DDL was run, False if the schema was already current.
+    """
+    mode = mode or SCHEMA_MODE
+    migrations = MIGRATIONS if migrations is None else migrations
+
+    if mode == "none":
+        return False
+    if mode == "create_all":
+        metadata.create_all(bind=engine)
+        return True
+    if mode != "fingerprint":
+        raise ValueError(f"Unsupported DB_SCHEMA_MODE: {mode}")
+
+    expected = schema_fingerprint(metadata, engine.dialect, migrations)
+    with engine.connect() as connection:
+        if stored_fingerprint(connection) == expected:
+            logger.info("Database schema fingerprint matches, skipping schema creation")
+            return False
+
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Released automatically at commit; other replicas wait here, then re-check
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            if stored_fingerprint(connection) == expected:
+                logger.info("Database schema was updated by another replica")
+                return False
+
+        metadata.create_all(bind=connection)
+        schema_metadata.create_all(bind=connection)
+
+        applied = set(connection.execute(select(schema_migrations_table.c.version)).scalars())
+        for version, description, statements in sorted(migrations, key=lambda m: m[0]):
+            if version in applied:
+                continue
+            logger.info(f"Applying migration {version}: {description}")
+            for statement in statements:
+                connection.execute(text(statement))
+            connection.execute(insert(schema_migrations_table).values(
+                version=version, description=description, applied_at=datetime.now(UTC)
+            ))
+
+        connection.execute(delete(schema_fingerprint_table))
+        connection.execute(insert(schema_fingerprint_table).values(
+            id=1, fingerprint=expected, updated_at=datetime.now(UTC)
+        ))
+
+    logger.info(f"Database schema updated to fingerprint {expected[:12]}")
+    return True
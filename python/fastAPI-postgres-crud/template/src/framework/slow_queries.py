@@ -0,0 +1,201 @@
+"""
+Slow-Query Log with Automatic EXPLAIN Capture
+
+This module finds query shapes that regress as tables grow, without enabling
+PostgreSQL-wide statement logging:
+- `instrument_slow_queries()` flags an engine's statements slower than
+  `DB_SLOW_QUERY_MS`, using the durations measured by `framework.query_stats`.
+- Flagged statements are normalized (literals replaced by `?`, whitespace collapsed)
+  and aggregated per shape in a bounded in-memory `SlowQueryStore`.
+- For PostgreSQL, an `EXPLAIN (FORMAT JSON)` of the statement with its original
+  parameters is captured by a background thread, at most once per shape every
+  `DB_SLOW_QUERY_EXPLAIN_INTERVAL` seconds. The request path only enqueues work;
+  when the queue is full the EXPLAIN is skipped. Literals (the bound values, which
+  may be user data) are replaced by `?` in the stored plan.
+
+Environment Variables:
+    DB_SLOW_QUERY_MS               - Latency threshold in milliseconds; 0 disables (default: 200)
+    DB_SLOW_QUERY_MAX_ENTRIES      - Distinct statement shapes kept (default: 100)
+    DB_SLOW_QUERY_EXPLAIN_INTERVAL - Minimum seconds between EXPLAINs of one shape (default: 300)
+"""
+
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from framework.query_stats import add_statement_observer, instrument_queries
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+SLOW_QUERY_MAX_ENTRIES = int(os.getenv("DB_SLOW_QUERY_MAX_ENTRIES", 100))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("DB_SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+
+# Pending EXPLAINs; bounded so a burst of slow queries cannot build up memory
+EXPLAIN_QUEUE_SIZE = 16
+
+# Execution option that excludes a statement (e.g. our own EXPLAINs) from the log
+SKIP_OPTION = "skip_slow_query_log"
+# Execution option set on instrumented engines
+LOG_OPTION = "slow_query_log"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Return the shape of a statement: literals become `?` and IN lists collapse."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _IN_LIST.sub("IN (?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class SlowQueryStore:
+    """
+    Bounded aggregate of slow statements keyed by normalized SQL.
+
+    When full, the shape with the smallest total time is evicted to make room.
+
+    Args:
+        max_entries (int): Distinct statement shapes kept.
+    """
+
+    def __init__(self, max_entries: int = SLOW_QUERY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, duration_ms: float) -> bool:
+        """
+        Add one slow execution of `sql`.
+
+        Returns:
+            bool: True if the shape has no plan captured within the EXPLAIN interval.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(sql)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    coldest = min(self._entries, key=lambda key: self._entries[key]["total_ms"])
+                    del self._entries[coldest]
+                entry = self._entries[sql] = {
+                    "sql": sql, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "last_seen": None, "plan": None, "explained_at": 0.0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = now
+            if now - entry["explained_at"] < SLOW_QUERY_EXPLAIN_INTERVAL:
+                return False
+            # Claim the slot now so concurrent executions do not queue duplicate EXPLAINs
+            entry["explained_at"] = now
+            return True
+
+    def set_plan(self, sql: str, plan) -> None:
+        with self._lock:
+            entry = self._entries.get(sql)
+            if entry is not None:
+                entry["plan"] = plan
+
+    def top(self, limit: int = 10) -> List[dict]:
+        """Return the `limit` shapes with the highest total time."""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e["total_ms"], reverse=True)[:limit]
+            return [
+                {
+                    "sql": e["sql"],
+                    "count": e["count"],
+                    "total_ms": round(e["total_ms"], 3),
+                    "mean_ms": round(e["total_ms"] / e["count"], 3),
+                    "max_ms": round(e["max_ms"], 3),
+                    "last_seen": e["last_seen"],
+                    "plan": e["plan"],
+                }
+                for e in entries
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+store = SlowQueryStore()
+
+_explain_queue: "queue.Queue" = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+
+def scrub_plan(plan):
+    """Return `plan` with literals in its text fields (e.g. `Filter`, `Index Cond`) replaced by `?`."""
+    if isinstance(plan, dict):
+        return {key: scrub_plan(value) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [scrub_plan(value) for value in plan]
+    if isinstance(plan, str):
+        return normalize_sql(plan)
+    return plan
+
+
+def explain(engine, statement: str, parameters) -> Optional[list]:
+    """Return the `EXPLAIN (FORMAT JSON)` plan of a statement, without literals (PostgreSQL only)."""
+    if engine.dialect.name != "postgresql":
+        return None
+    with engine.connect().execution_options(**{SKIP_OPTION: True}) as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        connection.rollback()
+    return scrub_plan(plan)
+
+
+def _explain_worker() -> None:
+    while True:
+        engine, sql, statement, parameters = _explain_queue.get()
+        try:
+            store.set_plan(sql, explain(engine, statement, parameters))
+        except Exception as e:
+            logger.warning(f"Failed to EXPLAIN slow query: {str(e)}")
+        finally:
+            _explain_queue.task_done()
+
+
+def _schedule_explain(engine, sql: str, statement: str, parameters) -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_explain_worker, name="slow-query-explain", daemon=True)
+            _worker.start()
+    try:
+        _explain_queue.put_nowait((engine, sql, statement, parameters))
+    except queue.Full:
+        pass
+
+
+def _observe_statement(conn, statement, parameters, executemany, seconds):
+    duration_ms = seconds * 1000
+    if SLOW_QUERY_MS <= 0 or duration_ms < SLOW_QUERY_MS:
+        return
+    options = conn.get_execution_options()
+    if not options.get(LOG_OPTION) or options.get(SKIP_OPTION):
+        return
+
+    sql = normalize_sql(statement)
+    logger.warning(f"Slow query ({duration_ms:.1f} ms): {sql}")
+    # executemany batches have no single parameter set to EXPLAIN with
+    if store.record(sql, duration_ms) and not executemany:
+        _schedule_explain(conn.engine, sql, statement, parameters)
+
+
+def instrument_slow_queries(engine) -> None:
+    """Log `engine`'s slow statements, timed by the `framework.query_stats` hooks (idempotent)."""
+    instrument_queries(engine)
+    engine.update_execution_options(**{LOG_OPTION: True})
+    add_statement_observer(_observe_statement)
@@ -3,12 +3,13 @@ ${{values.app_name_capitalized}} Model and Pydantic Schema
 
 This module defines:
 - The SQLAlchemy ORM model for persisting ${{values.app_name_capitalized}} data.
-- The Pydantic schema for validating API requests when creating a ${{values.app_name_capitalized}}.
+- The Pydantic schemas for validating API requests when creating or updating a ${{values.app_name_capitalized}}.
 
 """
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Integer, String, text
 from framework.db import Base
+from framework.partitioning import PARTITIONING_ENABLED, partition_table_args
 from datetime import datetime, UTC
 from pydantic import BaseModel
 from typing import Optional
@@ -25,24 +26,32 @@ class ${{values.app_name_capitalized}}(Base):
         full_name (str | None): Optional full name of the user, up to 100 characters.
         create_date (datetime): Timestamp when the record was created (UTC).
         update_date (datetime): Timestamp when the record was last updated (UTC).
+        version (int): Row version for optimistic concurrency, starting at 1.
 
     Notes:
         - `create_date` is automatically set when the record is created.
         - `update_date` is automatically updated whenever the record changes.
+        - `version` is incremented by every update; updates may require the
+          caller's expected version to match (see the PUT/PATCH endpoints).
+        - With `DB_PARTITIONING=true` the table is range-partitioned on `create_date`,
+          which then joins the primary key, and `username`/`email` uniqueness can
+          no longer be enforced by the database (see `framework.partitioning`).
     """
 
     __tablename__ = "${{values.app_name}}"
+    __table_args__ = partition_table_args("create_date")
 
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, nullable=False, index=True)
-    email = Column(String(120), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    username = Column(String(50), unique=not PARTITIONING_ENABLED, nullable=False, index=True)
+    email = Column(String(120), unique=not PARTITIONING_ENABLED, nullable=False, index=True)
     full_name = Column(String(100), nullable=True)
-    create_date = Column(DateTime, default=lambda: datetime.now(UTC))
+    create_date = Column(DateTime, primary_key=PARTITIONING_ENABLED, default=lambda: datetime.now(UTC))
     update_date = Column(
         DateTime,
         default=lambda: datetime.now(UTC),
         onupdate=lambda: datetime.now(UTC)  # auto-update on change
     )
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
 
     def __repr__(self):
         """
@@ -73,3 +82,23 @@ class ${{values.app_name_capitalized}}Create(BaseModel):
     username: str
     email: str
     full_name: Optional[str] = None
+
+
+class ${{values.app_name_capitalized}}Update(${{values.app_name_capitalized}}Create):
+    """
+    Pydantic schema for updating an existing ${{values.app_name_capitalized}}.
+
+    Attributes:
+        version (int | None): Optional expected row version. When provided (or sent
+            as an `If-Match` header), the update only succeeds if the stored
+            version still matches.
+
+    Example:
+        {
+            "username": "johndoe",
+            "email": "john@example.com",
+            "full_name": "John Doe",
+            "version": 3
+        }
+    """
+    version: Optional[int] = None
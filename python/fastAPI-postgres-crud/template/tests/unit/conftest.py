@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-from framework.db import Base, get_db
+from framework.db import Base, get_db, get_read_db
 from framework import db as db_module
 
 
@@ -12,6 +12,7 @@ from framework import db as db_module
 os.environ["TESTING"] = "true"
 
 from app import app
+from api.${{values.app_name}} import get_create_db
 
 
 
@@ -59,6 +60,8 @@ def client(db_session):
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_create_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -0,0 +1,146 @@
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from app import app
+from api import ${{values.app_name}} as ${{values.app_name}}_api
+from framework import db as db_module
+from framework import pool_metrics
+from framework.db import Base
+from framework.coalescing import WriteCoalescer, coalescer_from_env
+from models.${{values.app_name}} import ${{values.app_name_capitalized}}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'coalesce.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _submit_concurrently(coalescer, rows):
+    results = [None] * len(rows)
+    barrier = threading.Barrier(len(rows))
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = coalescer.submit(rows[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(rows))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_single_submit_returns_row(session_factory):
+    coalescer = WriteCoalescer(${{values.app_name_capitalized}}.__table__, session_factory, window_ms=1)
+    record = coalescer.submit({"username": "solo", "email": "solo@example.com"})
+    assert record["id"] is not None
+    assert record["username"] == "solo"
+    assert coalescer.stats["batches"] == 1
+
+
+def test_concurrent_submits_are_batched(session_factory):
+    coalescer = WriteCoalescer(${{values.app_name_capitalized}}.__table__, session_factory, window_ms=50, max_rows=100)
+    rows = [{"username": f"user{i}", "email": f"user{i}@example.com"} for i in range(20)]
+    results = _submit_concurrently(coalescer, rows)
+
+    assert [r["username"] for r in results] == [row["username"] for row in rows]
+    assert len({r["id"] for r in results}) == 20
+    assert coalescer.stats["rows"] == 20
+    assert coalescer.stats["batches"] < 20
+
+
+def test_max_rows_caps_batch_size(session_factory):
+    coalescer = WriteCoalescer(${{values.app_name_capitalized}}.__table__, session_factory, window_ms=50, max_rows=4)
+    rows = [{"username": f"cap{i}", "email": f"cap{i}@example.com"} for i in range(10)]
+    results = _submit_concurrently(coalescer, rows)
+
+    assert all(isinstance(r, dict) for r in results)
+    assert coalescer.stats["max_batch"] <= 4
+
+
+def test_constraint_error_is_isolated_to_its_caller(session_factory):
+    coalescer = WriteCoalescer(${{values.app_name_capitalized}}.__table__, session_factory, window_ms=50, max_rows=100)
+    coalescer.submit({"username": "taken", "email": "taken@example.com"})
+
+    rows = [
+        {"username": "fresh1", "email": "fresh1@example.com"},
+        {"username": "taken", "email": "other@example.com"},
+        {"username": "fresh2", "email": "fresh2@example.com"},
+    ]
+    results = _submit_concurrently(coalescer, rows)
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    records = [r for r in results if isinstance(r, dict)]
+    assert len(errors) == 1 and isinstance(errors[0], IntegrityError)
+    assert sorted(r["username"] for r in records) == ["fresh1", "fresh2"]
+
+    with session_factory() as session:
+        assert session.query(${{values.app_name_capitalized}}).count() == 3
+
+
+def test_coalescer_from_env(monkeypatch):
+    monkeypatch.delenv("DB_WRITE_COALESCE", raising=False)
+    assert coalescer_from_env(${{values.app_name_capitalized}}.__table__) is None
+
+    monkeypatch.setenv("DB_WRITE_COALESCE", "true")
+    monkeypatch.setenv("DB_WRITE_COALESCE_WINDOW_MS", "5")
+    monkeypatch.setenv("DB_WRITE_COALESCE_MAX_ROWS", "16")
+    coalescer = coalescer_from_env(${{values.app_name_capitalized}}.__table__)
+    assert coalescer.window == pytest.approx(0.005)
+    assert coalescer.max_rows == 16
+
+
+def test_coalesced_creates_do_not_exhaust_a_small_pool(tmp_path, monkeypatch):
+    """Requests waiting on the batch leader hold no connection, so the leader can always get one."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'small_pool.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=1
+    )
+    Base.metadata.create_all(bind=engine)
+    pool_metrics.instrument_engine(engine, "coalesce-test")
+    monkeypatch.setattr(db_module, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    coalescer = WriteCoalescer(${{values.app_name_capitalized}}.__table__, window_ms=100, max_rows=100)
+    monkeypatch.setattr(${{values.app_name}}_api, "write_coalescer", coalescer)
+
+    requests = 8
+    statuses = [None] * requests
+    barrier = threading.Barrier(requests)
+    with TestClient(app) as client:
+        def worker(i):
+            barrier.wait()
+            statuses[i] = client.post("/api/v1/${{values.app_name}}", json={
+                "username": f"pool{i}",
+                "email": f"pool{i}@example.com"
+            }).status_code
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(requests)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    try:
+        assert statuses == [200] * requests
+        assert coalescer.stats["rows"] == requests
+        assert pool_metrics.registry[engine.pool].timeouts == 0
+    finally:
+        pool_metrics.registry.pop(engine.pool, None)
+        engine.dispose()
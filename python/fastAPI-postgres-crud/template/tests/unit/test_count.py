@@ -0,0 +1,92 @@
+import uuid
+from unittest.mock import MagicMock
+import pytest
+from framework import counting
+
+
+@pytest.fixture(autouse=True)
+def clear_count_cache():
+    """Each test starts with an empty count cache."""
+    counting._count_cache.clear()
+    yield
+    counting._count_cache.clear()
+
+
+def _create(client, n):
+    for _ in range(n):
+        name = f"count_{uuid.uuid4().hex[:12]}"
+        response = client.post("/api/v1/${{values.app_name}}", json={
+            "username": name,
+            "email": f"{name}@example.com"
+        })
+        assert response.status_code == 200
+
+
+def test_count_exact(client):
+    """Exact mode returns the number of stored records."""
+    before = client.get("/api/v1/${{values.app_name}}/count").json()["count"]
+    _create(client, 3)
+    response = client.get("/api/v1/${{values.app_name}}/count")
+    assert response.status_code == 200
+    assert response.json() == {"count": before + 3, "mode": "exact"}
+
+
+def test_count_estimate_falls_back_on_non_postgres(client):
+    """Estimate mode uses the exact count when pg_class statistics are unavailable."""
+    _create(client, 2)
+    exact = client.get("/api/v1/${{values.app_name}}/count?mode=exact").json()["count"]
+    response = client.get("/api/v1/${{values.app_name}}/count?mode=estimate")
+    assert response.status_code == 200
+    assert response.json() == {"count": exact, "mode": "estimate"}
+
+
+def test_count_invalid_mode(client):
+    """Unknown modes are rejected by validation."""
+    response = client.get("/api/v1/${{values.app_name}}/count?mode=bogus")
+    assert response.status_code == 422
+
+
+def test_count_cache_invalidated_on_create(client):
+    """A create invalidates the cached exact count."""
+    before = client.get("/api/v1/${{values.app_name}}/count").json()["count"]
+    _create(client, 1)
+    assert client.get("/api/v1/${{values.app_name}}/count").json()["count"] == before + 1
+
+
+def test_exact_count_uses_cache(db_session):
+    """Within the TTL the cached value is returned without re-counting."""
+    from models.${{values.app_name}} import ${{values.app_name_capitalized}}
+    before = counting.exact_count(db_session, ${{values.app_name_capitalized}}, ttl=60)
+    db_session.add(${{values.app_name_capitalized}}(username=uuid.uuid4().hex[:12], email=f"{uuid.uuid4().hex[:12]}@example.com"))
+    db_session.flush()
+    assert counting.exact_count(db_session, ${{values.app_name_capitalized}}, ttl=60) == before
+    counting.invalidate_count(${{values.app_name_capitalized}})
+    assert counting.exact_count(db_session, ${{values.app_name_capitalized}}, ttl=60) == before + 1
+
+
+def _postgres_session(reltuples):
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.execute.return_value.scalar.return_value = reltuples
+    return db
+
+
+def test_estimate_sums_partitions_of_a_partitioned_table():
+    """A partitioned parent has no statistics of its own; its partitions' reltuples are summed."""
+    from models.${{values.app_name}} import ${{values.app_name_capitalized}}
+    db = _postgres_session(1234)
+    assert counting.estimate_count(db, ${{values.app_name_capitalized}}) == 1234
+
+    sql = str(db.execute.call_args.args[0])
+    assert "relkind = 'p'" in sql
+    assert "sum(greatest(child.reltuples, 0))" in sql
+    assert "JOIN pg_class child ON child.oid = i.inhrelid WHERE i.inhparent = c.oid" in sql
+    assert db.execute.call_count == 1  # no count(*) fallback
+
+
+def test_estimate_without_statistics_falls_back_to_exact_count(monkeypatch):
+    """Tables (or all partitions) never analyzed report no rows and are counted exactly."""
+    from models.${{values.app_name}} import ${{values.app_name_capitalized}}
+    monkeypatch.setattr(counting, "exact_count", lambda db, model: 7)
+    assert counting.estimate_count(_postgres_session(0), ${{values.app_name_capitalized}}) == 7
+    assert counting.estimate_count(_postgres_session(-1), ${{values.app_name_capitalized}}) == 7
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+from framework import db, deadlines
+
+
+def make_request(headers=None, budget_ms=None):
+    state = SimpleNamespace()
+    if budget_ms is not None:
+        state.db_budget_ms = budget_ms
+    return SimpleNamespace(headers=headers or {}, state=state)
+
+
+def test_route_budget_sets_deadline():
+    deadline = deadlines.request_deadline(make_request(budget_ms=2000))
+    assert 1.9 < deadline - time.time() <= 2.0
+
+
+def test_default_budget_applies_without_route_budget(monkeypatch):
+    monkeypatch.setattr(deadlines, "STATEMENT_TIMEOUT_MS", 30000)
+    assert 29 < deadlines.request_deadline(make_request()) - time.time() <= 30
+
+
+def test_header_caps_the_budget():
+    header_deadline = time.time() + 0.5
+    request = make_request({deadlines.DEADLINE_HEADER: str(header_deadline)}, budget_ms=5000)
+    assert deadlines.request_deadline(request) == header_deadline
+
+
+def test_no_deadline_when_disabled():
+    assert deadlines.request_deadline(make_request(budget_ms=0)) is None
+
+
+@pytest.mark.parametrize("header, status", [(str(time.time() - 1), 504), ("tomorrow", 400)])
+def test_expired_or_invalid_header(header, status):
+    with pytest.raises(HTTPException) as exc_info:
+        deadlines.request_deadline(make_request({deadlines.DEADLINE_HEADER: header}))
+    assert exc_info.value.status_code == status
+
+
+def postgres_connection():
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+    connection.info = {}
+    return connection
+
+
+def test_statement_timeout_set_once_per_connection():
+    session = SimpleNamespace(info={"deadline": time.time() + 1.5})
+    connection = postgres_connection()
+
+    deadlines.apply_statement_timeout(session, None, connection)
+    deadlines.apply_statement_timeout(session, None, connection)
+
+    connection.exec_driver_sql.assert_called_once()
+    sql = connection.exec_driver_sql.call_args.args[0]
+    assert sql.startswith("SET statement_timeout = ")
+    assert 1400 < int(sql.rsplit(" ", 1)[1]) <= 1500
+    assert connection.info[deadlines.RESET_KEY] is True
+
+
+def test_statement_timeout_set_again_after_rollback():
+    session = SimpleNamespace(info={"deadline": time.time() + 1.5})
+    connection = postgres_connection()
+
+    deadlines.apply_statement_timeout(session, None, connection)
+    deadlines.forget_statement_timeout(connection)
+    deadlines.apply_statement_timeout(session, None, connection)
+
+    assert connection.exec_driver_sql.call_count == 2
+
+
+def test_expired_deadline_fails_before_any_sql():
+    session = SimpleNamespace(info={"deadline": time.time() - 0.1})
+    connection = postgres_connection()
+
+    with pytest.raises(HTTPException) as exc_info:
+        deadlines.apply_statement_timeout(session, None, connection)
+
+    assert exc_info.value.status_code == 504
+    connection.exec_driver_sql.assert_not_called()
+
+
+def test_checkin_resets_statement_timeout_in_autocommit():
+    dbapi_connection = MagicMock(autocommit=False)
+    dbapi_connection.cursor.return_value.execute.side_effect = (
+        lambda sql: executed.append((sql, dbapi_connection.autocommit))
+    )
+    executed = []
+    record = MagicMock(info={deadlines.TIMEOUT_KEY: 1500, deadlines.RESET_KEY: True})
+
+    deadlines.restore_statement_timeout(dbapi_connection, record)
+    deadlines.restore_statement_timeout(dbapi_connection, record)
+
+    assert executed == [("RESET statement_timeout", True)]
+    assert dbapi_connection.autocommit is False
+    assert record.info == {}
+
+
+def test_failed_reset_discards_the_connection():
+    dbapi_connection = MagicMock()
+    error = RuntimeError("server closed the connection")
+    dbapi_connection.cursor.side_effect = error
+    record = MagicMock(info={deadlines.RESET_KEY: True})
+
+    deadlines.restore_statement_timeout(dbapi_connection, record)
+
+    record.invalidate.assert_called_once_with(error)
+
+
+def test_refresh_after_commit_past_the_deadline_keeps_the_timeout(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'timeout.db'}")
+    monkeypatch.setattr(engine.dialect, "name", "postgresql")
+    statements, resets = [], []
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def fake_set(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SET statement_timeout"):
+            statements.append(statement)
+            return "SELECT 1", ()
+        return statement, parameters
+
+    monkeypatch.setattr(deadlines, "_reset_statement_timeout", resets.append)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+
+    deadline = time.time() + 1.5
+    session = Session(engine)
+    session.info["deadline"] = deadline
+    session.execute(text("INSERT INTO items (name) VALUES ('a')"))
+    session.commit()
+    # The deadline passes between the commit and the refresh
+    monkeypatch.setattr(deadlines.time, "time", lambda: deadline + 1)
+    assert session.execute(text("SELECT name FROM items")).scalar() == "a"
+    session.close()
+    engine.dispose()
+
+    assert len(statements) == 2 and statements[0] == statements[1]
+    assert len(resets) == 2
+
+
+def test_statement_timeout_skipped_without_deadline_or_postgres():
+    connection = MagicMock()
+    connection.dialect.name = "sqlite"
+    deadlines.apply_statement_timeout(SimpleNamespace(info={"deadline": time.time() + 1}), None, connection)
+    connection.dialect.name = "postgresql"
+    deadlines.apply_statement_timeout(SimpleNamespace(info={}), None, connection)
+    connection.exec_driver_sql.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_watch_disconnect_cancels_query(monkeypatch):
+    monkeypatch.setattr(deadlines, "DISCONNECT_POLL_SECONDS", 0)
+    request = MagicMock()
+    request.is_disconnected = MagicMock(side_effect=[asyncio.sleep(0, False), asyncio.sleep(0, True)])
+    driver_connection = MagicMock()
+
+    await deadlines.watch_disconnect(request, driver_connection)
+
+    driver_connection.cancel.assert_called_once()
+
+
+@pytest.fixture
+def deadline_app(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'deadline.db'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engine))
+    seen = {}
+
+    app = FastAPI()
+
+    @app.get("/work", dependencies=[Depends(deadlines.time_budget(250))])
+    def work(session: Session = Depends(db.get_db)):
+        session.execute(text("SELECT 1"))
+        seen["deadline"] = session.info["deadline"]
+        seen["session"] = session
+        return {"ok": True}
+
+    yield app, seen
+    engine.dispose()
+
+
+def test_get_db_attaches_route_deadline_and_closes(deadline_app):
+    app, seen = deadline_app
+    with TestClient(app) as client:
+        assert client.get("/work").status_code == 200
+    assert 0 < seen["deadline"] - time.time() <= 0.25
+    assert not seen["session"].in_transaction()
+
+
+def test_get_db_rejects_expired_deadline(deadline_app):
+    app, seen = deadline_app
+    with TestClient(app) as client:
+        response = client.get("/work", headers={deadlines.DEADLINE_HEADER: str(time.time() - 5)})
+    assert response.status_code == 504
+    assert seen == {}
@@ -0,0 +1,131 @@
+from datetime import date
+from unittest.mock import MagicMock
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from framework import partitioning
+from framework.db import Base
+
+
+@pytest.mark.parametrize("day, interval, expected", [
+    (date(2025, 8, 17), "month", date(2025, 8, 1)),
+    (date(2025, 8, 17), "day", date(2025, 8, 17)),
+])
+def test_partition_start(day, interval, expected):
+    assert partitioning.partition_start(day, interval) == expected
+
+
+@pytest.mark.parametrize("start, count, interval, expected", [
+    (date(2025, 11, 1), 2, "month", date(2026, 1, 1)),
+    (date(2025, 1, 1), -1, "month", date(2024, 12, 1)),
+    (date(2025, 2, 28), 1, "day", date(2025, 3, 1)),
+])
+def test_shift_partition(start, count, interval, expected):
+    assert partitioning.shift_partition(start, count, interval) == expected
+
+
+def test_partition_name_round_trip():
+    name = partitioning.partition_name("widgets", date(2025, 8, 1), "month")
+    assert name == "widgets_p202508"
+    assert partitioning.parse_partition_name("widgets", name, "month") == date(2025, 8, 1)
+    assert partitioning.parse_partition_name("widgets", "widgets_default", "month") is None
+    assert partitioning.parse_partition_name("widgets", "other_p202508", "month") is None
+
+
+def test_unsupported_interval():
+    with pytest.raises(ValueError):
+        partitioning.partition_start(date(2025, 1, 1), "year")
+
+
+def test_partitioning_disabled_by_default():
+    assert partitioning.partition_table_args("create_date") == {}
+    assert partitioning.partitioned_tables(Base.metadata) == []
+
+
+def test_partitioned_table_ddl():
+    metadata = MetaData()
+    table = Table(
+        "events", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("create_date", DateTime, primary_key=True),
+        postgresql_partition_by="RANGE (create_date)"
+    )
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "PARTITION BY RANGE (create_date)" in ddl
+    assert partitioning.partitioned_tables(metadata) == [table]
+
+
+def test_partition_column():
+    table = Table("events", MetaData(), Column("create_date", DateTime), postgresql_partition_by="RANGE (create_date)")
+    assert partitioning.partition_column(table) == "create_date"
+
+
+def statements(connection):
+    return [str(call.args[0]) for call in connection.execute.call_args_list]
+
+
+def test_ensure_partitions_creates_default_current_and_future():
+    connection = MagicMock()
+    # No partition exists yet and the DEFAULT partition is empty
+    connection.execute.return_value.scalar.side_effect = [None, False, None, False, None, False]
+    names = partitioning.ensure_partitions(
+        connection, "widgets", "create_date", today=date(2025, 12, 15), premake=2, interval="month"
+    )
+
+    assert names == ["widgets_p202512", "widgets_p202601", "widgets_p202602"]
+    created = [sql for sql in statements(connection) if sql.startswith("CREATE")]
+    assert created[0] == 'CREATE TABLE IF NOT EXISTS "widgets_default" PARTITION OF "widgets" DEFAULT'
+    assert created[1] == (
+        'CREATE TABLE IF NOT EXISTS "widgets_p202512" PARTITION OF "widgets" '
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')"
+    )
+    assert len(created) == 4
+    assert not any("DETACH" in sql for sql in statements(connection))
+
+
+def test_ensure_partitions_skips_existing_partitions():
+    connection = MagicMock()
+    connection.execute.return_value.scalar.return_value = "widgets_p202512"
+    partitioning.ensure_partitions(connection, "widgets", "create_date", today=date(2025, 12, 15), premake=0, interval="month")
+    assert [sql for sql in statements(connection) if sql.startswith("CREATE")] == [
+        'CREATE TABLE IF NOT EXISTS "widgets_default" PARTITION OF "widgets" DEFAULT'
+    ]
+
+
+def test_ensure_partitions_moves_rows_out_of_default():
+    connection = MagicMock()
+    # The partition is missing and the DEFAULT partition holds rows in its range
+    connection.execute.return_value.scalar.side_effect = [None, True]
+    partitioning.ensure_partitions(connection, "widgets", "create_date", today=date(2025, 12, 15), premake=0, interval="month")
+
+    assert statements(connection)[3:] == [
+        'ALTER TABLE "widgets" DETACH PARTITION "widgets_default"',
+        'CREATE TABLE IF NOT EXISTS "widgets_p202512" PARTITION OF "widgets" '
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        'WITH moved AS (DELETE FROM "widgets_default" WHERE "create_date" >= :lower AND "create_date" < :upper '
+        'RETURNING *) INSERT INTO "widgets" SELECT * FROM moved',
+        'ALTER TABLE "widgets" ATTACH PARTITION "widgets_default" DEFAULT',
+    ]
+    assert connection.execute.call_args_list[5].args[1] == {"lower": date(2025, 12, 1), "upper": date(2026, 1, 1)}
+
+
+def test_drop_expired_partitions_detaches_then_drops():
+    connection = MagicMock()
+    connection.execute.return_value.scalars.return_value.all.return_value = [
+        "widgets_p202505", "widgets_p202506", "widgets_p202507", "widgets_p202508", "widgets_default"
+    ]
+    dropped = partitioning.drop_expired_partitions(connection, "widgets", today=date(2025, 8, 10), retention=2, interval="month")
+
+    assert dropped == ["widgets_p202505"]
+    statements = [str(call.args[0]) for call in connection.execute.call_args_list[1:]]
+    assert statements == [
+        'ALTER TABLE "widgets" DETACH PARTITION "widgets_p202505"',
+        'DROP TABLE "widgets_p202505"',
+    ]
+
+
+def test_drop_expired_partitions_keeps_all_without_retention():
+    connection = MagicMock()
+    assert partitioning.drop_expired_partitions(connection, "widgets", retention=0) == []
+    connection.execute.assert_not_called()
@@ -0,0 +1,102 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from framework import pool_metrics
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    yield engine
+    pool_metrics.registry.pop(engine.pool, None)
+    engine.dispose()
+
+
+def test_checkout_and_checkin_update_gauges(engine):
+    metrics = pool_metrics.instrument_engine(engine, "test")
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    pool_metrics.checkout_connection(db)
+    assert metrics.in_use == 1
+    assert metrics.checkouts == 1
+    assert metrics.wait_count == 1
+
+    db.close()
+    assert metrics.in_use == 0
+    assert metrics.max_in_use == 1
+
+
+def test_checkout_timeout_returns_503(engine):
+    metrics = pool_metrics.instrument_engine(engine, "test")
+    Session = sessionmaker(bind=engine)
+
+    holder = Session()
+    holder.execute(text("SELECT 1"))
+    waiter = Session()
+    with pytest.raises(HTTPException) as exc_info:
+        pool_metrics.checkout_connection(waiter)
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    assert metrics.timeouts == 1
+    holder.close()
+    waiter.close()
+
+
+def test_admission_control_rejects_when_saturated(engine):
+    metrics = pool_metrics.instrument_engine(engine, "test")
+    Session = sessionmaker(bind=engine)
+
+    holder = Session()
+    pool_metrics.checkout_connection(holder, budget_ms=100)
+    metrics.wait_ewma_ms = 2500
+
+    with pytest.raises(HTTPException) as exc_info:
+        pool_metrics.checkout_connection(Session(), budget_ms=100)
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "3"
+    assert metrics.rejected == 1
+    assert metrics.timeouts == 0
+
+    # Once a connection is returned the pool has capacity again and requests are admitted
+    holder.close()
+    db = Session()
+    pool_metrics.checkout_connection(db, budget_ms=100)
+    db.close()
+
+
+def test_snapshot_histogram_is_cumulative(engine):
+    metrics = pool_metrics.instrument_engine(engine, "test")
+    metrics.observe_wait(0.0005)
+    metrics.observe_wait(0.02)
+    metrics.observe_wait(60)
+
+    snapshot = pool_metrics.snapshot_all()["test"]
+    buckets = snapshot["checkout_wait_ms"]["buckets"]
+    assert buckets["1"] == 1
+    assert buckets["25"] == 2
+    assert buckets["30000"] == 2
+    assert buckets["+Inf"] == 3
+    assert snapshot["capacity"] == 1
+
+
+def test_reinstrumenting_replaces_metrics_with_same_name(engine, tmp_path):
+    pool_metrics.instrument_engine(engine, "test")
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    pool_metrics.instrument_engine(other, "test")
+    assert [m.pool for m in pool_metrics.registry.values() if m.name == "test"] == [other.pool]
+    pool_metrics.registry.pop(other.pool, None)
+    other.dispose()
+
+
+def test_metrics_endpoint(client):
+    response = client.get("/api/v1/${{values.app_name}}/metrics")
+    assert response.status_code == 200
+    assert "db_pools" in response.json()
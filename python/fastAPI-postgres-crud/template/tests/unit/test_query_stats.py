@@ -0,0 +1,108 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from starlette.responses import Response
+from framework import query_stats
+from framework.middleware import LoggingMiddleware
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    query_stats.instrument_queries(engine)
+    query_stats.instrument_queries(engine)  # idempotent
+    yield engine
+    engine.dispose()
+
+
+def test_queries_are_counted_per_request(engine):
+    token = query_stats.begin_request()
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+        stats = query_stats.current_stats.get()
+        assert stats.queries == 3
+        assert stats.db_seconds > 0
+    finally:
+        query_stats.end_request(token)
+    assert query_stats.current_stats.get() is None
+
+
+def test_queries_outside_a_request_are_ignored(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert query_stats.current_stats.get() is None
+
+
+def test_failed_statements_do_not_leak_start_times(engine):
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        assert connection.info["query_start_time"] == []
+
+
+def test_timed_json_response_records_serialization():
+    token = query_stats.begin_request()
+    try:
+        response = query_stats.TimedJSONResponse({"items": list(range(1000))})
+        assert response.body.startswith(b'{"items":[0,1,2')
+        assert query_stats.current_stats.get().serialize_seconds > 0
+    finally:
+        query_stats.end_request(token)
+
+
+def test_server_timing_format():
+    stats = query_stats.RequestQueryStats()
+    stats.queries, stats.db_seconds, stats.serialize_seconds = 2, 0.0125, 0.0004
+    assert stats.server_timing(0.02) == 'db;dur=12.5;desc="2 queries", serialize;dur=0.4, total;dur=20.0'
+
+
+def _request():
+    request = MagicMock()
+    request.url.path = "/api/v1/widget/1"
+    request.method = "GET"
+    request.client.host = "1.2.3.4"
+    return request
+
+
+@pytest.mark.asyncio
+async def test_middleware_reports_queries_and_server_timing(engine):
+    async def call_next(request):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return Response(status_code=200)
+
+    middleware = LoggingMiddleware(lambda req: None)
+    with patch("framework.middleware.middleware_logger.info") as mock_info, \
+            patch("framework.middleware.middleware_logger.warning") as mock_warning:
+        result = await middleware.dispatch(_request(), call_next)
+
+    assert result.headers["Server-Timing"].startswith('db;dur=')
+    assert 'desc="1 queries"' in result.headers["Server-Timing"]
+    logged = mock_info.call_args[0][0]
+    assert logged["event"] == "Response"
+    assert logged["db_queries"] == 1
+    mock_warning.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_middleware_warns_on_excessive_queries(engine, monkeypatch):
+    monkeypatch.setattr(query_stats, "QUERY_WARN_THRESHOLD", 2)
+
+    async def call_next(request):
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+        return Response(status_code=200)
+
+    middleware = LoggingMiddleware(lambda req: None)
+    with patch("framework.middleware.middleware_logger.info"), \
+            patch("framework.middleware.middleware_logger.warning") as mock_warning:
+        await middleware.dispatch(_request(), call_next)
+
+    logged = mock_warning.call_args[0][0]
+    assert logged["event"] == "Excessive Queries"
+    assert logged["db_queries"] == 3
+    assert logged["endpoint"] == "widget/{id}"
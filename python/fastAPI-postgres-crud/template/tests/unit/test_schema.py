@@ -0,0 +1,101 @@
+from unittest.mock import patch
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, inspect, select, text
+from sqlalchemy.pool import StaticPool
+from framework import schema
+
+
+def make_metadata(extra_column=False):
+    metadata = MetaData()
+    columns = [Column("id", Integer, primary_key=True), Column("name", String(50))]
+    if extra_column:
+        columns.append(Column("label", String(50)))
+    Table("things", metadata, *columns)
+    return metadata
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+def count_ddl(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(("CREATE", "ALTER", "PRAGMA")):
+            statements.append(statement)
+
+    return statements
+
+
+def test_fingerprint_is_stable_and_sensitive_to_changes(engine):
+    base = schema.schema_fingerprint(make_metadata(), engine.dialect, [])
+    assert base == schema.schema_fingerprint(make_metadata(), engine.dialect, [])
+    assert base != schema.schema_fingerprint(make_metadata(extra_column=True), engine.dialect, [])
+    assert base != schema.schema_fingerprint(make_metadata(), engine.dialect, [(1, "noop", ["SELECT 1"])])
+
+
+def test_first_run_creates_tables_and_applies_migrations(engine):
+    migrations = [(1, "seed", ["INSERT INTO things (name) VALUES ('seeded')"])]
+    assert schema.ensure_schema(engine, make_metadata(), migrations, mode="fingerprint") is True
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT name FROM things")).scalars().all() == ["seeded"]
+        assert connection.execute(select(schema.schema_migrations_table.c.version)).scalars().all() == [1]
+        assert schema.stored_fingerprint(connection) == schema.schema_fingerprint(make_metadata(), engine.dialect, migrations)
+
+
+def test_second_run_skips_all_ddl(engine):
+    migrations = [(1, "seed", ["INSERT INTO things (name) VALUES ('seeded')"])]
+    schema.ensure_schema(engine, make_metadata(), migrations, mode="fingerprint")
+
+    statements = count_ddl(engine)
+    assert schema.ensure_schema(engine, make_metadata(), migrations, mode="fingerprint") is False
+    assert statements == []
+
+
+def test_new_migration_applies_only_pending(engine):
+    first = [(1, "seed", ["INSERT INTO things (name) VALUES ('seeded')"])]
+    schema.ensure_schema(engine, make_metadata(), first, mode="fingerprint")
+
+    second = first + [(2, "add label", ["ALTER TABLE things ADD COLUMN label VARCHAR(50)"])]
+    assert schema.ensure_schema(engine, make_metadata(), second, mode="fingerprint") is True
+
+    assert "label" in {c["name"] for c in inspect(engine).get_columns("things")}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM things")).scalar() == 1
+        assert connection.execute(select(schema.schema_migrations_table.c.version)).scalars().all() == [1, 2]
+
+
+def test_mode_none_and_create_all(engine):
+    metadata = make_metadata()
+    assert schema.ensure_schema(engine, metadata, [], mode="none") is False
+    assert not inspect(engine).has_table("things")
+
+    assert schema.ensure_schema(engine, metadata, [], mode="create_all") is True
+    assert inspect(engine).has_table("things")
+    assert not inspect(engine).has_table("schema_fingerprint")
+
+
+def test_unsupported_mode(engine):
+    with pytest.raises(ValueError):
+        schema.ensure_schema(engine, make_metadata(), [], mode="bogus")
+
+
+def test_connect_database_uses_fingerprint_instead_of_create_all():
+    import app as app_module
+
+    with patch.object(app_module.framework.db, "init_db"), \
+         patch.object(app_module.framework.db, "warm_pool", return_value=0), \
+         patch.object(app_module.framework.db, "read_router", None), \
+         patch.object(app_module, "run_maintenance"), \
+         patch.object(app_module, "ensure_schema") as ensure, \
+         patch.object(app_module.Base.metadata, "create_all") as create_all:
+        app_module.connect_database()
+
+    ensure.assert_called_once()
+    create_all.assert_not_called()
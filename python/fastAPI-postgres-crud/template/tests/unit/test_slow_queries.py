@@ -0,0 +1,141 @@
+from unittest.mock import patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from api import debug
+from framework import query_stats, slow_queries
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 1e-6)
+    monkeypatch.setattr(slow_queries, "store", slow_queries.SlowQueryStore(max_entries=10))
+    engine = create_engine("sqlite://")
+    slow_queries.instrument_slow_queries(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM t WHERE id = 42", "SELECT * FROM t WHERE id = ?"),
+    ("SELECT * FROM t WHERE name = 'O''Brien'\n  AND x > 1.5", "SELECT * FROM t WHERE name = ? AND x > ?"),
+    ("SELECT * FROM t WHERE id IN (1, 2, 3)", "SELECT * FROM t WHERE id IN (?)"),
+    ("SELECT * FROM t2 WHERE id = %(id_1)s", "SELECT * FROM t2 WHERE id = %(id_1)s"),
+])
+def test_normalize_sql(statement, expected):
+    assert slow_queries.normalize_sql(statement) == expected
+
+
+def test_store_aggregates_and_ranks_by_total_time():
+    store = slow_queries.SlowQueryStore(max_entries=10)
+    store.record("A", 10)
+    store.record("A", 30)
+    store.record("B", 25)
+
+    top = store.top()
+    assert [e["sql"] for e in top] == ["A", "B"]
+    assert top[0]["count"] == 2
+    assert top[0]["mean_ms"] == 20
+    assert top[0]["max_ms"] == 30
+
+
+def test_store_is_bounded_and_evicts_coldest():
+    store = slow_queries.SlowQueryStore(max_entries=2)
+    store.record("hot", 100)
+    store.record("cold", 1)
+    store.record("new", 50)
+    assert {e["sql"] for e in store.top()} == {"hot", "new"}
+
+
+def test_store_rate_limits_explains():
+    store = slow_queries.SlowQueryStore()
+    assert store.record("A", 10) is True
+    assert store.record("A", 10) is False
+
+
+def test_slow_statements_are_recorded_and_explained_in_background(engine):
+    with patch.object(slow_queries, "explain", return_value=[{"Plan": {}}]) as explain:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1 WHERE 1 = 1"))
+            connection.execute(text("SELECT 1 WHERE 1 = 1"))
+        slow_queries._explain_queue.join()
+
+    top = slow_queries.store.top()
+    assert top[0]["sql"] == "SELECT ? WHERE ? = ?"
+    assert top[0]["count"] == 2
+    assert top[0]["plan"] == [{"Plan": {}}]
+    explain.assert_called_once()
+
+
+def test_fast_statements_and_skipped_connections_are_ignored(engine, monkeypatch):
+    with engine.connect().execution_options(**{slow_queries.SKIP_OPTION: True}) as connection:
+        connection.execute(text("SELECT 1"))
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 60_000)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 2"))
+    assert slow_queries.store.top() == []
+
+
+def test_explain_is_postgres_only(engine):
+    assert slow_queries.explain(engine, "SELECT 1", ()) is None
+
+
+def test_plan_literals_are_scrubbed():
+    plan = [{"Plan": {
+        "Node Type": "Index Scan",
+        "Index Cond": "(email = 'alice@example.com'::text)",
+        "Filter": "(age > 42)",
+        "Plan Rows": 1,
+        "Plans": [{"Recheck Cond": "(name = ANY ('{bob,carol}'::text[]))"}],
+    }}]
+    scrubbed = slow_queries.scrub_plan(plan)[0]["Plan"]
+    assert scrubbed["Index Cond"] == "(email = ?::text)"
+    assert scrubbed["Filter"] == "(age > ?)"
+    assert scrubbed["Plan Rows"] == 1
+    assert "bob" not in scrubbed["Plans"][0]["Recheck Cond"]
+
+
+def test_statements_are_timed_once_by_query_stats(engine):
+    token = query_stats.begin_request()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 3"))
+            stats = query_stats.current_stats.get()
+            assert list(connection.info) == ["query_start_time"]
+    finally:
+        query_stats.end_request(token)
+    # The slow-query log records the duration measured by the request accounting
+    assert slow_queries.store.top()[0]["total_ms"] == round(stats.db_seconds * 1000, 3)
+
+
+def test_engines_without_slow_query_log_are_ignored(engine):
+    other = create_engine("sqlite://")
+    query_stats.instrument_queries(other)
+    with other.connect() as connection:
+        connection.execute(text("SELECT 4"))
+    other.dispose()
+    assert slow_queries.store.top() == []
+
+
+def test_failed_statements_do_not_leak_start_times(engine):
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+        assert connection.info["query_start_time"] == []
+
+
+def test_slow_query_endpoint_is_opt_in(client):
+    assert client.get("/api/v1/${{values.app_name}}/debug/slow-queries").status_code == 404
+
+
+def test_slow_query_endpoint():
+    debug_app = FastAPI()
+    debug_app.include_router(debug.router)
+    response = TestClient(debug_app).get("/api/v1/${{values.app_name}}/debug/slow-queries?limit=5")
+    assert response.status_code == 200
+    body = response.json()
+    assert "threshold_ms" in body
+    assert isinstance(body["queries"], list)
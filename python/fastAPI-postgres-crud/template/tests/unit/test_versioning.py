@@ -0,0 +1,94 @@
+import uuid
+import pytest
+from fastapi import HTTPException
+from api.${{values.app_name}} import parse_if_match
+
+
+@pytest.fixture
+def record(client):
+    name = f"ver_{uuid.uuid4().hex[:12]}"
+    response = client.post("/api/v1/${{values.app_name}}", json={
+        "username": name,
+        "email": f"{name}@example.com"
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_new_record_starts_at_version_1(client, record):
+    assert record["version"] == 1
+    response = client.get(f"/api/v1/${{values.app_name}}/{record['id']}")
+    assert response.headers["ETag"] == '"1"'
+
+
+def test_patch_increments_version(client, record):
+    response = client.patch(f"/api/v1/${{values.app_name}}/{record['id']}", json={
+        "username": record["username"],
+        "email": record["email"],
+        "full_name": "Updated"
+    })
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.json()["full_name"] == "Updated"
+    assert response.headers["ETag"] == '"2"'
+
+
+def test_put_with_matching_if_match(client, record):
+    response = client.put(
+        f"/api/v1/${{values.app_name}}/{record['id']}",
+        json={"username": record["username"], "email": record["email"], "full_name": "Put"},
+        headers={"If-Match": '"1"'}
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+
+def test_put_with_stale_if_match_conflicts(client, record):
+    client.patch(f"/api/v1/${{values.app_name}}/{record['id']}", json={
+        "username": record["username"],
+        "email": record["email"],
+        "full_name": "First writer"
+    })
+    response = client.put(
+        f"/api/v1/${{values.app_name}}/{record['id']}",
+        json={"username": record["username"], "email": record["email"], "full_name": "Second writer"},
+        headers={"If-Match": '"1"'}
+    )
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"2"'
+    assert client.get(f"/api/v1/${{values.app_name}}/{record['id']}").json()["full_name"] == "First writer"
+
+
+def test_patch_with_stale_body_version_conflicts(client, record):
+    response = client.patch(f"/api/v1/${{values.app_name}}/{record['id']}", json={
+        "username": record["username"],
+        "email": record["email"],
+        "version": 7
+    })
+    assert response.status_code == 409
+
+
+def test_update_missing_record_returns_404(client):
+    response = client.patch("/api/v1/${{values.app_name}}/999999", json={
+        "username": "nobody",
+        "email": "nobody@example.com",
+        "version": 1
+    })
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("*", None),
+    ('"4"', 4),
+    ('W/"5"', 5),
+    ("6", 6),
+])
+def test_parse_if_match(header, expected):
+    assert parse_if_match(header) == expected
+
+
+def test_parse_if_match_invalid():
+    with pytest.raises(HTTPException) as exc_info:
+        parse_if_match('"abc"')
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,101 @@
+"""
+Outbound HTTP benchmark: a new client per request (fresh TCP/TLS handshake each time)
+versus the shared keep-alive client from framework.http_client.
+
+Usage:
+    PYTHONPATH=src python benchmarks/http_client.py [--requests 200] [--concurrency 10] [--url URL]
+                                                    [--handshake-ms 20]
+
+Without --url a local stub server is started; --handshake-ms adds that much delay to each
+new connection to approximate TCP+TLS setup to a remote host.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from framework.http_client import create_client
+
+
+def start_stub(handshake_ms: float) -> ThreadingHTTPServer:
+    body = json.dumps({"id": "stub", "value": "Chuck Norris can divide by zero."}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(label, total, concurrency, fetch):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            (await fetch()).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<18} {total / elapsed:>8.0f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000:>7.2f} ms   p99 {p99 * 1000:>7.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--url")
+    parser.add_argument("--handshake-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = start_stub(args.handshake_ms)
+        url = f"http://127.0.0.1:{server.server_port}/jokes/random"
+
+    async def fresh_client():
+        async with httpx.AsyncClient(timeout=10) as client:
+            return await client.get(url)
+
+    shared = create_client()
+    try:
+        print(f"{args.requests} requests, concurrency {args.concurrency}, {url}")
+        await run("new client/request", args.requests, args.concurrency, fresh_client)
+        await run("shared client", args.requests, args.concurrency, lambda: shared.get(url))
+    finally:
+        await shared.aclose()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+import framework.http_client
+import framework.outbound
+from fastapi import APIRouter
+from api import sample
+
+router = APIRouter()
+
+@router.get("/api/${{values.app_name}}/v1/metrics")
+def metrics():
+    """
+    Runtime metrics endpoint.
+
+    Returns:
+        dict: A dictionary of in-process metrics.
+              Includes:
+                - prefetch (dict | None): Sample joke prefetch buffer depth, capacity, and
+                  counters for hits, stale serves, misses, fetches and fetch errors.
+                - latest_jokes (dict | None): Latest-jokes cache depth, capacity, age since the
+                  last reload, and counters for hits, misses, added rows, reloads and errors.
+                - http_client (dict | None): Outbound request, retry and denied-retry counters.
+                - singleflight (dict): Executed and collapsed call counts for the sample
+                  endpoint's upstream fetch and database work.
+                - outbound (dict): Per-dependency circuit breaker state, error and slow-call
+                  rates, p95 latency, hedging and fallback counters.
+    """
+    http = framework.http_client.client
+    return {
+        "prefetch": sample.joke_buffer.snapshot() if sample.joke_buffer is not None else None,
+        "latest_jokes": sample.latest_cache.snapshot() if sample.latest_cache is not None else None,
+        "http_client": dict(http.stats) if http is not None else None,
+        "singleflight": {
+            "upstream": dict(sample.upstream_flight.stats),
+            "db": dict(sample.db_flight.stats)
+        },
+        "outbound": framework.outbound.snapshot_all()
+    }
@@ -1,53 +1,151 @@
-import requests
-from fastapi import APIRouter, Depends, HTTPException 
+import os
+import math
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime, UTC
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from framework.db import get_db
-from models.chuck_joke import ChuckJoke
+import framework.db
+from framework.db import get_db, pipeline
+from framework.http_client import HttpClient, get_http_client
+from framework.outbound import CircuitOpenError, OutboundPolicy
+from framework.prefetch import PrefetchBuffer
+from framework.recent_cache import RecentCache
+from framework.singleflight import AsyncSingleFlight, SingleFlight
+from typing import Optional
+from models.chuck_joke import ChuckJoke, hash_joke
 
 router = APIRouter()
 
+JOKE_API_URL = os.getenv("JOKE_API_URL", "https://api.chucknorris.io/jokes/random")
+
+LATEST_JOKES = 10
+
+# Jokes fetched ahead of time by a lifespan task (None when prefetching is disabled)
+joke_buffer: Optional[PrefetchBuffer] = None
+
+# The latest jokes, served without a DB read; seeded and refreshed by the lifespan
+# (None when disabled, and in tests)
+latest_cache: Optional[RecentCache] = None
+
+# Concurrent requests share one upstream fetch, and requests for the same joke share one
+# insert + latest-10 query (the result is computed on the first caller's session)
+upstream_flight = AsyncSingleFlight()
+db_flight = SingleFlight()
+
+# Circuit breaker (and optional hedging) for the joke API; the last joke served is the
+# fallback while it is failing or the circuit is open
+joke_policy = OutboundPolicy("joke_api")
+last_joke: Optional[dict] = None
+
+
+async def request_joke(http: Optional[HttpClient] = None) -> dict:
+    """Fetch one joke payload from the upstream API."""
+    response = await (http or get_http_client()).get(JOKE_API_URL)
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_joke(http: Optional[HttpClient] = None, fallback=None) -> dict:
+    """Fetch one joke through the joke API policy; raises CircuitOpenError while the circuit is open."""
+    return await joke_policy.call(lambda: request_joke(http), fallback)
+
+
+def stale_joke() -> dict:
+    return {**last_joke, "stale": True}
+
+
+# INSERT ... ON CONFLICT DO NOTHING: dedup is one probe of the unique hash index
+INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def insert_joke_statement(dialect_name: str, joke_text: str):
+    """INSERT the joke unless one with the same hash exists."""
+    jokes = ChuckJoke.__table__
+    return (
+        INSERT_BY_DIALECT[dialect_name](jokes)
+        .values(joke=joke_text, joke_hash=hash_joke(joke_text), create_date=datetime.now(UTC))
+        .on_conflict_do_nothing(index_elements=[jokes.c.joke_hash])
+    )
+
+
+def serialize_joke(row) -> dict:
+    return {"id": row.id, "joke": row.joke, "create_date": row.create_date.isoformat()}
+
+
+def latest_jokes_statement():
+    jokes = ChuckJoke.__table__
+    return (
+        select(jokes.c.id, jokes.c.joke, jokes.c.create_date)
+        .order_by(jokes.c.create_date.desc())
+        .limit(LATEST_JOKES)
+    )
+
+
+def load_latest_jokes() -> list:
+    """Read the latest jokes on a fresh session (the recent cache loader)."""
+    with framework.db.SessionLocal() as db:
+        return [serialize_joke(row) for row in db.execute(latest_jokes_statement())]
+
+
+def store_and_list_jokes(db: Session, joke_text: str) -> list:
+    """Insert the joke unless it exists and return the latest jokes (blocking, run in a worker thread)."""
+    jokes = ChuckJoke.__table__
+    insert_if_new = insert_joke_statement(db.get_bind().dialect.name, joke_text).returning(
+        jokes.c.id, jokes.c.joke, jokes.c.create_date
+    )
+    cached = latest_cache.items() if latest_cache is not None else None
+    if cached is not None:
+        # Common case: only the insert touches the DB; a new row goes into the cache
+        (inserted,) = pipeline(db, [(insert_if_new, None)])
+        db.commit()
+        if not inserted:
+            return cached
+        latest_cache.add(serialize_joke(inserted[0]))
+        return latest_cache.items() or cached
+
+    # Insert the joke unless its hash exists, then get the latest jokes.
+    # Neither statement needs the other's result, so they share one round trip.
+    _, latest_jokes = pipeline(db, [(insert_if_new, None), (latest_jokes_statement(), None)])
+    db.commit()
+    return [serialize_joke(row) for row in latest_jokes]
+
 
 @router.get("/api/${{values.app_name}}/v1/sample")
-def sample(db: Session = Depends(get_db)):
+async def sample(response: Response, db: Session = Depends(get_db), http: HttpClient = Depends(get_http_client)):
+    global last_joke
     try:
-        response = requests.get('https://api.chucknorris.io/jokes/random')
-        response.raise_for_status()
-        joke_data = response.json()
-        
+        # Serve from the prefetch buffer; only a cold start waits on the upstream
+        joke_data = joke_buffer.pop() if joke_buffer is not None else None
+        if joke_data is None:
+            fallback = stale_joke if last_joke is not None else None
+            joke_data = await upstream_flight.do(JOKE_API_URL, fetch_joke, http, fallback)
+
         # Validate response format
         if "value" not in joke_data:
             raise HTTPException(status_code=422, detail="Invalid joke format from API")
-            
-        joke_text = joke_data["value"]
+        if joke_data.get("stale"):
+            response.headers["X-Upstream-Fallback"] = joke_policy.name
+        else:
+            last_joke = joke_data
 
-        # Check if joke exists in DB
-        exists = db.query(ChuckJoke).filter_by(joke=joke_text).first()
-        if not exists:
-            new_joke = ChuckJoke(joke=joke_text)
-            db.add(new_joke)
-            db.commit()
-            db.refresh(new_joke)
-
-        # Get latest 10 jokes
-        latest_jokes = (
-            db.query(ChuckJoke)
-            .order_by(ChuckJoke.create_date.desc())
-            .limit(10)
-            .all()
-        )
+        joke_text = joke_data["value"]
+        latest_jokes = await run_in_threadpool(db_flight.do, joke_text, store_and_list_jokes, db, joke_text)
 
         return {
             "api_data": joke_data,
-            "jokes": [
-                {
-                    "id": j.id,
-                    "joke": j.joke,
-                    "create_date": j.create_date.isoformat()
-                } for j in latest_jokes
-            ]
+            "jokes": latest_jokes
         }
 
-    except requests.RequestException as e:
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"External API unavailable: {str(e)}",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=502,
             detail=f"External API request failed: {str(e)}"
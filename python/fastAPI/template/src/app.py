@@ -1,13 +1,16 @@
 import os
+import random
+import asyncio
 import logging
-from time import sleep
 from fastapi import FastAPI
-from sqlalchemy import text
 from contextlib import asynccontextmanager
 
 import framework.db
+import framework.http_client
+from framework.prefetch import buffer_from_env
+from framework.recent_cache import cache_from_env
 from models.chuck_joke import Base
-from api import health, info, sample
+from api import health, info, metrics, sample
 
 # Setup logging before anything else uses it
 logger = logging.getLogger(__name__)
@@ -24,30 +27,63 @@ else:  # Basic logging when running tests
     app_middleware = []
     otel_enabled = False
 
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2 ** attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def connect_database() -> int:
+    """Initialize the database and pre-open pool_size connections (runs in a worker thread)."""
+    framework.db.init_db()
+    Base.metadata.create_all(bind=framework.db.engine)
+    return framework.db.warm_pool()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    max_retries = 5
-    retry_delay = 2
+    # Connect without blocking the event loop; the app serves only after the pool is warm
+    max_retries = int(os.getenv("DB_CONNECT_MAX_RETRIES", 5))
+    backoff_base = float(os.getenv("DB_CONNECT_BACKOFF_BASE", 0.5))
+    backoff_max = float(os.getenv("DB_CONNECT_BACKOFF_MAX", 10))
 
     if os.getenv("TESTING") != "true":
         for attempt in range(max_retries):
             try:
                 logger.info(f"Attempting database connection (attempt {attempt + 1}/{max_retries})")
-                framework.db.init_db()
-                Base.metadata.create_all(bind=framework.db.engine)
-                with framework.db.SessionLocal() as session:
-                    session.execute(text("SELECT 1"))
-
-                logger.info("Database connection established successfully")
+                warmed = await asyncio.to_thread(connect_database)
+                logger.info(f"Database connection established successfully ({warmed} pooled connections warmed)")
                 break
             except Exception as e:
                 logger.error(f"Database connection failed: {str(e)}")
                 if attempt == max_retries - 1:
                     logger.error("Max retries reached, failing startup")
                     raise
-                sleep(retry_delay)
+                await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_max))
 
-    yield
+    # One pooled client for all outbound calls, closed on shutdown
+    framework.http_client.client = framework.http_client.create_client()
+    # Keep upstream jokes fetched ahead so the sample endpoint does not wait on them
+    if os.getenv("TESTING") != "true":
+        sample.joke_buffer = buffer_from_env(sample.fetch_joke)
+        if sample.joke_buffer is not None:
+            sample.joke_buffer.start()
+        # Serve the latest jokes from memory, seeded now and refreshed in the background
+        sample.latest_cache = cache_from_env(sample.load_latest_jokes, size=sample.LATEST_JOKES)
+        if sample.latest_cache is not None:
+            try:
+                await asyncio.to_thread(sample.latest_cache.refresh)
+            except Exception as e:
+                logger.warning(f"Latest jokes cache not seeded, reading from the database: {str(e)}")
+            sample.latest_cache.start()
+    try:
+        yield
+    finally:
+        if sample.joke_buffer is not None:
+            await sample.joke_buffer.stop()
+            sample.joke_buffer = None
+        if sample.latest_cache is not None:
+            await sample.latest_cache.stop()
+            sample.latest_cache = None
+        await framework.http_client.client.aclose()
+        framework.http_client.client = None
 
 # Create FastAPI app
 app = FastAPI(lifespan=lifespan)
@@ -62,4 +98,5 @@ if os.getenv("TESTING") != "true":
 # Register routes
 app.include_router(health.router, tags=["Health"])
 app.include_router(info.router, tags=["Info"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(sample.router, tags=["Sample"])
@@ -1,7 +1,8 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy import create_engine
-from typing import Optional, TypeVar, Any
+from typing import Optional, TypeVar, Any, List, Sequence, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,8 +40,13 @@ def init_db(database_url: str = None, **engine_kwargs):
                         f"Missing required environment variables: {', '.join(missing_vars)}"
                     )
 
+                # "psycopg" (psycopg 3) enables pipeline mode in pipeline()
+                driver = os.getenv("DB_DRIVER", "psycopg2")
+                if driver not in ("psycopg2", "psycopg"):
+                    raise EnvironmentError(f"Unsupported DB_DRIVER: {driver}")
+
                 database_url = (
-                    f"postgresql+psycopg2://{required_keys['POSTGRES_USER']}:"
+                    f"postgresql+{driver}://{required_keys['POSTGRES_USER']}:"
                     f"{required_keys['POSTGRES_PASSWORD']}@"
                     f"{required_keys['POSTGRES_HOST']}:"
                     f"{required_keys['POSTGRES_PORT']}/"
@@ -74,6 +80,91 @@ def init_db(database_url: str = None, **engine_kwargs):
         logger.error(f"Failed to initialize database: {str(e)}")
         raise
 
+def warm_pool(size: int = None) -> int:
+    """Open `size` pool connections concurrently (default: pool_size) and return them to the pool."""
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+
+    if size is None:
+        size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    if size <= 0:
+        return 0
+
+    def open_connection(_):
+        connection = engine.connect()
+        connection.exec_driver_sql("SELECT 1")
+        return connection
+
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        futures = [executor.submit(open_connection, i) for i in range(size)]
+
+    connections, errors = [], []
+    for future in futures:
+        try:
+            connections.append(future.result())
+        except Exception as e:
+            errors.append(e)
+    for connection in connections:
+        connection.close()
+    if errors:
+        raise errors[0]
+    return len(connections)
+
+def pipeline(db, statements: Sequence[Tuple[Any, Optional[dict]]]) -> List[Optional[list]]:
+    """
+    Run (statement, params) pairs in the session's transaction, returning fetched rows
+    (None for statements without a result) per statement.
+
+    With psycopg 3 the statements are sent back to back in pipeline mode, costing one
+    network round trip instead of one per statement, so only batch statements that do
+    not depend on each other's results. Other drivers run them one after another.
+    In pipeline mode each statement is compiled by SQLAlchemy and sent to the driver
+    cursor directly: `params` are values for its bind parameters (expanding IN lists
+    and `literal_execute` parameters are rendered, and bind processors such as those
+    of Enum, JSON or TypeDecorator types are applied), but there are no ORM features
+    or execution events.
+    """
+    raw = db.connection().connection.driver_connection
+    if not hasattr(raw, "pipeline"):
+        results = []
+        for statement, params in statements:
+            result = db.execute(statement, params or {})
+            results.append(result.all() if result.returns_rows else None)
+        return results
+
+    dialect = db.get_bind().dialect
+    cursors = []
+    with raw.pipeline():
+        for statement, params in statements:
+            sql, parameters = _compile_for_driver(statement, params, dialect)
+            cursor = raw.cursor()
+            cursor.execute(sql, parameters)
+            cursors.append(cursor)
+    # Leaving the pipeline block syncs, so every result is available here
+    results = [cursor.fetchall() if cursor.description else None for cursor in cursors]
+    for cursor in cursors:
+        cursor.close()
+    return results
+
+def _compile_for_driver(statement, params: Optional[dict], dialect):
+    """Return the SQL string and driver parameters SQLAlchemy would execute for `statement`."""
+    compiled = statement.compile(dialect=dialect)
+    # Expands IN lists and renders literal_execute parameters for these values
+    state = compiled.construct_expanded_state(params)
+    processors = {}
+    for bind, name in compiled.bind_names.items():
+        processor = bind.type.dialect_impl(dialect).bind_processor(dialect)
+        if processor is not None:
+            processors[name] = processor
+    processors.update(state.processors)
+    parameters = {
+        name: processors[name](value) if name in processors else value
+        for name, value in state.parameters.items()
+    }
+    if state.positiontup is not None:
+        return state.statement, tuple(parameters[name] for name in state.positiontup)
+    return state.statement, parameters
+
 def get_db():
     if SessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
@@ -0,0 +1,112 @@
+"""
+Shared outbound HTTP client, created and closed by the app lifespan.
+
+One `httpx.AsyncClient` keeps connections alive across requests (no TCP/TLS handshake
+per call), with connect/read timeouts, a cap on concurrent upstream calls, and retries
+limited by a budget so retries cannot multiply load on a struggling upstream.
+
+Environment variables:
+    HTTP_CONNECT_TIMEOUT    - Seconds to establish a connection (default: 2)
+    HTTP_READ_TIMEOUT       - Seconds to wait for response data (default: 5)
+    HTTP_MAX_CONNECTIONS    - Pooled connections, also the concurrency cap (default: 20)
+    HTTP_MAX_RETRIES        - Retries per call on connection errors and 5xx (default: 2)
+    HTTP_RETRY_BUDGET_RATIO - Retries allowed per call, averaged over time (default: 0.1)
+"""
+import os
+import random
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+
+RETRYABLE_STATUS = {502, 503, 504}
+
+
+class RetryBudget:
+    """Token bucket: every call deposits `ratio` tokens (up to `burst`), every retry spends one."""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10):
+        self.ratio = ratio
+        self.burst = burst
+        self.balance = burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.balance = min(self.burst, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class HttpClient:
+    """Pooled async client with bounded concurrency and budgeted retries."""
+
+    def __init__(self, client: httpx.AsyncClient, max_concurrency: int = 20, max_retries: int = 2,
+                 budget: Optional[RetryBudget] = None, backoff_base: float = 0.05):
+        self.client = client
+        self.max_retries = max_retries
+        self.budget = budget or RetryBudget()
+        self.backoff_base = backoff_base
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {"requests": 0, "retries": 0, "retries_denied": 0}
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET `url`, retrying connection errors and 502/503/504 while the retry budget allows."""
+        async with self._semaphore:
+            self.stats["requests"] += 1
+            self.budget.deposit()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self.client.get(url, **kwargs)
+                    if response.status_code not in RETRYABLE_STATUS:
+                        return response
+                    failure = None
+                except httpx.TransportError as e:
+                    response, failure = None, e
+
+                if attempt == self.max_retries or not self._retry_allowed():
+                    if failure is not None:
+                        raise failure
+                    return response
+                await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+
+    def _retry_allowed(self) -> bool:
+        if self.budget.withdraw():
+            self.stats["retries"] += 1
+            return True
+        self.stats["retries_denied"] += 1
+        return False
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+client: Optional[HttpClient] = None
+
+
+def create_client(**client_kwargs) -> HttpClient:
+    """Build the shared client from environment settings; `client_kwargs` go to `httpx.AsyncClient`."""
+    max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    timeout = httpx.Timeout(
+        float(os.getenv("HTTP_READ_TIMEOUT", 5)),
+        connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", 2))
+    )
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return HttpClient(
+        httpx.AsyncClient(timeout=timeout, limits=limits, **client_kwargs),
+        max_concurrency=max_connections,
+        max_retries=int(os.getenv("HTTP_MAX_RETRIES", 2)),
+        budget=RetryBudget(ratio=float(os.getenv("HTTP_RETRY_BUDGET_RATIO", 0.1)))
+    )
+
+
+def get_http_client() -> HttpClient:
+    if client is None:
+        raise RuntimeError("HTTP client not started. It is created in the app lifespan.")
+    return client
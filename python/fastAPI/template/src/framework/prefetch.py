@@ -0,0 +1,99 @@
+"""
+Background prefetch buffer for upstream payloads.
+
+A task started in the app lifespan keeps up to `size` payloads fetched ahead of time,
+refilling at most `rate` fetches per second. Handlers take one with `pop()` in O(1)
+instead of waiting on the upstream. When the buffer is empty, `pop()` returns the most
+recently served payload (stale-while-revalidate) and wakes the refill task; only a cold
+start with nothing served yet is a miss. After a failed fetch (including an open circuit)
+the task waits `error_backoff` seconds, doubling with each consecutive failure up to
+`max_error_backoff`, whatever the rate, so a down upstream is not polled in a tight loop.
+
+Environment variables:
+    PREFETCH_BUFFER_SIZE - Payloads kept ready; 0 disables prefetching (default: 32)
+    PREFETCH_RATE        - Maximum upstream fetches per second while refilling (default: 5)
+"""
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchBuffer:
+    def __init__(self, fetch: Callable[[], Awaitable[Any]], size: int = 32, rate: float = 5.0,
+                 error_backoff: float = 0.1, max_error_backoff: float = 5.0):
+        self.fetch = fetch
+        self.size = size
+        self.interval = 1 / rate if rate > 0 else 0
+        self.error_backoff = error_backoff
+        self.max_error_backoff = max_error_backoff
+        self._failures = 0
+        self._items = deque(maxlen=size)
+        self._last = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "fetched": 0, "errors": 0}
+
+    def pop(self) -> Optional[Any]:
+        """Return a fresh payload, else the last one served, else None (a miss)."""
+        self._wakeup.set()
+        if self._items:
+            self.stats["hits"] += 1
+            self._last = self._items.popleft()
+            return self._last
+        if self._last is not None:
+            self.stats["stale"] += 1
+            return self._last
+        self.stats["misses"] += 1
+        return None
+
+    async def refill(self) -> None:
+        """Keep the buffer full; sleeps until a pop() when there is nothing to do."""
+        while True:
+            if len(self._items) >= self.size:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                self._items.append(await self.fetch())
+                self.stats["fetched"] += 1
+                self._failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._failures += 1
+                logger.warning(f"Prefetch failed: {str(e)}")
+            await asyncio.sleep(max(self.interval, self.backoff_delay()))
+
+    def backoff_delay(self) -> float:
+        """Seconds to wait after the current run of consecutive failures (0 without failures)."""
+        if self._failures == 0:
+            return 0
+        return min(self.error_backoff * 2 ** (self._failures - 1), self.max_error_backoff)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.refill())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {"depth": len(self._items), "capacity": self.size, **self.stats}
+
+
+def buffer_from_env(fetch: Callable[[], Awaitable[Any]]) -> Optional[PrefetchBuffer]:
+    """Return a buffer configured from the environment, or None when prefetching is disabled."""
+    size = int(os.getenv("PREFETCH_BUFFER_SIZE", 32))
+    if size <= 0:
+        return None
+    return PrefetchBuffer(fetch, size=size, rate=float(os.getenv("PREFETCH_RATE", 5)))
@@ -0,0 +1,105 @@
+"""
+In-process ring buffer of the most recent rows of a table, kept fresh across replicas.
+
+The cache holds the newest `size` serialized rows, newest first. It is seeded from the
+database when the app starts (a blocking `refresh()`), updated in place when this process
+inserts a row, and reloaded every `refresh_seconds` by a lifespan task so rows inserted
+by other replicas show up within one interval. If the refresh task falls behind (no successful load for
+`STALE_AFTER_INTERVALS` intervals), `items()` returns None and callers read the database.
+
+Environment variables:
+    RECENT_CACHE_REFRESH_SECONDS - Seconds between reloads; 0 disables the cache (default: 5)
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER_INTERVALS = 3
+
+
+class RecentCache:
+    def __init__(self, load: Callable[[], List[dict]], size: int = 10, refresh_seconds: float = 5.0):
+        self.load = load
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self._items = deque(maxlen=size)
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "added": 0, "refreshes": 0, "errors": 0}
+
+    def items(self) -> Optional[List[dict]]:
+        """The cached rows, newest first, or None when not loaded or too stale to serve."""
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            if age is None or age > self.refresh_seconds * STALE_AFTER_INTERVALS:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return list(self._items)
+
+    def add(self, item: dict) -> None:
+        """Record a row this process just inserted as the newest one."""
+        with self._lock:
+            if item in self._items:
+                return  # a reload already picked it up
+            self._items.appendleft(item)
+            self.stats["added"] += 1
+
+    def refresh(self) -> None:
+        """Reload the rows from the database (blocking)."""
+        items = self.load()
+        with self._lock:
+            self._items = deque(items[:self.size], maxlen=self.size)
+            self._loaded_at = time.monotonic()
+            self.stats["refreshes"] += 1
+
+    async def run(self) -> None:
+        """Reload every `refresh_seconds`; the first load is the caller's (see `refresh`)."""
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await run_in_threadpool(self.refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Recent cache refresh failed: {str(e)}")
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            return {
+                "depth": len(self._items),
+                "capacity": self.size,
+                "age_seconds": round(age, 3) if age is not None else None,
+                **self.stats
+            }
+
+
+def cache_from_env(load: Callable[[], List[dict]], size: int) -> Optional[RecentCache]:
+    """Return a cache configured from the environment, or None when it is disabled."""
+    refresh_seconds = float(os.getenv("RECENT_CACHE_REFRESH_SECONDS", 5))
+    if refresh_seconds <= 0:
+        return None
+    return RecentCache(load, size=size, refresh_seconds=refresh_seconds)
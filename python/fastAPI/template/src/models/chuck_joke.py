@@ -1,10 +1,26 @@
-from sqlalchemy import Column, DateTime, Integer, String
+import hashlib
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import validates
 from framework.db import Base
 from datetime import datetime, UTC
 
+
+def hash_joke(joke: str) -> bytes:
+    """SHA-256 of the joke text: the fixed-width (32 byte) key jokes are deduplicated on."""
+    return hashlib.sha256(joke.encode("utf-8")).digest()
+
+
 class ChuckJoke(Base):
     __tablename__ = 'chuck_jokes'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    joke = Column(String, unique=True, nullable=False)
-    create_date = Column(DateTime, default=lambda: datetime.now(UTC))
\ No newline at end of file
+    joke = Column(String, nullable=False)
+    # The unique index is on the hash rather than the unbounded text column
+    joke_hash = Column(LargeBinary(32), unique=True, nullable=False)
+    # Indexed for the latest-jokes query (ORDER BY create_date DESC LIMIT n)
+    create_date = Column(DateTime, default=lambda: datetime.now(UTC), index=True)
+
+    @validates("joke")
+    def _set_joke_hash(self, key, joke):
+        self.joke_hash = hash_joke(joke)
+        return joke
@@ -1,4 +1,8 @@
 import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -73,4 +77,54 @@ def mock_joke_response():
         "updated_at": "2020-01-05 13:42:22.980058",
         "url": "https://api.chucknorris.io/jokes/abc123",
         "value": "Chuck Norris can divide by zero."
-    }    
\ No newline at end of file
+    }    
+
+class StubUpstream:
+    """Local HTTP server standing in for an upstream API, with fault injection knobs."""
+
+    def __init__(self):
+        self.payload = {"id": "stub", "value": "Chuck Norris can divide by zero."}
+        self.status = 200
+        self.delay = 0.0
+        self.faults = []  # (status, delay) consumed one per request before the defaults apply
+        self.requests = 0
+        self.connections = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                stub.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                stub.requests += 1
+                status, delay = stub.faults.pop(0) if stub.faults else (stub.status, stub.delay)
+                time.sleep(delay)
+                body = json.dumps(stub.payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/jokes/random"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_upstream():
+    stub = StubUpstream()
+    yield stub
+    stub.close()
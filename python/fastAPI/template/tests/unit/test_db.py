@@ -62,3 +62,131 @@ def test_init_db_missing_env_raises(missing_key, monkeypatch):
     with pytest.raises(EnvironmentError) as exc_info:
         db.init_db()
     assert missing_key in str(exc_info.value)
+
+
+def test_warm_pool_opens_pool_size_connections(tmp_path, monkeypatch):
+    """warm_pool opens pool_size connections concurrently and returns them to the pool."""
+    from sqlalchemy import create_engine
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'warm.db'}",
+        connect_args={"check_same_thread": False},
+        pool_size=3,
+        max_overflow=0
+    )
+    monkeypatch.setattr(db, "engine", engine)
+
+    assert db.warm_pool() == 3
+    assert engine.pool.checkedin() == 3
+    assert engine.pool.checkedout() == 0
+    engine.dispose()
+
+
+def test_warm_pool_requires_init(monkeypatch):
+    monkeypatch.setattr(db, "engine", None)
+    with pytest.raises(RuntimeError):
+        db.warm_pool()
+
+
+def test_pipeline_falls_back_to_sequential_execution(db_session):
+    """Drivers without pipeline mode run the statements one by one in the session."""
+    from sqlalchemy import select, literal, text
+    results = db.pipeline(db_session, [
+        (text("CREATE TEMP TABLE pipeline_test (x INTEGER)"), None),
+        (select(literal(1) + literal(2)), None),
+    ])
+    assert results[0] is None
+    assert [tuple(row) for row in results[1]] == [(3,)]
+
+
+def test_pipeline_uses_psycopg_pipeline_mode():
+    """With psycopg 3, statements are compiled once and executed inside raw.pipeline()."""
+    from sqlalchemy import select, literal
+    from sqlalchemy.dialects import postgresql
+
+    raw = mock.MagicMock()
+    events = []
+    raw.pipeline.return_value.__enter__.side_effect = lambda *a: events.append("enter")
+    raw.pipeline.return_value.__exit__.side_effect = lambda *a: events.append("sync")
+    cursor = raw.cursor.return_value
+    cursor.execute.side_effect = lambda *a: events.append("execute")
+    cursor.fetchall.side_effect = lambda: events.append("fetch") or [(7,)]
+
+    session = mock.MagicMock()
+    session.connection.return_value.connection.driver_connection = raw
+    session.get_bind.return_value.dialect = postgresql.psycopg.dialect()
+
+    results = db.pipeline(session, [(select(literal(7)), None), (select(literal(7)), None)])
+
+    assert results == [[(7,)], [(7,)]]
+    assert events == ["enter", "execute", "execute", "sync", "fetch", "fetch"]
+    sql, params = cursor.execute.call_args.args
+    assert "%(param_1)s" in sql and params == {"param_1": 7}
+
+
+def test_pipeline_expands_in_lists_and_runs_bind_processors():
+    """Statements sent to the driver get SQLAlchemy's post-compile expansion and type conversion."""
+    import enum
+    from sqlalchemy import Column, Enum, Integer, MetaData, Table, bindparam, literal, select
+    from sqlalchemy.dialects import postgresql
+
+    class Color(enum.Enum):
+        red = 1
+
+    table = Table("items", MetaData(), Column("id", Integer), Column("color", Enum(Color)))
+    statement = select(table.c.id).where(
+        table.c.id.in_(bindparam("ids", expanding=True)),
+        table.c.color == Color.red,
+        table.c.id != literal(0, literal_execute=True)
+    )
+
+    sql, params = db._compile_for_driver(statement, {"ids": [1, 2]}, postgresql.psycopg.dialect())
+
+    assert "POSTCOMPILE" not in sql
+    assert "items.id IN (%(ids_1)s::INTEGER, %(ids_2)s::INTEGER)" in sql
+    assert "items.id != 0" in sql
+    assert params == {"ids_1": 1, "ids_2": 2, "color_1": "red"}
+
+
+def test_init_db_psycopg_driver(monkeypatch):
+    monkeypatch.setenv("POSTGRES_USER", "user")
+    monkeypatch.setenv("POSTGRES_PASSWORD", "pass")
+    monkeypatch.setenv("POSTGRES_HOST", "localhost")
+    monkeypatch.setenv("POSTGRES_PORT", "5432")
+    monkeypatch.setenv("POSTGRES_DB", "testdb")
+    monkeypatch.setenv("DB_DRIVER", "psycopg")
+
+    with mock.patch("framework.db.create_engine") as mock_engine:
+        db.init_db()
+        assert mock_engine.call_args.args[0].startswith("postgresql+psycopg://")
+
+
+def test_backoff_delay_is_bounded():
+    import app as app_module
+    for attempt in range(10):
+        delay = app_module.backoff_delay(attempt, 0.5, 10)
+        assert 0 <= delay <= min(10, 0.5 * 2 ** attempt)
+
+
+@pytest.mark.asyncio
+async def test_lifespan_retries_with_async_backoff(monkeypatch):
+    """Startup retries failed connects with non-blocking sleeps until one succeeds."""
+    import app as app_module
+    monkeypatch.delenv("TESTING", raising=False)
+    monkeypatch.setenv("RECENT_CACHE_REFRESH_SECONDS", "0")  # its refresh loop would also sleep
+    attempts = []
+
+    def flaky_connect():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+        return 10
+
+    sleep = mock.AsyncMock()
+    monkeypatch.setattr(app_module, "connect_database", flaky_connect)
+    monkeypatch.setattr(app_module.asyncio, "sleep", sleep)
+
+    async with app_module.lifespan(app):
+        pass
+
+    assert len(attempts) == 3
+    assert sleep.await_count == 2
@@ -0,0 +1,63 @@
+import httpx
+import pytest
+from framework.http_client import HttpClient, RetryBudget, create_client
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, burst=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_upstream_errors(stub_upstream):
+    stub_upstream.faults = [(503, 0), (502, 0)]
+    http = HttpClient(httpx.AsyncClient(), max_retries=2, backoff_base=0)
+    try:
+        response = await http.get(stub_upstream.url)
+    finally:
+        await http.aclose()
+    assert response.status_code == 200
+    assert stub_upstream.requests == 3
+    assert http.stats["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_returns_failure_without_retrying(stub_upstream):
+    stub_upstream.status = 503
+    http = HttpClient(httpx.AsyncClient(), max_retries=3, budget=RetryBudget(ratio=0, burst=0), backoff_base=0)
+    try:
+        response = await http.get(stub_upstream.url)
+    finally:
+        await http.aclose()
+    assert response.status_code == 503
+    assert stub_upstream.requests == 1
+    assert http.stats["retries_denied"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_timeout_is_enforced(stub_upstream):
+    stub_upstream.delay = 0.5
+    http = HttpClient(httpx.AsyncClient(timeout=0.1), max_retries=0)
+    try:
+        with pytest.raises(httpx.ReadTimeout):
+            await http.get(stub_upstream.url)
+    finally:
+        await http.aclose()
+
+
+@pytest.mark.asyncio
+async def test_create_client_reads_environment(monkeypatch):
+    monkeypatch.setenv("HTTP_CONNECT_TIMEOUT", "1.5")
+    monkeypatch.setenv("HTTP_READ_TIMEOUT", "3")
+    monkeypatch.setenv("HTTP_MAX_RETRIES", "4")
+    http = create_client()
+    try:
+        assert http.client.timeout.connect == 1.5
+        assert http.client.timeout.read == 3
+        assert http.max_retries == 4
+    finally:
+        await http.aclose()
@@ -1,5 +1,5 @@
 from sqlalchemy import inspect
-from models.chuck_joke import ChuckJoke
+from models.chuck_joke import ChuckJoke, hash_joke
 
 def test_chuckjoke_model_definition():
     """Test the ChuckJoke model's SQLAlchemy table and columns."""
@@ -12,6 +12,7 @@ def test_chuckjoke_model_definition():
     columns = {c.key: c for c in mapper.columns}
     assert "id" in columns
     assert "joke" in columns
+    assert "joke_hash" in columns
     assert "create_date" in columns
 
     # id column
@@ -22,11 +23,33 @@ def test_chuckjoke_model_definition():
 
     # joke column
     joke_col = columns["joke"]
-    assert joke_col.unique
+    assert not joke_col.unique
     assert joke_col.nullable is False
     assert str(joke_col.type).startswith("VARCHAR") or str(joke_col.type).startswith("String")
 
+    # joke_hash column carries the unique index
+    hash_col = columns["joke_hash"]
+    assert hash_col.unique
+    assert hash_col.nullable is False
+    assert hash_col.type.length == 32
+
     # create_date column
     date_col = columns["create_date"]
     assert date_col.nullable is True or date_col.nullable is False  # default datetime allows nullable in some DBs
     assert str(date_col.type).startswith("DATETIME") or str(date_col.type).startswith("DateTime")
+    assert date_col.index
+
+
+def test_hash_joke_is_fixed_width():
+    """Jokes of any length hash to 32 bytes; equal text hashes equal"""
+    assert len(hash_joke("short")) == 32
+    assert len(hash_joke("long " * 10000)) == 32
+    assert hash_joke("Chuck Norris can divide by zero.") == hash_joke("Chuck Norris can divide by zero.")
+
+
+def test_joke_hash_follows_joke():
+    """Setting the joke through the ORM keeps joke_hash in step"""
+    joke = ChuckJoke(joke="Chuck Norris can divide by zero.")
+    assert joke.joke_hash == hash_joke("Chuck Norris can divide by zero.")
+    joke.joke = "Chuck Norris can count to infinity twice."
+    assert joke.joke_hash == hash_joke("Chuck Norris can count to infinity twice.")
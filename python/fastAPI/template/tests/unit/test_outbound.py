@@ -0,0 +1,108 @@
+import asyncio
+import time
+import pytest
+from framework import outbound
+from framework.outbound import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, OutboundPolicy
+
+
+def test_breaker_opens_on_error_rate():
+    breaker = CircuitBreaker(window=10, min_calls=4, error_threshold=0.5, open_seconds=60)
+    for success in (True, False, True):
+        breaker.record(success, 0.01)
+    assert breaker.state == CLOSED  # below min_calls
+
+    breaker.record(False, 0.01)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert 59 < breaker.retry_after() <= 60
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker(window=10, min_calls=4, slow_threshold=0.5, slow_call_seconds=0.2)
+    for duration in (0.01, 0.5, 0.01, 0.5):
+        breaker.record(True, duration)
+    assert breaker.state == OPEN
+
+
+def test_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0.05)
+    breaker.record(False, 0.01)
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # the trial is in flight
+
+    breaker.record(False, 0.01)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True, 0.01)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["window_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_policy_rejects_without_calling_when_open():
+    policy = OutboundPolicy("test_open", CircuitBreaker(min_calls=1, open_seconds=60))
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        await policy.call(failing)
+    with pytest.raises(CircuitOpenError):
+        await policy.call(failing)
+    assert await policy.call(failing, fallback=lambda: "cached") == "cached"
+
+    assert len(calls) == 1
+    assert policy.stats["short_circuited"] == 2
+    assert policy.stats["fallbacks"] == 1
+    assert outbound.snapshot_all()["test_open"]["state"] == OPEN
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_wins_over_slow_first_attempt():
+    policy = OutboundPolicy("test_hedge", CircuitBreaker(), hedge=True)
+    for _ in range(outbound.HEDGE_MIN_SAMPLES):
+        await policy.call(lambda: asyncio.sleep(0, "warm"))
+    delays = [1.0, 0.0]
+
+    async def attempt():
+        await asyncio.sleep(delays.pop(0))
+        return "ok"
+
+    start = time.monotonic()
+    assert await policy.call(attempt) == "ok"
+    assert time.monotonic() - start < 0.5
+    assert policy.stats["hedged"] == 1
+    assert policy.stats["hedge_wins"] == 1
+
+
+def test_sync_hedged_call_wins_over_slow_first_attempt():
+    policy = OutboundPolicy("test_hedge_sync", CircuitBreaker(), hedge=True)
+    for _ in range(outbound.HEDGE_MIN_SAMPLES):
+        policy.call_sync(lambda: "warm")
+    delays = [1.0, 0.0]
+
+    def attempt():
+        time.sleep(delays.pop(0))
+        return "ok"
+
+    start = time.monotonic()
+    assert policy.call_sync(attempt) == "ok"
+    assert time.monotonic() - start < 0.5
+    assert policy.stats["hedge_wins"] == 1
+
+
+def test_no_hedging_until_enough_samples():
+    policy = OutboundPolicy("test_cold", CircuitBreaker(), hedge=True)
+    assert policy.hedge_delay() is None
+    for _ in range(outbound.HEDGE_MIN_SAMPLES):
+        policy.call_sync(lambda: None)
+    assert policy.hedge_delay() == outbound.HEDGE_MIN_DELAY
+    assert OutboundPolicy("test_off", CircuitBreaker(), hedge=False).hedge_delay() is None
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from api import sample
+from framework.prefetch import PrefetchBuffer, buffer_from_env
+
+
+def counter_fetch(fail_first=0):
+    calls = {"n": 0}
+
+    async def fetch():
+        calls["n"] += 1
+        if calls["n"] <= fail_first:
+            raise RuntimeError("upstream down")
+        return {"value": f"joke {calls['n']}"}
+    return fetch, calls
+
+
+@pytest.mark.asyncio
+async def test_buffer_fills_to_capacity_and_serves_in_order():
+    fetch, calls = counter_fetch()
+    buffer = PrefetchBuffer(fetch, size=3, rate=0)
+    buffer.start()
+    await asyncio.sleep(0.05)
+
+    assert buffer.snapshot()["depth"] == 3
+    assert calls["n"] == 3  # stops fetching when full
+    assert buffer.pop() == {"value": "joke 1"}
+
+    await asyncio.sleep(0.05)  # pop wakes the refill task
+    assert buffer.snapshot()["depth"] == 3
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_cold_miss_then_stale_while_revalidate():
+    fetch, _ = counter_fetch()
+    buffer = PrefetchBuffer(fetch, size=1, rate=0)
+
+    assert buffer.pop() is None
+    buffer._items.append({"value": "fresh"})
+    assert buffer.pop() == {"value": "fresh"}
+    assert buffer.pop() == {"value": "fresh"}  # empty again: last payload served stale
+
+    stats = buffer.snapshot()
+    assert (stats["misses"], stats["hits"], stats["stale"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_fetch_errors_are_counted_and_retried():
+    fetch, _ = counter_fetch(fail_first=2)
+    buffer = PrefetchBuffer(fetch, size=1, rate=0, error_backoff=0.001)
+    buffer.start()
+    await asyncio.sleep(0.05)
+    await buffer.stop()
+
+    assert buffer.snapshot()["errors"] == 2
+    assert buffer.snapshot()["depth"] == 1
+    assert buffer.backoff_delay() == 0  # reset by the successful fetch
+
+
+@pytest.mark.asyncio
+async def test_failing_upstream_is_retried_with_backoff_regardless_of_rate():
+    fetch, calls = counter_fetch(fail_first=1000)
+    buffer = PrefetchBuffer(fetch, size=1, rate=0, error_backoff=0.02, max_error_backoff=0.05)
+    buffer.start()
+    await asyncio.sleep(0.2)
+    await buffer.stop()
+
+    # Waits 0.02, 0.04, then 0.05 between attempts instead of spinning
+    assert 3 <= calls["n"] <= 6
+    assert buffer.backoff_delay() == 0.05
+
+
+def test_buffer_from_env(monkeypatch):
+    async def fetch():
+        return {}
+    monkeypatch.setenv("PREFETCH_BUFFER_SIZE", "0")
+    assert buffer_from_env(fetch) is None
+    monkeypatch.setenv("PREFETCH_BUFFER_SIZE", "8")
+    assert buffer_from_env(fetch).size == 8
+
+
+def test_sample_serves_from_buffer_without_upstream_call(stub_upstream, client, mock_joke_response, monkeypatch):
+    async def unused():
+        raise AssertionError("upstream should not be called")
+    buffer = PrefetchBuffer(unused, size=2)
+    buffer._items.append({**mock_joke_response, "id": "prefetched"})
+    monkeypatch.setattr(sample, "joke_buffer", buffer)
+    monkeypatch.setattr(sample, "JOKE_API_URL", stub_upstream.url)
+
+    response = client.get("/api/${{values.app_name}}/v1/sample")
+
+    assert response.status_code == 200
+    assert response.json()["api_data"]["id"] == "prefetched"
+    assert stub_upstream.requests == 0
+
+    metrics = client.get("/api/${{values.app_name}}/v1/metrics").json()
+    assert metrics["prefetch"]["hits"] == 1
+    assert metrics["http_client"]["requests"] == 0
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from framework import recent_cache
+from framework.recent_cache import RecentCache
+
+
+def row(i):
+    return {"id": i, "joke": f"Joke #{i}", "create_date": f"2024-01-01T00:00:{i:02d}"}
+
+
+def test_items_unavailable_until_loaded():
+    cache = RecentCache(lambda: [row(1)], size=3)
+    assert cache.items() is None
+    cache.refresh()
+    assert cache.items() == [row(1)]
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_add_keeps_newest_first_and_bounded():
+    cache = RecentCache(lambda: [row(2), row(1)], size=3)
+    cache.refresh()
+    cache.add(row(3))
+    cache.add(row(4))
+    assert [item["id"] for item in cache.items()] == [4, 3, 2]
+
+    cache.add(row(4))  # already present, e.g. picked up by a reload
+    assert [item["id"] for item in cache.items()] == [4, 3, 2]
+    assert cache.stats["added"] == 2
+
+
+def test_refresh_replaces_with_database_view():
+    rows = [row(1)]
+    cache = RecentCache(lambda: list(rows), size=2)
+    cache.refresh()
+    rows[:] = [row(9), row(8), row(7)]  # inserted by another replica
+    cache.refresh()
+    assert cache.items() == [row(9), row(8)]
+
+
+def test_stale_cache_is_not_served(monkeypatch):
+    cache = RecentCache(lambda: [row(1)], size=2, refresh_seconds=0.01)
+    cache.refresh()
+    monkeypatch.setattr(recent_cache.time, "monotonic", lambda: 1e12)
+    assert cache.items() is None
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_and_error_count():
+    calls = []
+
+    def load():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("db down")
+        return [row(len(calls))]
+
+    cache = RecentCache(load, size=2, refresh_seconds=0.01)
+    cache.start()
+    await asyncio.sleep(0.1)
+    await cache.stop()
+    assert cache.stats["errors"] == 1
+    assert cache.stats["refreshes"] >= 1
+    assert cache.items() is not None
+
+
+def test_cache_from_env(monkeypatch):
+    monkeypatch.setenv("RECENT_CACHE_REFRESH_SECONDS", "0")
+    assert recent_cache.cache_from_env(list, size=10) is None
+    monkeypatch.setenv("RECENT_CACHE_REFRESH_SECONDS", "2")
+    cache = recent_cache.cache_from_env(list, size=10)
+    assert (cache.size, cache.refresh_seconds) == (10, 2)
@@ -1,108 +1,148 @@
 import pytest
-from unittest.mock import patch
+from api import sample
+from framework.outbound import CircuitBreaker, OutboundPolicy
+from framework.recent_cache import RecentCache
 from models.chuck_joke import ChuckJoke
 
+
 @pytest.fixture(autouse=True)
-def mock_requests():
-    with patch('requests.get') as mock_get:
-        yield mock_get
-
-
-def test_sample_inserts_new_joke(mock_requests, client, db_session):
-    mock_requests.return_value.json.return_value = {
-        "id": "test123",
-        "value": "Chuck Norris can divide by zero.",
-        "created_at": "2020-01-01T00:00:00.000Z"
-    }
-    
-    # Make the API call
-    response = client.get("/api/${{values.app_name}}/v1/sample")
-    assert response.status_code == 200
+def upstream(stub_upstream, mock_joke_response, monkeypatch):
+    """Point the sample endpoint at the local stub instead of the real joke API."""
+    stub_upstream.payload = mock_joke_response
+    monkeypatch.setattr(sample, "JOKE_API_URL", stub_upstream.url)
+    monkeypatch.setattr(sample, "joke_policy", OutboundPolicy("joke_api", CircuitBreaker(min_calls=3, open_seconds=60)))
+    monkeypatch.setattr(sample, "last_joke", None)
+    return stub_upstream
 
-    print("API Response:", response.json())
-    print("All jokes in DB:", db_session.query(ChuckJoke).all())
 
-    # Verify the database state
-    db_session.commit()  # Commit the nested transaction
-    assert db_session.query(ChuckJoke).count() == 1
-    joke = db_session.query(ChuckJoke).first()
-    assert joke.joke == "Chuck Norris can divide by zero."
-    
-    # Verify database state
-    current_count = db_session.query(ChuckJoke).count()
-    print(f"Count before: {initial_count}, after: {current_count}")
-    assert current_count == initial_count + 1
-    
-    # Verify mock and specific record
-    mock_requests.assert_called_once_with('https://api.chucknorris.io/jokes/random')
-    joke = db_session.query(ChuckJoke).first()
-    assert joke.joke == "Chuck Norris can divide by zero."
-
-def test_sample_inserts_new_joke(mock_requests, client, db_session, mock_joke_response):
+def test_sample_inserts_new_joke(upstream, client, db_session):
     """Test that /sample inserts a new joke and verifies DB state"""
-    mock_requests.return_value.json.return_value = mock_joke_response
-    
-    # Test API response
     response = client.get("/api/${{values.app_name}}/v1/sample")
     assert response.status_code == 200
     data = response.json()
     assert "Chuck Norris can divide by zero." in [j["joke"] for j in data["jokes"]]
     assert len(data["jokes"]) == 1
-    
-    # Verify mock and database
-    mock_requests.assert_called_once_with('https://api.chucknorris.io/jokes/random')
+
+    # Verify upstream call and database
+    assert upstream.requests == 1
     assert db_session.query(ChuckJoke).count() == 1
 
-def test_sample_does_not_duplicate_jokes(mock_requests, client, db_session, mock_joke_response):
-    """Test duplicate prevention with both API and DB checks"""
-    mock_requests.return_value.json.return_value = mock_joke_response
 
-    # First call
+def test_sample_does_not_duplicate_jokes(client, db_session):
+    """Test duplicate prevention with both API and DB checks"""
     client.get("/api/${{values.app_name}}/v1/sample")
     assert db_session.query(ChuckJoke).count() == 1
-    
-    # Second call
+
     response = client.get("/api/${{values.app_name}}/v1/sample")
     jokes = response.json()["jokes"]
-    
-    # Verify both API response and DB state
+
     assert len(jokes) == 1
     assert db_session.query(ChuckJoke).count() == 1
 
-def test_sample_returns_latest_10_jokes(mock_requests, client, mock_joke_response):
+
+def test_sample_returns_latest_10_jokes(upstream, client, mock_joke_response):
     """Test joke ordering and limiting"""
     for i in range(12):
-        mock_requests.return_value.json.return_value = {
-            **mock_joke_response,
-            "id": f"joke-{i}",
-            "value": f"Joke #{i}"
-        }
+        upstream.payload = {**mock_joke_response, "id": f"joke-{i}", "value": f"Joke #{i}"}
         client.get("/api/${{values.app_name}}/v1/sample")
 
     response = client.get("/api/${{values.app_name}}/v1/sample")
     jokes = response.json()["jokes"]
-    
-    # Verify exact ordering and count
+
     assert len(jokes) == 10
     assert [j["joke"] for j in jokes] == [f"Joke #{i}" for i in range(11, 1, -1)]
 
-def test_sample_handles_api_failure(mock_requests, client):
-    """Test API failure handling"""
-    mock_requests.side_effect = Exception("API Error")
+
+def test_sample_reuses_upstream_connection(upstream, client):
+    """The shared client keeps the upstream connection alive between requests"""
+    for _ in range(5):
+        assert client.get("/api/${{values.app_name}}/v1/sample").status_code == 200
+    assert upstream.requests == 5
+    assert upstream.connections == 1
+
+
+def test_sample_handles_api_failure(upstream, client):
+    """Upstream errors map to 502 after budgeted retries"""
+    upstream.status = 503
     response = client.get("/api/${{values.app_name}}/v1/sample")
-    assert response.status_code == 500
-    assert "API Error" in response.json()["detail"]
-    mock_requests.assert_called_once_with('https://api.chucknorris.io/jokes/random')
+    assert response.status_code == 502
+    assert "503" in response.json()["detail"]
 
-from unittest.mock import MagicMock
 
-def test_sample_handles_invalid_joke(mock_requests, client):
+def test_sample_handles_upstream_timeout(upstream, client, monkeypatch):
+    """A hung upstream fails with 502 at the read timeout instead of blocking"""
+    import framework.http_client
+    upstream.delay = 0.5
+    monkeypatch.setattr(framework.http_client.get_http_client().client.timeout, "read", 0.1)
+    monkeypatch.setattr(framework.http_client.get_http_client(), "max_retries", 0)
+    response = client.get("/api/${{values.app_name}}/v1/sample")
+    assert response.status_code == 502
+
+
+def test_sample_handles_invalid_joke(upstream, client):
     """Test invalid response handling"""
-    mock_response = MagicMock()
-    mock_response.raise_for_status.return_value = None
-    mock_response.json.return_value = {"invalid": "data"}
-    mock_requests.return_value = mock_response
+    upstream.payload = {"invalid": "data"}
     response = client.get("/api/${{values.app_name}}/v1/sample")
 
     assert response.status_code == 422
-    mock_requests.assert_called_once_with('https://api.chucknorris.io/jokes/random')
+    assert upstream.requests == 1
+
+
+def test_sample_fails_fast_when_circuit_opens(upstream, client, monkeypatch):
+    """After repeated upstream failures the circuit opens and requests stop reaching the upstream"""
+    import framework.http_client
+    monkeypatch.setattr(framework.http_client.get_http_client(), "max_retries", 0)
+    upstream.status = 503
+    for _ in range(3):
+        assert client.get("/api/${{values.app_name}}/v1/sample").status_code == 502
+
+    response = client.get("/api/${{values.app_name}}/v1/sample")
+    assert response.status_code == 503
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+    assert upstream.requests == 3
+
+    outbound = client.get("/api/${{values.app_name}}/v1/metrics").json()["outbound"]["joke_api"]
+    assert outbound["state"] == "open"
+    assert outbound["short_circuited"] == 1
+
+
+def test_sample_serves_last_joke_while_upstream_fails(upstream, client, monkeypatch):
+    """With a joke already served, upstream failures fall back to it instead of erroring"""
+    import framework.http_client
+    monkeypatch.setattr(framework.http_client.get_http_client(), "max_retries", 0)
+    assert client.get("/api/${{values.app_name}}/v1/sample").status_code == 200
+
+    upstream.status = 503
+    for _ in range(5):
+        response = client.get("/api/${{values.app_name}}/v1/sample")
+        assert response.status_code == 200
+        assert response.headers["X-Upstream-Fallback"] == "joke_api"
+        assert response.json()["api_data"]["stale"] is True
+    assert upstream.requests == 3  # the circuit opened after two failures in a window of three
+    assert sample.joke_policy.stats["fallbacks"] == 5
+
+
+def test_sample_insert_is_single_on_conflict_statement():
+    """Dedup compiles to one INSERT ... ON CONFLICT DO NOTHING on the hash column for PostgreSQL"""
+    from sqlalchemy.dialects import postgresql
+    statement = sample.insert_joke_statement("postgresql", "Chuck Norris can divide by zero.")
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO chuck_jokes")
+    assert "ON CONFLICT (joke_hash) DO NOTHING" in sql
+
+
+def test_sample_serves_latest_jokes_from_cache(upstream, client, mock_joke_response, monkeypatch):
+    """With the cache loaded, new jokes are added to it and the list is served from memory"""
+    cache = RecentCache(lambda: [{"id": 0, "joke": "Seeded", "create_date": "2024-01-01T00:00:00"}], size=2)
+    cache.refresh()
+    monkeypatch.setattr(sample, "latest_cache", cache)
+    monkeypatch.setattr(sample, "latest_jokes_statement", lambda: pytest.fail("latest jokes read from the DB"))
+
+    upstream.payload = {**mock_joke_response, "id": "cached-1", "value": "Cached joke"}
+    jokes = client.get("/api/${{values.app_name}}/v1/sample").json()["jokes"]
+    assert [j["joke"] for j in jokes] == ["Cached joke", "Seeded"]
+
+    # A joke that already exists is not added again
+    jokes = client.get("/api/${{values.app_name}}/v1/sample").json()["jokes"]
+    assert [j["joke"] for j in jokes] == ["Cached joke", "Seeded"]
+    assert cache.stats["added"] == 1
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+import pytest
+from framework.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.1)
+        return value * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow, 21))) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [42] * 10
+    assert calls == [21]
+    assert flight.stats == {"executed": 1, "collapsed": 9}
+
+
+def test_exception_is_shared_and_next_call_runs_again():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert flight.do("k", lambda: "fresh") == "fresh"
+    assert flight.stats["executed"] == 2
+
+
+def test_different_keys_do_not_collapse():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats == {"executed": 2, "collapsed": 0}
+
+
+@pytest.mark.asyncio
+async def test_async_callers_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "joke"
+
+    results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(50)))
+
+    assert results == ["joke"] * 50
+    assert calls == [1]
+    assert flight.stats == {"executed": 1, "collapsed": 49}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", fetch))
+    second = asyncio.ensure_future(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+def test_metrics_report_singleflight_counters(client):
+    body = client.get("/api/${{values.app_name}}/v1/metrics").json()
+    assert set(body["singleflight"]) == {"upstream", "db"}
+    assert set(body["singleflight"]["db"]) == {"executed", "collapsed"}
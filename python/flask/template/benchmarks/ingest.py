@@ -0,0 +1,77 @@
+"""
+Weather ingest throughput: one INSERT per reading (what collectors did before) versus the
+batched multi-row INSERT ... ON CONFLICT DO NOTHING used by the ingest endpoint.
+
+Usage:
+    PYTHONPATH=src python benchmarks/ingest.py [--rows 20000] [--batch 1000]
+
+Needs PostgreSQL, configured like the app (DATABASE_URL or POSTGRES_*). Readings are
+written to weather_current with collection_times in the year 2100 and deleted afterwards,
+with the rollup's dirty hours they mark.
+The batched run is repeated to show the cost of a batch that is all duplicates.
+"""
+import argparse
+import datetime
+import time
+
+from app import RollupDirtyHour, WeatherCurrent, app, db, insert_readings
+
+SCRATCH_START = datetime.datetime(2100, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def make_rows(count, offset):
+    return [
+        {
+            "collection_time": SCRATCH_START + datetime.timedelta(seconds=offset + i),
+            "temperature": 20 + i % 10,
+            "temperature_min": 15,
+            "temperature_max": 25,
+            "humidity": 40 + i % 30,
+            "description": "benchmark",
+            "feels_like": 19,
+            "wind_speed": 3.5,
+            "wind_direction": i % 360,
+        }
+        for i in range(count)
+    ]
+
+
+def report(label, rows, seconds, extra=""):
+    print(f"{label:<28} {rows / seconds:>10.0f} rows/s   {seconds:>7.2f} s{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    table = WeatherCurrent.__table__
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            raise SystemExit("This benchmark needs PostgreSQL")
+        try:
+            rows = make_rows(args.rows, 0)
+            start = time.perf_counter()
+            for row in rows:
+                with db.engine.begin() as connection:
+                    connection.execute(table.insert().values(row))
+            report("INSERT per reading", len(rows), time.perf_counter() - start)
+
+            for label in ("batched ON CONFLICT", "batched, all duplicates"):
+                rows = make_rows(args.rows, args.rows)
+                inserted = 0
+                start = time.perf_counter()
+                for i in range(0, len(rows), args.batch):
+                    with db.engine.begin() as connection:
+                        inserted += len(insert_readings(connection, rows[i:i + args.batch]))
+                report(label, len(rows), time.perf_counter() - start, f"   inserted {inserted}")
+        finally:
+            with db.engine.begin() as connection:
+                connection.execute(table.delete().where(table.c.collection_time >= SCRATCH_START))
+                dirty = RollupDirtyHour.__table__
+                connection.execute(dirty.delete().where(dirty.c.bucket_start >= SCRATCH_START))
+
+
+if __name__ == "__main__":
+    main()
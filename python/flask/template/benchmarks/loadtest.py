@@ -0,0 +1,123 @@
+"""
+Load test: throughput of the app under gunicorn as the worker count grows.
+
+Usage:
+    python benchmarks/loadtest.py [--workers 1,2,4] [--worker-class gthread] [--threads 4]
+                                  [--clients 8] [--duration 10] [--path PATH] [--url URL]
+
+For each worker count a gunicorn is started from src/ with gunicorn.conf.py and the
+GUNICORN_* settings above, then --clients load-generating processes send keep-alive GETs
+to --path for --duration seconds. With --url an already running server is measured once
+instead. Throughput should grow with workers until they exceed the CPUs available (the
+default path does not touch the database; point --path at the sample endpoint to include
+a database round trip).
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def client(url, duration, results):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", parts.path)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+    results.put((latencies, errors))
+
+
+def measure(label, url, clients, duration):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client, args=(url, duration, results)) for _ in range(clients)]
+    for process in processes:
+        process.start()
+    latencies, errors = [], 0
+    for _ in processes:
+        process_latencies, process_errors = results.get()
+        latencies += process_latencies
+        errors += process_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000 if latencies else 0
+    print(f"{label:<12} {len(latencies) / duration:>8.0f} req/s   p50 {p50:>7.2f} ms   "
+          f"p99 {p99:>7.2f} ms   errors {errors}")
+
+
+def start_gunicorn(workers, worker_class, threads, port):
+    env = {
+        **os.environ,
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_WORKER_CLASS": worker_class,
+        "GUNICORN_THREADS": str(threads),
+        "PORT": str(port),
+    }
+    # The app only builds its database URI at import; it connects on first query
+    for key in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_HOST", "POSTGRES_PORT", "POSTGRES_DB"):
+        env.setdefault(key, {"POSTGRES_PORT": "5432", "POSTGRES_HOST": "localhost"}.get(key, "postgres"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--log-level", "warning", "app:app"],
+        cwd=SRC, env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("gunicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--worker-class", default="gthread")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--path", default="/api/${{values.app_name}}/v1/info")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.duration:.0f}s per run, {args.worker_class}")
+    if args.url:
+        measure("external", args.url, args.clients, args.duration)
+        return
+    for workers in (int(w) for w in args.workers.split(",")):
+        server = start_gunicorn(workers, args.worker_class, args.threads, args.port)
+        try:
+            measure(f"{workers} workers", f"http://127.0.0.1:{args.port}{args.path}", args.clients, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Request logging overhead: per-request hooks logging synchronously (the previous setup)
+versus RequestLoggingMiddleware with the queue handler from framework.request_logging.
+
+Usage:
+    PYTHONPATH=src python benchmarks/logging_overhead.py [--requests 5000] [--export-us 50]
+
+A minimal Flask app is called through the WSGI test client. The exporting handler
+serializes each record and sleeps --export-us microseconds to stand in for a synchronous
+export; with the queue that cost moves to the listener thread. Reports time per request
+on the request thread relative to no logging.
+"""
+import argparse
+import datetime
+import json
+import logging
+import socket
+import time
+import uuid
+
+from flask import Flask, g, request
+
+from framework.request_logging import RequestLoggingMiddleware, setup_logging, stop_logging
+
+
+class ExportHandler(logging.Handler):
+    def __init__(self, export_us):
+        super().__init__()
+        self.export_seconds = export_us / 1e6
+        self.count = 0
+
+    def emit(self, record):
+        json.dumps(record.msg, default=str)
+        time.sleep(self.export_seconds)
+        self.count += 1
+
+
+def make_app():
+    app = Flask(__name__)
+
+    @app.route("/info")
+    def info():
+        return {"status": "UP"}
+
+    return app
+
+
+def add_hooks(app, logger):
+    """The before_request/after_request logging this template used before."""
+    @app.before_request
+    def start_request():
+        g.transaction_id = str(uuid.uuid4())
+        g.start_time = time.time()
+        logger.info({
+            "level": "INFO", "event": "Request", "method": request.method, "path": request.path,
+            "endpoint": request.path.rsplit('/', 1)[-1], "remote_addr": request.remote_addr,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "hostname": socket.gethostname(), "transaction_id": g.transaction_id
+        })
+
+    @app.after_request
+    def finish_response(response):
+        logger.info({
+            "level": "INFO", "event": "Response", "method": request.method, "path": request.path,
+            "endpoint": request.path.rsplit('/', 1)[-1],
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "duration_seconds": round(time.time() - g.start_time, 4), "status": response.status_code,
+            "transaction_id": g.transaction_id
+        })
+        return response
+
+
+def run(label, app, total, baseline=None):
+    client = app.test_client()
+    for _ in range(100):
+        client.get("/info")
+    start = time.perf_counter()
+    for _ in range(total):
+        client.get("/info")
+    per_request = (time.perf_counter() - start) / total * 1e6
+    extra = f"   +{per_request - baseline:>6.1f} us logging" if baseline is not None else ""
+    print(f"{label:<22} {per_request:>8.1f} us/request{extra}")
+    return per_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--export-us", type=float, default=50)
+    args = parser.parse_args()
+
+    baseline = run("no logging", make_app(), args.requests)
+
+    logger = logging.getLogger("benchmark.sync")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(ExportHandler(args.export_us))
+    app = make_app()
+    add_hooks(app, logger)
+    run("hooks, sync handler", app, args.requests, baseline)
+
+    target = ExportHandler(args.export_us)
+    root = setup_logging(target)
+    app = make_app()
+    app.wsgi_app = RequestLoggingMiddleware(app.wsgi_app, root, app_name="benchmark", env="local")
+    run("middleware + queue", app, args.requests, baseline)
+    start = time.perf_counter()
+    stop_logging()
+    print(f"listener drained {target.count} records ({time.perf_counter() - start:.2f}s after the run)")
+
+
+if __name__ == "__main__":
+    main()
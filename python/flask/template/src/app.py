@@ -1,111 +1,79 @@
 import datetime
+import decimal
+import json
 import logging
+import math
 import os
 import requests
 import socket
+import threading
 import time
 import traceback
-import uuid
-from flask import Flask, jsonify, request, g
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from opentelemetry.sdk._logs import LoggingHandler
 from opentelemetry.instrumentation.flask import FlaskInstrumentor
+from framework.db import checkout_connection, connect, database_uri, engine_options, instrument_engine, snapshot_pools
+from framework.outbound import CircuitOpenError, OutboundPolicy, snapshot_all
+from framework.request_logging import TRANSACTION_ID_KEY, RequestLoggingMiddleware, logging_stats, setup_logging
+from framework.singleflight import SingleFlight
 
 
-# Setup Logging
-logger = logging.getLogger()
-logger.handlers.clear()
-logger.propagate = False
-logger.setLevel(logging.INFO)
-logger.addHandler(LoggingHandler())
+# Setup Logging: records are exported by a background thread, not the request thread
+logger = setup_logging(LoggingHandler())
 
 # Setup Flask app
 app = Flask(__name__)
+HOSTNAME = socket.gethostname()
 
-# Setup Database
-POSTGRES_USER = os.environ.get("POSTGRES_USER")
-POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD")
-POSTGRES_HOST = os.environ.get("POSTGRES_HOST")
-POSTGRES_PORT = os.environ.get("POSTGRES_PORT")
-POSTGRES_DB = os.environ.get("POSTGRES_DB")
-app.config['SQLALCHEMY_DATABASE_URI'] = (
-    f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
-    f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-)
+# Setup Database (pool settings: see framework/db.py)
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
 db = SQLAlchemy(app)
+with app.app_context():
+    instrument_engine(db.engine, 'primary')
 
 # Instrument Flask app with OTEL Trace and Metrics
 FlaskInstrumentor().instrument_app(app)
 
 
-# Middleware
-@app.before_request
-def start_request():
-    g.transaction_id = str(uuid.uuid4())  # Store in Flask's context (thread-safe)
-    g.start_time = time.time()
-    g.method = request.method
-    g.path = request.path
-    g.endpoint = request.path.rsplit('/', 1)[-1] 
-
-    app_name = request.view_args.get('app_name') if request.view_args else None
-    if not app_name:
-        parts = request.path.strip('/').split('/')
-        app_name = parts[1] if len(parts) >= 4 and parts[0] == 'api' and parts[2] == 'v1' else None
-
-    logger.info({
-        "level": "INFO",
-        "event": "Request",
-        "method": request.method,
-        "path": request.path,
-        "endpoint": g.endpoint,
-        "remote_addr": request.remote_addr,
-        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "hostname": socket.gethostname(),
-        "transaction_id": g.transaction_id
-    })
-
-@app.after_request
-def finish_response(response):
-    duration = time.time() - getattr(g, 'start_time', time.time())
-    logger.info({
-        "level": "INFO",
-        "event": "Response",
-        "method": getattr(g, 'method', None),
-        "path": getattr(g, 'path', None),
-        "endpoint": getattr(g, 'endpoint', None),
-        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "duration_seconds": round(duration, 4),
-        "status": response.status_code,
-        "transaction_id": getattr(g, 'transaction_id', None)
-    })
-    return response
+# Middleware: one log record per request, timed until the response is fully sent
+app.wsgi_app = RequestLoggingMiddleware(
+    app.wsgi_app,
+    logger,
+    app_name='${{values.app_name}}',
+    env='${{values.app_env}}'
+)
 
 @app.errorhandler(Exception)
 def handle_exception(e):
     stack_trace = traceback.format_exc()
+    transaction_id = request.environ.get(TRANSACTION_ID_KEY)
     logger.error({
         "level": "ERROR",
         "event": "Unhandled Exception",
-        "method": getattr(g, 'method', None),
-        "path": getattr(g, 'path', None),
-        "endpoint": getattr(g, 'endpoint', None),
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.path.rsplit('/', 1)[-1],
         "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         'exception': str(e),
         "stack_trace": stack_trace,
-        "transaction_id": getattr(g, 'transaction_id', None)
+        "transaction_id": transaction_id
     })
 
     # Optional: Return JSON response to client
     return {
         "error": "Unhandled Exception",
-        "transaction_id": getattr(g, 'transaction_id', None)
+        "transaction_id": transaction_id
     }, 500
 
 
-# Define model used with sample()
+# Define model used with sample() and weather()
 class WeatherCurrent(db.Model):
     __tablename__ = 'weather_current'
 
+    # The primary key's B-tree also serves weather()'s range scans in collection_time order
     collection_time = db.Column(db.DateTime(timezone=True), primary_key=True)
     temperature = db.Column(db.Integer)
     temperature_min = db.Column(db.Integer)
@@ -117,38 +85,483 @@ class WeatherCurrent(db.Model):
     wind_direction = db.Column(db.Integer)
 
 
+WEATHER_FIELDS = [column.name for column in WeatherCurrent.__table__.columns]
+# Rows fetched from the server-side cursor per round trip
+WEATHER_STREAM_BATCH = int(os.environ.get("WEATHER_STREAM_BATCH", 1000))
 
-# Define endpoints
-@app.route('/api/${{values.app_name}}/v1/sample')
-def sample():
+
+def parse_time(value, name):
+    # ISO 8601; naive times are taken as UTC
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO 8601 timestamp, got {value!r}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def to_json_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+# Hourly and daily min/max/avg of weather_current, maintained incrementally by
+# run_rollup() so dashboards read O(buckets) rows instead of the raw series
+class WeatherRollup(db.Model):
+    __tablename__ = 'weather_rollup'
+
+    bucket = db.Column(db.String(8), primary_key=True)
+    bucket_start = db.Column(db.DateTime(timezone=True), primary_key=True)
+    samples = db.Column(db.Integer, nullable=False)
+    temperature_min = db.Column(db.Numeric)
+    temperature_max = db.Column(db.Numeric)
+    temperature_avg = db.Column(db.Numeric)
+    humidity_min = db.Column(db.Numeric)
+    humidity_max = db.Column(db.Numeric)
+    humidity_avg = db.Column(db.Numeric)
+    wind_speed_min = db.Column(db.Numeric)
+    wind_speed_max = db.Column(db.Numeric)
+    wind_speed_avg = db.Column(db.Numeric)
+
+
+class RollupWatermark(db.Model):
+    __tablename__ = 'weather_rollup_watermark'
+
+    name = db.Column(db.String(50), primary_key=True)
+    # Latest collection_time already aggregated
+    watermark = db.Column(db.DateTime(timezone=True), nullable=False)
+
+
+class RollupDirtyHour(db.Model):
+    __tablename__ = 'weather_rollup_dirty'
+
+    # Hour (date_trunc('hour', collection_time)) that received ingested rows since the
+    # last run; run_rollup() recomputes its hour and day buckets and deletes it
+    bucket_start = db.Column(db.DateTime(timezone=True), primary_key=True)
+
+
+# Bucket name -> date_trunc unit
+ROLLUP_BUCKETS = {"1h": "hour", "1d": "day"}
+ROLLUP_METRICS = ("temperature", "humidity", "wind_speed")
+ROLLUP_WATERMARK = "weather_rollup"
+ROLLUP_INTERVAL_SECONDS = float(os.environ.get("ROLLUP_INTERVAL_SECONDS", 60))
+ROLLUP_LOCK_KEY = int(os.environ.get("ROLLUP_ADVISORY_LOCK_KEY", 7340117))
+# Rows may commit up to this long after their collection_time (collectors also INSERT
+# directly); the watermark stays this far behind now, so each run re-aggregates them.
+# Readings ingested through the API mark their hours dirty instead, however late they are.
+ROLLUP_LAG_SECONDS = float(os.environ.get("ROLLUP_LAG_SECONDS", 300))
+rollup_stats = {
+    "runs": 0, "skipped_locked": 0, "buckets_written": 0, "dirty_hours": 0, "errors": 0, "watermark": None
+}
+rollup_stats_lock = threading.Lock()
+
+
+def rollup_upsert(bucket, unit, *conditions):
+    # Recompute the `unit` buckets of the raw rows matching `conditions`
+    raw = WeatherCurrent.__table__
+    rollup = WeatherRollup.__table__
+    # Inline the unit so the SELECT and GROUP BY expressions are identical
+    bucket_start = db.func.date_trunc(db.literal_column(f"'{unit}'"), raw.c.collection_time)
+    aggregates = []
+    for metric in ROLLUP_METRICS:
+        column = raw.c[metric]
+        aggregates += [db.func.min(column), db.func.max(column), db.func.avg(column)]
+    source = (
+        db.select(db.literal(bucket), bucket_start, db.func.count(), *aggregates)
+        .where(*conditions)
+        .group_by(bucket_start)
+    )
+    columns = [column.name for column in rollup.columns]
+    insert = pg_insert(rollup).from_select(columns, source)
+    return insert.on_conflict_do_update(
+        index_elements=[rollup.c.bucket, rollup.c.bucket_start],
+        set_={name: insert.excluded[name] for name in columns[2:]}
+    )
+
+
+def rollup_statement(bucket, unit, low, high):
+    # Recompute the buckets holding rows in [date_trunc(low), high] from the raw rows:
+    # the bucket the previous run ended in plus any new ones
+    collection_time = WeatherCurrent.__table__.c.collection_time
+    conditions = [collection_time <= high]
+    if low is not None:
+        conditions.append(collection_time >= db.func.date_trunc(unit, db.literal(low)))
+    return rollup_upsert(bucket, unit, *conditions)
+
+
+ROLLUP_STEPS = {"hour": datetime.timedelta(hours=1), "day": datetime.timedelta(days=1)}
+
+
+def truncate(value, unit):
+    # date_trunc() on a time as the database returned it (in the session's time zone)
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if unit == "day" else value
+
+
+def dirty_ranges(hours, unit, covered_from=None):
+    # [start, end) of the `unit` buckets holding the dirty hours, adjacent buckets
+    # merged; buckets from `covered_from` on are left to the watermark's statement
+    ranges = []
+    for start in sorted({truncate(hour, unit) for hour in hours}):
+        if covered_from is not None and start >= covered_from:
+            break
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = start + ROLLUP_STEPS[unit]
+        else:
+            ranges.append([start, start + ROLLUP_STEPS[unit]])
+    return ranges
+
+
+def dirty_rollup_statement(bucket, unit, ranges):
+    collection_time = WeatherCurrent.__table__.c.collection_time
+    return rollup_upsert(bucket, unit, db.or_(*(
+        db.and_(collection_time >= start, collection_time < end) for start, end in ranges
+    )))
+
+
+def as_utc(value):
+    # The database may return naive times (taken as UTC) or times in another zone
+    return value if value.tzinfo else value.replace(tzinfo=datetime.timezone.utc)
+
+
+def count_rollup(**counts):
+    with rollup_stats_lock:
+        for key, value in counts.items():
+            rollup_stats[key] += value
+
+
+def run_rollup(now=None):
+    # Re-aggregate the buckets from the watermark up to the newest row, then move the
+    # watermark to the newest row but no later than now - ROLLUP_LAG_SECONDS: rows that
+    # commit late are still inside the re-aggregated window on the next run. Then
+    # recompute the buckets of the dirty hours that insert_readings() marked, unless the
+    # first statement already covered them. Runs in one transaction under an advisory
+    # lock, so only one process aggregates at a time; returns None when another holds it.
+    raw = WeatherCurrent.__table__
+    watermarks = RollupWatermark.__table__
+    dirty = RollupDirtyHour.__table__
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    with connect(db.engine) as connection, connection.begin():
+        if not connection.execute(db.select(db.func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY))).scalar():
+            count_rollup(skipped_locked=1)
+            return None
+        # Claim the dirty hours first: an ingest that marks one of them again waits for
+        # this transaction, so its rows are recomputed by the next run
+        dirty_hours = connection.execute(dirty.delete().returning(dirty.c.bucket_start)).scalars().all()
+        low = connection.execute(
+            db.select(watermarks.c.watermark).where(watermarks.c.name == ROLLUP_WATERMARK)
+        ).scalar()
+        newest = db.select(db.func.max(raw.c.collection_time))
+        if low is not None:
+            newest = newest.where(raw.c.collection_time > low)
+        high = connection.execute(newest).scalar()
+        written = 0
+        watermark = low
+        if high is not None:
+            for bucket, unit in ROLLUP_BUCKETS.items():
+                written += connection.execute(rollup_statement(bucket, unit, low, high)).rowcount
+            watermark = min(as_utc(high), now - datetime.timedelta(seconds=ROLLUP_LAG_SECONDS))
+            if low is None or watermark > as_utc(low):
+                upsert = pg_insert(watermarks).values(name=ROLLUP_WATERMARK, watermark=watermark)
+                connection.execute(upsert.on_conflict_do_update(
+                    index_elements=[watermarks.c.name],
+                    set_={"watermark": upsert.excluded.watermark}
+                ))
+            else:
+                watermark = low
+        # Without a watermark, the first statement recomputed every bucket
+        if dirty_hours and low is not None:
+            for bucket, unit in ROLLUP_BUCKETS.items():
+                covered_from = truncate(low, unit) if high is not None else None
+                ranges = dirty_ranges(dirty_hours, unit, covered_from)
+                if ranges:
+                    written += connection.execute(dirty_rollup_statement(bucket, unit, ranges)).rowcount
+    with rollup_stats_lock:
+        rollup_stats["runs"] += 1
+        rollup_stats["buckets_written"] += written
+        rollup_stats["dirty_hours"] += len(dirty_hours)
+        if watermark is not None:
+            rollup_stats["watermark"] = as_utc(watermark).isoformat()
+    return written
+
+
+def rollup_snapshot():
+    with rollup_stats_lock:
+        return dict(rollup_stats)
+
+
+def rollup_loop():
+    while True:
+        time.sleep(ROLLUP_INTERVAL_SECONDS)
+        try:
+            with app.app_context():
+                run_rollup()
+        except Exception as e:
+            count_rollup(errors=1)
+            logger.warning({"event": "Rollup Failed", "exception": str(e)})
+
+
+INGEST_MAX_BATCH = int(os.environ.get("INGEST_MAX_BATCH", 10000))
+# Rows per INSERT statement (PostgreSQL allows 65535 parameters; 9 columns per row)
+INGEST_CHUNK = 1000
+INTEGER_FIELDS = ("temperature", "temperature_min", "temperature_max", "humidity", "feels_like", "wind_direction")
+
+
+def parse_reading(item):
+    # Validate one reading into a weather_current row; raises ValueError
+    if not isinstance(item, dict):
+        raise ValueError("must be an object")
+    unknown = set(item) - set(WEATHER_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    if not isinstance(item.get('collection_time'), str):
+        raise ValueError("'collection_time' is required as an ISO 8601 timestamp")
+    row = {field: None for field in WEATHER_FIELDS}
+    row['collection_time'] = parse_time(item['collection_time'], 'collection_time')
+    for field in INTEGER_FIELDS:
+        value = item.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"'{field}' must be an integer")
+        row[field] = value
+    wind_speed = item.get('wind_speed')
+    if wind_speed is not None and (not isinstance(wind_speed, (int, float)) or isinstance(wind_speed, bool)):
+        raise ValueError("'wind_speed' must be a number")
+    row['wind_speed'] = wind_speed
+    description = item.get('description')
+    if description is not None and (not isinstance(description, str) or len(description) > 200):
+        raise ValueError("'description' must be a string of at most 200 characters")
+    row['description'] = description
+    return row
+
+
+def insert_readings(connection, rows):
+    # Multi-row INSERT ... ON CONFLICT (collection_time) DO NOTHING in chunks; returns
+    # the collection_times actually inserted. The hours of the new rows are marked dirty,
+    # so run_rollup() recomputes their buckets however far behind the watermark they
+    # are; concurrent batches only wait on each other when they mark the same hour.
+    table = WeatherCurrent.__table__
+    dirty = RollupDirtyHour.__table__
+    hour = db.func.date_trunc(db.literal_column("'hour'"), table.c.collection_time)
+    inserted = []
+    for i in range(0, len(rows), INGEST_CHUNK):
+        statement = (
+            pg_insert(table)
+            .values(rows[i:i + INGEST_CHUNK])
+            .on_conflict_do_nothing(index_elements=[table.c.collection_time])
+            .returning(table.c.collection_time)
+        )
+        chunk = connection.execute(statement).scalars().all()
+        if chunk:
+            hours = db.select(hour).where(table.c.collection_time.in_(chunk)).distinct()
+            connection.execute(pg_insert(dirty).from_select(['bucket_start'], hours).on_conflict_do_nothing())
+        inserted += chunk
+    return inserted
+
+
+def start_background_tasks():
+    # Called once per serving process (gunicorn post_fork, or the dev server below);
+    # every worker runs the loop and the advisory lock keeps runs from overlapping
+    if ROLLUP_INTERVAL_SECONDS > 0:
+        threading.Thread(target=rollup_loop, name="weather-rollup", daemon=True).start()
+
+
+# Concurrent sample() calls share one upstream request and one latest-weather query
+upstream_flight = SingleFlight()
+db_flight = SingleFlight()
+
+JOKE_API_URL = os.environ.get("JOKE_API_URL", "https://api.chucknorris.io/jokes/random")
+JOKE_API_TIMEOUT = (
+    float(os.environ.get("HTTP_CONNECT_TIMEOUT", 2)),
+    float(os.environ.get("HTTP_READ_TIMEOUT", 5))
+)
+
+# Circuit breaker (and optional hedging) for the joke API; the last joke served is the
+# fallback while it is failing or the circuit is open
+joke_policy = OutboundPolicy("joke_api")
+last_joke = None
+
+
+def request_joke():
     # External API call (instrumented by opentelemetry-instrumentation-requests)
-    response = requests.get('https://api.chucknorris.io/jokes/random')
+    response = requests.get(JOKE_API_URL, timeout=JOKE_API_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
 
+def fetch_joke():
+    # Returns (joke, is_fallback); raises CircuitOpenError while the circuit is open
+    # and there is no joke to fall back to
+    fallback = (lambda: (last_joke, True)) if last_joke is not None else None
+    return joke_policy.call_sync(lambda: (request_joke(), False), fallback)
+
+
+def latest_weather():
     # Database query (instrumented by opentelemetry-instrumentation-sqlalchemy)
     # Query: Get last 10 entries ordered by collection_time desc
-    latest_weather = (
+    checkout_connection(db.session)
+    rows = (
         WeatherCurrent.query
         .with_entities(WeatherCurrent.collection_time, WeatherCurrent.temperature)
         .order_by(WeatherCurrent.collection_time.desc())
         .limit(10)
         .all()
     )
-    
+    # Plain dicts, since the result is shared with other requests' threads
+    return [
+        {
+            "collection_time": weather.collection_time.isoformat(),
+            "temperature": weather.temperature
+        }
+        for weather in rows
+    ]
+
+
+# Define endpoints
+@app.route('/api/${{values.app_name}}/v1/sample')
+def sample():
+    global last_joke
+    try:
+        joke, is_fallback = upstream_flight.do("joke", fetch_joke)
+    except CircuitOpenError as e:
+        return (
+            {"error": f"External API unavailable: {str(e)}"},
+            503,
+            {"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    except requests.RequestException as e:
+        # The upstream failed and there is no earlier joke to fall back to
+        return {"error": f"External API request failed: {str(e)}"}, 502
+    headers = {"X-Upstream-Fallback": joke_policy.name} if is_fallback else {}
+    if not is_fallback:
+        last_joke = joke
     return {
-        "api_data": response.text,
-        "weather": [
+        "api_data": joke,
+        "weather": db_flight.do("latest_weather", latest_weather)
+    }, 200, headers
+
+@app.route('/api/${{values.app_name}}/v1/weather')
+def weather():
+    # Rows with from <= collection_time < to, oldest first, as newline-delimited JSON.
+    # The rows are read through a server-side cursor and written as they arrive, so
+    # memory stays flat however large the range is.
+    try:
+        start = parse_time(request.args['from'], 'from') if 'from' in request.args else None
+        end = parse_time(request.args['to'], 'to') if 'to' in request.args else None
+        fields = request.args.get('fields', ','.join(WEATHER_FIELDS)).split(',')
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    unknown = [field for field in fields if field not in WEATHER_FIELDS]
+    if unknown:
+        return {"error": f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(WEATHER_FIELDS)}"}, 400
+    if start is not None and end is not None and start >= end:
+        return {"error": "'from' must be earlier than 'to'"}, 400
+
+    table = WeatherCurrent.__table__
+    query = db.select(*(table.c[field] for field in fields)).order_by(table.c.collection_time)
+    if start is not None:
+        query = query.where(table.c.collection_time >= start)
+    if end is not None:
+        query = query.where(table.c.collection_time < end)
+
+    def generate():
+        with connect(db.engine) as connection:
+            result = connection.execution_options(
+                stream_results=True,
+                yield_per=WEATHER_STREAM_BATCH
+            ).execute(query)
+            for row in result:
+                yield json.dumps({field: to_json_value(value) for field, value in zip(fields, row)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/${{values.app_name}}/v1/weather/rollup')
+def weather_rollup():
+    # Pre-aggregated buckets, oldest first, optionally limited to from <= bucket_start < to
+    bucket = request.args.get('bucket', '1h')
+    if bucket not in ROLLUP_BUCKETS:
+        return {"error": f"Unknown bucket {bucket!r}. Available: {', '.join(ROLLUP_BUCKETS)}"}, 400
+    try:
+        start = parse_time(request.args['from'], 'from') if 'from' in request.args else None
+        end = parse_time(request.args['to'], 'to') if 'to' in request.args else None
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    checkout_connection(db.session)
+    query = WeatherRollup.query.filter_by(bucket=bucket).order_by(WeatherRollup.bucket_start)
+    if start is not None:
+        query = query.filter(WeatherRollup.bucket_start >= start)
+    if end is not None:
+        query = query.filter(WeatherRollup.bucket_start < end)
+    watermark = db.session.get(RollupWatermark, ROLLUP_WATERMARK)
+    return jsonify({
+        "bucket": bucket,
+        # Buckets after this collection_time are recomputed by the next runs
+        "watermark": watermark.watermark.isoformat() if watermark is not None else None,
+        "rollups": [
             {
-                "collection_time": weather.collection_time.isoformat(),
-                "temperature": weather.temperature
+                "bucket_start": row.bucket_start.isoformat(),
+                "samples": row.samples,
+                **{
+                    metric: {
+                        stat: to_json_value(getattr(row, f"{metric}_{stat}"))
+                        for stat in ("min", "max", "avg")
+                    }
+                    for metric in ROLLUP_METRICS
+                }
             }
-            for weather in latest_weather
+            for row in query
         ]
-    }
+    })
+
+
+@app.route('/api/${{values.app_name}}/v1/weather/ingest', methods=['POST'])
+def weather_ingest():
+    # Body: a JSON array of readings. Invalid batches are rejected whole; readings whose
+    # collection_time already exists (or repeats within the batch) are reported as duplicates.
+    readings = request.get_json(silent=True)
+    if not isinstance(readings, list) or not readings:
+        return {"error": "Body must be a non-empty JSON array of readings"}, 400
+    if len(readings) > INGEST_MAX_BATCH:
+        return {"error": f"At most {INGEST_MAX_BATCH} readings per batch, got {len(readings)}"}, 413
+
+    rows, errors = [], []
+    for index, item in enumerate(readings):
+        try:
+            rows.append(parse_reading(item))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+    if errors:
+        return {"error": "Invalid readings", "details": errors[:100]}, 400
+
+    with connect(db.engine) as connection, connection.begin():
+        inserted = insert_readings(connection, rows)
+
+    # Match on the instant: the database may hand times back in another time zone
+    remaining = {}
+    for time_inserted in inserted:
+        key = parse_time(time_inserted.isoformat(), 'collection_time').timestamp()
+        remaining[key] = remaining.get(key, 0) + 1
+    duplicates = []
+    for row in rows:
+        key = row['collection_time'].timestamp()
+        if remaining.get(key, 0) > 0:
+            remaining[key] -= 1
+        else:
+            duplicates.append(row['collection_time'].isoformat())
+    return {
+        "received": len(rows),
+        "inserted": len(inserted),
+        "duplicates": duplicates
+    }, 200
+
 
 @app.route('/api/${{values.app_name}}/v1/info')
 def info():
     return jsonify({
-        'hostname': socket.gethostname(),
+        'hostname': HOSTNAME,
         'env': '${{values.app_env}}',
         'app_name': '${{values.app_name}}',
         'time': datetime.datetime.now().strftime("%I:%M:%S %p on %Y-%m-%d")
@@ -160,7 +573,22 @@ def health():
     return jsonify({'status': 'UP'}), 200
 
 
+@app.route('/api/${{values.app_name}}/v1/metrics')
+def metrics():
+    return jsonify({
+        'singleflight': {
+            'upstream': dict(upstream_flight.stats),
+            'db': dict(db_flight.stats)
+        },
+        'outbound': snapshot_all(),
+        'db_pool': snapshot_pools(),
+        'logging': logging_stats(),
+        'rollup': rollup_snapshot()
+    })
+
+
 # Main app entry point
 if __name__ == '__main__':
+    start_background_tasks()
     app.run(host='0.0.0.0', port=5001)
 
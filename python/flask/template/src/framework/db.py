@@ -0,0 +1,182 @@
+"""
+Database configuration for Flask-SQLAlchemy, with the same environment contract as the
+FastAPI templates' framework/db.py, and connection pool checkout metrics.
+
+`database_uri()` validates the connection variables; `engine_options()` builds
+SQLALCHEMY_ENGINE_OPTIONS. `instrument_engine()` attaches pool event listeners to an
+engine and registers its `PoolMetrics` (in-use gauge, wait histogram and moving average,
+timeouts) for the metrics endpoint; `connect()` and `checkout_connection()` acquire a
+connection while timing the wait.
+
+Environment variables:
+    DATABASE_URL     - Full SQLAlchemy URL; overrides the POSTGRES_* variables
+    POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB - Required
+                       unless DATABASE_URL is set
+    DB_POOL_SIZE     - Connections kept open per process (default: 10)
+    DB_MAX_OVERFLOW  - Extra connections opened under load (default: 20)
+    DB_POOL_RECYCLE  - Seconds before a connection is replaced (default: 3600)
+    DB_POOL_TIMEOUT  - Seconds a checkout waits for a free connection (default: 30)
+    DB_POOL_PRE_PING - Test connections on checkout, "true" or "false" (default: true)
+"""
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+REQUIRED_VARS = ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_HOST", "POSTGRES_PORT", "POSTGRES_DB")
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Weight of the newest sample in the moving average of checkout waits
+EWMA_ALPHA = 0.2
+
+# engine -> metrics, for every instrumented engine
+registry: Dict[object, "PoolMetrics"] = {}
+
+
+def database_uri() -> str:
+    database_url = os.environ.get("DATABASE_URL")
+    if database_url:
+        return database_url
+
+    missing_vars = [key for key in REQUIRED_VARS if not os.environ.get(key)]
+    if missing_vars:
+        raise EnvironmentError(f"Missing required environment variables: {', '.join(missing_vars)}")
+    return (
+        f"postgresql+psycopg2://{os.environ['POSTGRES_USER']}:{os.environ['POSTGRES_PASSWORD']}"
+        f"@{os.environ['POSTGRES_HOST']}:{os.environ['POSTGRES_PORT']}/{os.environ['POSTGRES_DB']}"
+    )
+
+
+def _int_env(key: str, default: int, minimum: int = 0) -> int:
+    value = os.environ.get(key, str(default))
+    try:
+        number = int(value)
+    except ValueError:
+        raise EnvironmentError(f"{key} must be an integer, got {value!r}")
+    if number < minimum:
+        raise EnvironmentError(f"{key} must be at least {minimum}, got {number}")
+    return number
+
+
+def engine_options() -> dict:
+    pre_ping = os.environ.get("DB_POOL_PRE_PING", "true").lower()
+    if pre_ping not in ("true", "false"):
+        raise EnvironmentError(f"DB_POOL_PRE_PING must be true or false, got {pre_ping!r}")
+    return {
+        "pool_pre_ping": pre_ping == "true",
+        "pool_size": _int_env("DB_POOL_SIZE", 10, minimum=1),
+        "max_overflow": _int_env("DB_MAX_OVERFLOW", 20),
+        # -1 disables recycling, as in SQLAlchemy
+        "pool_recycle": _int_env("DB_POOL_RECYCLE", 3600, minimum=-1),
+        "pool_timeout": _int_env("DB_POOL_TIMEOUT", 30, minimum=1),
+    }
+
+
+class PoolMetrics:
+    """Checkout telemetry for the pool of one engine, labelled `name` on the metrics endpoint."""
+
+    def __init__(self, name, engine):
+        self.name = name
+        # Read the pool on every snapshot: engine.dispose() replaces it
+        self.engine = engine
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_ewma_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        wait_ms = seconds * 1000
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.timeouts += timed_out
+            self.wait_count += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_buckets[index] += 1
+            self.wait_ewma_ms += EWMA_ALPHA * (wait_ms - self.wait_ewma_ms)
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        # Pools without a fixed size (e.g. StaticPool, NullPool) have no capacity
+        sized = hasattr(pool, "size") and hasattr(pool, "overflow")
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(list(WAIT_BUCKETS_MS) + ["+Inf"], self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "capacity": pool.size() + max(getattr(pool, "_max_overflow", 0), 0) if sized else None,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "overflow": max(pool.overflow(), 0) if sized else 0,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                    "ewma": round(self.wait_ewma_ms, 3),
+                    "buckets": buckets,
+                },
+            }
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """Attach pool event listeners to `engine` and register its metrics under `name`."""
+    for instrumented, existing in list(registry.items()):
+        if existing.name == name:
+            del registry[instrumented]
+
+    metrics = PoolMetrics(name, engine)
+    # Engine-level pool listeners carry over to the pool engine.dispose() creates
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    registry[engine] = metrics
+    return metrics
+
+
+def _timed(engine, acquire):
+    metrics = registry.get(engine)
+    start = time.perf_counter()
+    try:
+        result = acquire()
+    except PoolTimeoutError:
+        if metrics is not None:
+            metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+        raise
+    if metrics is not None:
+        metrics.observe_wait(time.perf_counter() - start)
+    return result
+
+
+def connect(engine):
+    """`engine.connect()`, recording the checkout wait if the engine is instrumented."""
+    return _timed(engine, engine.connect)
+
+
+def checkout_connection(session) -> None:
+    """Check out the session's connection now, recording the wait if its engine is instrumented."""
+    _timed(session.get_bind(), session.connection)
+
+
+def snapshot_pools() -> dict:
+    """Return metrics for every instrumented engine, keyed by name."""
+    return {metrics.name: metrics.snapshot() for metrics in list(registry.values())}
@@ -0,0 +1,220 @@
+"""
+Outbound-call policy: circuit breaker, hedged requests and fallbacks per upstream dependency.
+
+`CircuitBreaker` watches the last `window` calls. Once at least `min_calls` are recorded
+and the error rate or the slow-call rate (calls slower than `slow_call_seconds`) reaches
+its threshold, it opens: calls fail immediately with `CircuitOpenError` for `open_seconds`.
+Then it is half-open: one trial call is let through, closing the breaker on success and
+re-opening it on failure.
+
+`OutboundPolicy` wraps calls to one dependency with a breaker and, optionally, hedging:
+if the first attempt has not finished after the dependency's recent p95 latency, a second
+identical attempt is started and whichever succeeds first wins. When a call is rejected or
+fails, a `fallback` is returned instead if one is given. `call_sync()` runs blocking
+functions (hedged attempts run on a small per-policy thread pool). Policies register
+themselves by name; `snapshot_all()` reports their state for the metrics endpoint.
+
+Environment variables (defaults for every policy):
+    CB_WINDOW             - Calls considered for the error and slow-call rates (default: 20)
+    CB_MIN_CALLS          - Calls required before the breaker can open (default: 10)
+    CB_ERROR_THRESHOLD    - Error rate that opens the breaker (default: 0.5)
+    CB_SLOW_THRESHOLD     - Slow-call rate that opens the breaker (default: 0.5)
+    CB_SLOW_CALL_SECONDS  - Duration above which a call counts as slow (default: 2)
+    CB_OPEN_SECONDS       - How long the breaker stays open before a trial call (default: 30)
+    OUTBOUND_HEDGING      - Set to "true" to hedge calls after the p95 latency (default: false)
+"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Hedge only once this many latencies are known, and never sooner than HEDGE_MIN_DELAY seconds
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.01
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, window: int = None, min_calls: int = None, error_threshold: float = None,
+                 slow_threshold: float = None, slow_call_seconds: float = None, open_seconds: float = None):
+        self.min_calls = min_calls if min_calls is not None else int(os.getenv("CB_MIN_CALLS", 10))
+        self.error_threshold = error_threshold if error_threshold is not None else float(os.getenv("CB_ERROR_THRESHOLD", 0.5))
+        self.slow_threshold = slow_threshold if slow_threshold is not None else float(os.getenv("CB_SLOW_THRESHOLD", 0.5))
+        self.slow_call_seconds = slow_call_seconds if slow_call_seconds is not None else float(os.getenv("CB_SLOW_CALL_SECONDS", 2))
+        self.open_seconds = open_seconds if open_seconds is not None else float(os.getenv("CB_OPEN_SECONDS", 30))
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window if window is not None else int(os.getenv("CB_WINDOW", 20)))
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed now."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(self.open_seconds - (time.monotonic() - self._opened_at), 0)
+
+    def record(self, success: bool, duration: float) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success and duration < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append((success, duration >= self.slow_call_seconds))
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                error_rate, slow_rate = self._rates()
+                if error_rate >= self.error_threshold or slow_rate >= self.slow_threshold:
+                    self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def _rates(self):
+        calls = len(self._outcomes) or 1
+        errors = sum(1 for success, _ in self._outcomes if not success)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        return errors / calls, slow / calls
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            error_rate, slow_rate = self._rates()
+            return {
+                "state": self.state,
+                "window_calls": len(self._outcomes),
+                "error_rate": round(error_rate, 3),
+                "slow_rate": round(slow_rate, 3),
+            }
+
+
+class OutboundPolicy:
+    def __init__(self, name: str, breaker: CircuitBreaker = None, hedge: bool = None, max_hedge_threads: int = 8):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge if hedge is not None else os.getenv("OUTBOUND_HEDGING", "false").lower() == "true"
+        self._latencies = deque(maxlen=200)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_hedge_threads = max_hedge_threads
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "short_circuited": 0,
+                      "fallbacks": 0, "hedged": 0, "hedge_wins": 0}
+        policies[name] = self
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging: the p95 of recent successful calls, or None to not hedge."""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return max(ordered[int(len(ordered) * 0.95) - 1], HEDGE_MIN_DELAY)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _before_call(self, fallback):
+        self._count("calls")
+        if self.breaker.allow():
+            return True
+        self._count("short_circuited")
+        if fallback is None:
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+        return False
+
+    def _after_call(self, success: bool, start: float) -> None:
+        duration = time.monotonic() - start
+        self.breaker.record(success, duration)
+        with self._lock:
+            self.stats["successes" if success else "failures"] += 1
+            if success:
+                self._latencies.append(duration)
+
+    def _use_fallback(self, fallback: Callable[[], Any]) -> Any:
+        self._count("fallbacks")
+        return fallback()
+
+    def call_sync(self, fn: Callable[[], Any], fallback: Callable[[], Any] = None) -> Any:
+        """Call blocking `fn()` under the policy; on rejection or failure return `fallback()` if given."""
+        if not self._before_call(fallback):
+            return self._use_fallback(fallback)
+        start = time.monotonic()
+        try:
+            result = self._hedged_sync(fn)
+        except Exception:
+            self._after_call(False, start)
+            if fallback is None:
+                raise
+            return self._use_fallback(fallback)
+        self._after_call(True, start)
+        return result
+
+    def _hedged_sync(self, fn):
+        delay = self.hedge_delay()
+        if delay is None:
+            return fn()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self._max_hedge_threads, thread_name_prefix=f"hedge-{self.name}")
+        first = self._executor.submit(fn)
+        pending = {first}
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            self._count("hedged")
+            pending.add(self._executor.submit(fn))
+        error = None
+        while pending:
+            # A losing attempt cannot be interrupted; it finishes in the background
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def snapshot(self) -> dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            ordered = sorted(self._latencies)
+            stats = dict(self.stats)
+        return {
+            **self.breaker.snapshot(),
+            "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3) if ordered else None,
+            "hedging": self.hedge,
+            "hedge_delay_ms": round(delay * 1000, 3) if delay is not None else None,
+            **stats,
+        }
+
+
+policies: Dict[str, OutboundPolicy] = {}
+
+
+def snapshot_all() -> dict:
+    return {name: policy.snapshot() for name, policy in list(policies.items())}
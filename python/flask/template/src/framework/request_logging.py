@@ -0,0 +1,127 @@
+"""
+Request logging off the request thread.
+
+`RequestLoggingMiddleware` wraps the WSGI app and emits one compact record per request
+once the response body has been fully sent, so the duration includes streaming. Fields
+that never change (hostname, app name, environment) are computed once at startup.
+
+`setup_logging()` puts a `QueueHandler` on the root logger: request threads only append
+records to an in-memory queue, and a `QueueListener` thread hands them to the exporter
+handler (the OTLP `LoggingHandler`, whose batch processor ships them in batches). When
+the queue is full, records are dropped and counted instead of blocking requests. The
+listener is restarted in forked children (gunicorn workers).
+
+Environment variables:
+    LOG_QUEUE_SIZE - Records buffered for the listener before dropping (default: 10000)
+"""
+import logging
+import os
+import queue
+import socket
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+TRANSACTION_ID_KEY = "app.transaction_id"
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that keeps records as-is (dict messages intact) and never blocks."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so there is no need to flatten the record
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+queue_handler: Optional[DroppingQueueHandler] = None
+listener: Optional[QueueListener] = None
+_target: Optional[logging.Handler] = None
+_fork_hook_registered = False
+
+
+def _start_listener() -> None:
+    global listener
+    listener = QueueListener(queue_handler.queue, _target, respect_handler_level=True)
+    listener.start()
+
+
+def setup_logging(target: logging.Handler, level: int = logging.INFO) -> logging.Logger:
+    """Route the root logger through a queue to `target`, handled on a listener thread."""
+    global queue_handler, _target, _fork_hook_registered
+    stop_logging()
+    queue_handler = DroppingQueueHandler(queue.Queue(int(os.environ.get("LOG_QUEUE_SIZE", 10000))))
+    _target = target
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.propagate = False
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+    _start_listener()
+    # The listener thread does not survive fork; give every child its own. Fork hooks
+    # cannot be removed, so register it once and let it start the current setup's listener.
+    if not _fork_hook_registered:
+        os.register_at_fork(after_in_child=_start_listener)
+        _fork_hook_registered = True
+    return root
+
+
+def stop_logging() -> None:
+    """Flush queued records to the target handler."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def logging_stats() -> dict:
+    return {
+        "queued": queue_handler.queue.qsize() if queue_handler is not None else 0,
+        "dropped": queue_handler.dropped if queue_handler is not None else 0,
+    }
+
+
+class RequestLoggingMiddleware:
+    def __init__(self, app, logger: logging.Logger, **static_fields):
+        self.app = app
+        self.logger = logger
+        self.static = {"hostname": socket.gethostname(), **static_fields}
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        transaction_id = environ[TRANSACTION_ID_KEY] = uuid.uuid4().hex
+        status = []
+
+        def capture_status(status_line, headers, exc_info=None):
+            status[:] = [status_line]
+            return start_response(status_line, headers, exc_info)
+
+        body = self.app(environ, capture_status)
+        try:
+            yield from body
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+            path = environ.get("PATH_INFO", "")
+            self.logger.info({
+                **self.static,
+                "event": "Request",
+                "method": environ.get("REQUEST_METHOD"),
+                "path": path,
+                "endpoint": path.rsplit("/", 1)[-1],
+                "status": int(status[0].split(" ", 1)[0]) if status else None,
+                "duration_seconds": round(time.perf_counter() - start, 4),
+                "remote_addr": environ.get("REMOTE_ADDR"),
+                "transaction_id": transaction_id
+            })
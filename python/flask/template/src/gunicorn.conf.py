@@ -0,0 +1,99 @@
+# Gunicorn settings, read from the working directory (/src in the image).
+#
+# Workers and threads are sized from the container's CPU quota rather than the host's
+# core count, and the SQLAlchemy pool of each worker is sized to its threads.
+#
+# Environment variables:
+#   GUNICORN_WORKER_CLASS  - sync, gthread or gevent (default: gthread)
+#   GUNICORN_WORKERS       - Worker processes (default: sync 2 x CPUs + 1, otherwise CPUs)
+#   GUNICORN_THREADS       - Threads per gthread worker (default: 4)
+#   GUNICORN_WORKER_CONNECTIONS - Concurrent requests per gevent worker (default: 100)
+#   GUNICORN_TIMEOUT       - Seconds before a silent worker is restarted (default: 30)
+#   PORT                   - Listen port (default: 5001)
+#   DB_POOL_SIZE           - Defaults to the concurrent requests one worker can serve
+#                            (capped at 20 for gevent); other pool settings: framework/db.py
+#
+# For gevent, psycopg2 is made cooperative in post_fork (gevent and psycogreen are in
+# requirements.txt).
+import math
+import os
+
+
+def cpu_quota() -> int:
+    """CPUs available to this container: the cgroup CPU quota if set, else the usable cores."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        try:
+            # cgroup v1
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if quota > 0:
+                return max(1, math.ceil(quota / period))
+        except (OSError, ValueError):
+            pass
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+cpus = cpu_quota()
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class not in ("sync", "gthread", "gevent"):
+    raise ValueError(f"Unsupported GUNICORN_WORKER_CLASS: {worker_class}")
+
+if worker_class == "sync":
+    # One request per process: extra processes cover time spent waiting on I/O
+    workers = int(os.environ.get("GUNICORN_WORKERS", 2 * cpus + 1))
+    threads = 1
+    concurrency = 1
+elif worker_class == "gthread":
+    workers = int(os.environ.get("GUNICORN_WORKERS", cpus))
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+    concurrency = threads
+else:
+    workers = int(os.environ.get("GUNICORN_WORKERS", cpus))
+    worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+    concurrency = min(worker_connections, 20)
+
+# Every concurrent request in a worker can hold a connection without waiting on the pool
+os.environ.setdefault("DB_POOL_SIZE", str(concurrency))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+keepalive = 5
+
+# Import the app once in the master so workers fork with it loaded (faster, shared memory).
+# Not with gevent: the app would import socket, ssl and threading in the master before the
+# worker monkey-patches them.
+preload_app = worker_class != "gevent"
+
+
+def start_worker():
+    # Connections opened in the master must not be shared with the children: drop the
+    # inherited pool without closing its sockets, which the master still owns
+    from app import app, db, start_background_tasks
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Threads do not survive fork, so background work starts in each worker
+    start_background_tasks()
+
+
+def post_fork(server, worker):
+    if worker_class != "gevent":
+        start_worker()
+
+
+def post_worker_init(worker):
+    # gevent workers monkey-patch after post_fork, so nothing may import the app before
+    # this hook, which runs once the patched worker has loaded it
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+        start_worker()
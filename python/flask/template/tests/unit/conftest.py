@@ -0,0 +1,60 @@
+import datetime
+import os
+import tempfile
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import sqlite
+
+
+# Point the app at a throwaway SQLite file: Need to set before we import the app
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_FILE}"
+os.environ["ROLLUP_INTERVAL_SECONDS"] = "0"
+
+import app as app_module
+from app import app, db
+
+
+# SQLite stand-ins for the PostgreSQL functions used by the rollup and ingest queries
+TRUNCATE = {
+    "hour": lambda t: t.replace(minute=0, second=0, microsecond=0),
+    "day": lambda t: t.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+
+def date_trunc(unit, value):
+    # Stored the way SQLAlchemy stores DateTime in SQLite, so bucket keys compare equal
+    truncated = TRUNCATE[unit](datetime.datetime.fromisoformat(value).replace(tzinfo=None))
+    return truncated.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def register_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("date_trunc", 2, date_trunc)
+    dbapi_connection.create_function("pg_try_advisory_xact_lock", 1, lambda key: 1)
+
+
+@pytest.fixture(scope="session")
+def test_engine():
+    with app.app_context():
+        event.listen(db.engine, "connect", register_functions)
+        db.engine.dispose()
+        db.create_all()
+        yield db.engine
+        db.drop_all()
+
+
+@pytest.fixture
+def database(test_engine, monkeypatch):
+    """Empty tables, with the PostgreSQL INSERT constructs compiled for SQLite"""
+    monkeypatch.setattr(app_module, "pg_insert", sqlite.insert)
+    with app.app_context():
+        yield test_engine
+        with test_engine.begin() as connection:
+            for table in reversed(db.metadata.sorted_tables):
+                connection.execute(table.delete())
+
+
+@pytest.fixture
+def client(database):
+    with app.test_client() as test_client:
+        yield test_client
@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from framework import db as db_module
+from framework.db import checkout_connection, connect, database_uri, engine_options, instrument_engine
+
+POSTGRES_ENV = {
+    "POSTGRES_USER": "user",
+    "POSTGRES_PASSWORD": "secret",
+    "POSTGRES_HOST": "db",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "weather",
+}
+
+
+@pytest.fixture
+def env(monkeypatch):
+    for key in ("DATABASE_URL", *POSTGRES_ENV, "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_RECYCLE",
+                "DB_POOL_TIMEOUT", "DB_POOL_PRE_PING"):
+        monkeypatch.delenv(key, raising=False)
+    return monkeypatch
+
+
+def test_database_uri_from_postgres_variables(env):
+    for key, value in POSTGRES_ENV.items():
+        env.setenv(key, value)
+    assert database_uri() == "postgresql+psycopg2://user:secret@db:5432/weather"
+
+
+def test_database_url_overrides_postgres_variables(env):
+    env.setenv("DATABASE_URL", "sqlite:///weather.db")
+    assert database_uri() == "sqlite:///weather.db"
+
+
+def test_database_uri_lists_missing_variables(env):
+    env.setenv("POSTGRES_USER", "user")
+    with pytest.raises(EnvironmentError, match="POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB"):
+        database_uri()
+
+
+def test_engine_options_defaults(env):
+    assert engine_options() == {
+        "pool_pre_ping": True,
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_recycle": 3600,
+        "pool_timeout": 30,
+    }
+
+
+@pytest.mark.parametrize("key, value, message", [
+    ("DB_POOL_SIZE", "ten", "DB_POOL_SIZE must be an integer"),
+    ("DB_POOL_SIZE", "0", "DB_POOL_SIZE must be at least 1"),
+    ("DB_MAX_OVERFLOW", "-1", "DB_MAX_OVERFLOW must be at least 0"),
+    ("DB_POOL_RECYCLE", "-2", "DB_POOL_RECYCLE must be at least -1"),
+    ("DB_POOL_PRE_PING", "yes", "DB_POOL_PRE_PING must be true or false"),
+])
+def test_engine_options_rejects_invalid_values(env, key, value, message):
+    env.setenv(key, value)
+    with pytest.raises(EnvironmentError, match=message):
+        engine_options()
+
+
+def test_engine_options_accepts_disabled_recycling(env):
+    env.setenv("DB_POOL_RECYCLE", "-1")
+    env.setenv("DB_POOL_PRE_PING", "FALSE")
+    options = engine_options()
+    assert options["pool_recycle"] == -1
+    assert options["pool_pre_ping"] is False
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_module, "registry", {})
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0, pool_timeout=0.05)
+    yield engine
+    engine.dispose()
+
+
+def test_metrics_are_kept_per_engine(engine, tmp_path):
+    metrics = instrument_engine(engine, "primary")
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    instrument_engine(other, "replica")
+
+    with connect(engine):
+        snapshot = metrics.snapshot()
+        assert snapshot["in_use"] == 1 and snapshot["capacity"] == 1
+    with Session(engine) as session:
+        checkout_connection(session)
+
+    pools = db_module.snapshot_pools()
+    other.dispose()
+    assert pools["primary"]["checkouts"] == 2
+    assert pools["primary"]["in_use"] == 0
+    assert pools["primary"]["checkout_wait_ms"]["count"] == 2
+    assert pools["replica"]["checkouts"] == 0
+
+
+def test_checkout_timeouts_are_counted(engine):
+    metrics = instrument_engine(engine, "primary")
+    with connect(engine):
+        with pytest.raises(PoolTimeoutError):
+            connect(engine)
+    snapshot = metrics.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkout_wait_ms"]["count"] == 2
+    assert snapshot["max_in_use"] == 1
+
+
+def test_metrics_survive_engine_dispose(engine):
+    metrics = instrument_engine(engine, "primary")
+    engine.dispose()
+    with connect(engine):
+        assert metrics.snapshot()["in_use"] == 1
+    assert metrics.snapshot()["checkouts"] == 1
+
+
+def test_metrics_endpoint_reports_the_app_pool(client):
+    response = client.get("/api/${{values.app_name}}/v1/metrics")
+    assert "primary" in response.json["db_pool"]
@@ -0,0 +1,91 @@
+import datetime
+import app as app_module
+from app import RollupDirtyHour, RollupWatermark, WeatherCurrent, db
+
+URL = "/api/${{values.app_name}}/v1/weather/ingest"
+UTC = datetime.timezone.utc
+
+
+def reading(time, **fields):
+    return {"collection_time": time, "temperature": 20, "humidity": 50, "wind_speed": 2.5, **fields}
+
+
+def stored_times():
+    return [
+        row.collection_time.replace(tzinfo=UTC).isoformat()
+        for row in WeatherCurrent.query.order_by(WeatherCurrent.collection_time)
+    ]
+
+
+def test_ingest_inserts_readings(client):
+    response = client.post(URL, json=[reading("2024-01-01T10:00:00+00:00"), reading("2024-01-01T10:01:00Z")])
+    assert response.status_code == 200
+    assert response.json == {"received": 2, "inserted": 2, "duplicates": []}
+    assert stored_times() == ["2024-01-01T10:00:00+00:00", "2024-01-01T10:01:00+00:00"]
+
+
+def test_ingest_rejects_a_body_that_is_not_an_array(client):
+    assert client.post(URL, json={"collection_time": "2024-01-01T10:00:00"}).status_code == 400
+    assert client.post(URL, json=[]).status_code == 400
+
+
+def test_ingest_rejects_the_whole_batch_on_invalid_readings(client):
+    response = client.post(URL, json=[
+        reading("2024-01-01T10:00:00"),
+        reading("yesterday"),
+        reading("2024-01-01T10:02:00", temperature="warm"),
+        reading("2024-01-01T10:03:00", pressure=1013),
+        "not a reading",
+    ])
+    assert response.status_code == 400
+    assert [detail["index"] for detail in response.json["details"]] == [1, 2, 3, 4]
+    assert "must be an integer" in response.json["details"][1]["error"]
+    assert "unknown fields: pressure" in response.json["details"][2]["error"]
+    assert stored_times() == []
+
+
+def test_ingest_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr(app_module, "INGEST_MAX_BATCH", 2)
+    response = client.post(URL, json=[reading(f"2024-01-01T10:0{i}:00") for i in range(3)])
+    assert response.status_code == 413
+    assert stored_times() == []
+
+
+def test_ingest_reports_duplicates_within_the_batch(client):
+    response = client.post(URL, json=[
+        reading("2024-01-01T10:00:00Z"),
+        reading("2024-01-01T10:01:00Z"),
+        reading("2024-01-01T10:00:00Z", temperature=99),
+    ])
+    assert response.json == {"received": 3, "inserted": 2, "duplicates": ["2024-01-01T10:00:00+00:00"]}
+
+
+def test_ingest_reports_existing_readings_as_duplicates(client):
+    client.post(URL, json=[reading("2024-01-01T10:00:00Z")])
+    response = client.post(URL, json=[reading("2024-01-01T10:00:00Z", temperature=99), reading("2024-01-01T10:05:00Z")])
+    assert response.json == {"received": 2, "inserted": 1, "duplicates": ["2024-01-01T10:00:00+00:00"]}
+    assert WeatherCurrent.query.filter_by(temperature=99).count() == 0
+
+
+def dirty_hours():
+    return [row.bucket_start for row in RollupDirtyHour.query.order_by(RollupDirtyHour.bucket_start)]
+
+
+def test_ingest_marks_the_hours_of_new_readings_dirty(client):
+    client.post(URL, json=[reading("2024-01-01T12:30:00Z")])
+    client.post(URL, json=[
+        reading("2024-01-01T12:30:00Z"),
+        reading("2024-01-01T11:00:00Z"),
+        reading("2024-01-01T11:45:00Z"),
+    ])
+    assert dirty_hours() == [datetime.datetime(2024, 1, 1, 11), datetime.datetime(2024, 1, 1, 12)]
+
+
+def test_ingest_leaves_the_rollup_watermark_alone(client):
+    watermark = datetime.datetime(2024, 1, 1, 12, 0)
+    with db.engine.begin() as connection:
+        connection.execute(RollupWatermark.__table__.insert().values(
+            name=app_module.ROLLUP_WATERMARK, watermark=watermark
+        ))
+    client.post(URL, json=[reading("2024-01-01T11:00:00Z"), reading("2024-01-01T13:00:00Z")])
+    assert db.session.get(RollupWatermark, app_module.ROLLUP_WATERMARK).watermark == watermark
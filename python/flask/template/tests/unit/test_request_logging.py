@@ -0,0 +1,90 @@
+import logging
+import queue
+import pytest
+from flask import Flask, Response
+from werkzeug.test import Client
+import app as app_module
+from framework import request_logging
+from framework.request_logging import DroppingQueueHandler, RequestLoggingMiddleware
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.msg)
+
+
+@pytest.fixture
+def records():
+    handler = ListHandler()
+    logger = logging.Logger("request-logging-test")
+    logger.addHandler(handler)
+    logger.messages = handler.messages
+    return logger
+
+
+def streaming_app():
+    flask_app = Flask("streaming")
+
+    @flask_app.route("/api/test/v1/stream")
+    def stream():
+        return Response((f"{i}\n" for i in range(3)), mimetype="text/plain")
+
+    return flask_app
+
+
+def test_one_record_once_the_streamed_body_is_consumed(records):
+    client = Client(RequestLoggingMiddleware(streaming_app().wsgi_app, records, app_name="test"))
+    response = client.get("/api/test/v1/stream", buffered=False)
+    assert records.messages == []
+
+    assert response.get_data() == b"0\n1\n2\n"
+    response.close()
+
+    assert len(records.messages) == 1
+    record = records.messages[0]
+    assert record["status"] == 200
+    assert record["endpoint"] == "stream"
+    assert record["app_name"] == "test"
+    assert len(record["transaction_id"]) == 32
+
+
+def test_transaction_id_matches_the_error_response(client, records, monkeypatch):
+    def fail():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(app_module.app.wsgi_app, "logger", records)
+    monkeypatch.setitem(app_module.app.view_functions, "health", fail)
+    response = client.get("/api/${{values.app_name}}/v1/health")
+    body = response.get_json()
+
+    assert response.status_code == 500
+    assert len(records.messages) == 1
+    assert records.messages[0]["status"] == 500
+    assert records.messages[0]["transaction_id"] == body["transaction_id"]
+
+
+def test_full_queue_drops_and_counts_records():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.Logger("dropping-test")
+    logger.addHandler(handler)
+    for i in range(3):
+        logger.info({"event": i})
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().msg == {"event": 0}
+
+
+def test_setup_logging_registers_the_fork_hook_once(monkeypatch):
+    original = request_logging._target
+    hooks = []
+    monkeypatch.setattr(request_logging.os, "register_at_fork", lambda **kwargs: hooks.append(kwargs))
+    monkeypatch.setattr(request_logging, "_fork_hook_registered", False)
+    try:
+        request_logging.setup_logging(ListHandler())
+        request_logging.setup_logging(ListHandler())
+    finally:
+        request_logging.setup_logging(original)
+    assert len(hooks) == 1
@@ -0,0 +1,141 @@
+import datetime
+import pytest
+from sqlalchemy.dialects import postgresql
+import app as app_module
+from app import (
+    RollupDirtyHour, RollupWatermark, WeatherCurrent, WeatherRollup, db, dirty_ranges, insert_readings,
+    parse_reading, rollup_statement, run_rollup
+)
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2024, 1, 2, 12, 0, tzinfo=UTC)
+
+
+def add_readings(*readings):
+    with db.engine.begin() as connection:
+        connection.execute(WeatherCurrent.__table__.insert(), [
+            {"collection_time": time, "temperature": temperature, "humidity": 50, "wind_speed": 2}
+            for time, temperature in readings
+        ])
+
+
+def rollups(bucket):
+    return {
+        row.bucket_start.replace(tzinfo=UTC): (row.samples, float(row.temperature_avg))
+        for row in WeatherRollup.query.filter_by(bucket=bucket)
+    }
+
+
+def ingest(*readings):
+    rows = [parse_reading({"collection_time": time, "temperature": temperature}) for time, temperature in readings]
+    with db.engine.begin() as connection:
+        insert_readings(connection, rows)
+
+
+def watermark():
+    return db.session.get(RollupWatermark, app_module.ROLLUP_WATERMARK).watermark.replace(tzinfo=UTC)
+
+
+def test_rollup_statement_recomputes_from_the_watermark_bucket():
+    low = datetime.datetime(2024, 1, 1, 10, 30, tzinfo=UTC)
+    high = datetime.datetime(2024, 1, 1, 12, 0, tzinfo=UTC)
+    sql = str(rollup_statement("1h", "hour", low, high).compile(dialect=postgresql.dialect()))
+    assert "date_trunc('hour', weather_current.collection_time)" in sql
+    assert "weather_current.collection_time >= date_trunc(" in sql
+    assert "GROUP BY date_trunc('hour', weather_current.collection_time)" in sql
+    assert "ON CONFLICT (bucket, bucket_start) DO UPDATE" in sql
+
+
+def test_rollup_statement_without_watermark_reads_everything():
+    sql = str(rollup_statement("1d", "day", None, NOW).compile(dialect=postgresql.dialect()))
+    assert "collection_time >=" not in sql
+
+
+def test_run_rollup_aggregates_hours_and_days(database):
+    add_readings(
+        (datetime.datetime(2024, 1, 1, 10, 5, tzinfo=UTC), 10),
+        (datetime.datetime(2024, 1, 1, 10, 55, tzinfo=UTC), 20),
+        (datetime.datetime(2024, 1, 1, 11, 15, tzinfo=UTC), 30),
+    )
+    assert run_rollup(now=NOW) == 3
+    assert rollups("1h") == {
+        datetime.datetime(2024, 1, 1, 10, tzinfo=UTC): (2, 15.0),
+        datetime.datetime(2024, 1, 1, 11, tzinfo=UTC): (1, 30.0),
+    }
+    assert rollups("1d") == {datetime.datetime(2024, 1, 1, tzinfo=UTC): (3, 20.0)}
+    # Everything is older than the lag: the watermark is the newest row
+    assert watermark() == datetime.datetime(2024, 1, 1, 11, 15, tzinfo=UTC)
+    assert app_module.rollup_snapshot()["watermark"] == "2024-01-01T11:15:00+00:00"
+
+
+def test_run_rollup_without_new_rows_keeps_the_watermark(database):
+    add_readings((datetime.datetime(2024, 1, 1, 10, 5, tzinfo=UTC), 10))
+    run_rollup(now=NOW)
+    assert run_rollup(now=NOW) == 0
+    assert watermark() == datetime.datetime(2024, 1, 1, 10, 5, tzinfo=UTC)
+
+
+def test_watermark_lags_behind_now_so_late_rows_are_aggregated(database, monkeypatch):
+    monkeypatch.setattr(app_module, "ROLLUP_LAG_SECONDS", 300)
+    add_readings(
+        (NOW - datetime.timedelta(minutes=20), 10),
+        (NOW - datetime.timedelta(minutes=1), 20),
+    )
+    run_rollup(now=NOW)
+    assert watermark() == NOW - datetime.timedelta(minutes=5)
+
+    # Committed after the run, with a collection_time before the newest row
+    add_readings((NOW - datetime.timedelta(minutes=3), 60))
+    run_rollup(now=NOW + datetime.timedelta(minutes=1))
+    assert rollups("1h")[datetime.datetime(2024, 1, 2, 11, tzinfo=UTC)] == (3, 30.0)
+    assert watermark() == NOW - datetime.timedelta(minutes=4)
+
+
+def test_run_rollup_skips_when_another_process_holds_the_lock(database, monkeypatch):
+    add_readings((datetime.datetime(2024, 1, 1, 10, 5, tzinfo=UTC), 10))
+    monkeypatch.setattr(db.func, "pg_try_advisory_xact_lock", lambda key: db.false(), raising=False)
+    skipped = app_module.rollup_snapshot()["skipped_locked"]
+    assert run_rollup(now=NOW) is None
+    assert app_module.rollup_snapshot()["skipped_locked"] == skipped + 1
+    assert rollups("1h") == {}
+
+
+def test_dirty_ranges_merge_adjacent_buckets_and_skip_covered_ones():
+    hours = [datetime.datetime(2024, 1, 1, h) for h in (9, 10, 12)] + [datetime.datetime(2024, 1, 3, 5)]
+    hour = datetime.timedelta(hours=1)
+    assert dirty_ranges(hours, "hour") == [
+        [hours[0], hours[1] + hour],
+        [hours[2], hours[2] + hour],
+        [hours[3], hours[3] + hour],
+    ]
+    assert dirty_ranges(hours, "day") == [
+        [datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2)],
+        [datetime.datetime(2024, 1, 3), datetime.datetime(2024, 1, 4)],
+    ]
+    assert dirty_ranges(hours, "hour", covered_from=hours[2]) == [[hours[0], hours[1] + hour]]
+
+
+def test_late_ingested_readings_recompute_only_their_buckets(database):
+    ingest(("2024-01-01T10:05:00Z", 10), ("2024-01-01T11:15:00Z", 30), ("2024-01-01T12:15:00Z", 50))
+    run_rollup(now=NOW)
+    assert RollupDirtyHour.query.count() == 0
+
+    # Far behind the watermark (12:15): the watermark stays put and only hour 10 and
+    # day 2024-01-01 are recomputed
+    ingest(("2024-01-01T10:55:00Z", 20))
+    assert run_rollup(now=NOW) == 2
+    assert watermark() == datetime.datetime(2024, 1, 1, 12, 15, tzinfo=UTC)
+    assert rollups("1h")[datetime.datetime(2024, 1, 1, 10, tzinfo=UTC)] == (2, 15.0)
+    assert rollups("1d") == {datetime.datetime(2024, 1, 1, tzinfo=UTC): (4, 27.5)}
+    assert RollupDirtyHour.query.count() == 0
+    assert run_rollup(now=NOW) == 0
+
+
+def test_dirty_hours_after_the_watermark_are_not_recomputed_twice(database):
+    ingest(("2024-01-01T10:05:00Z", 10))
+    run_rollup(now=NOW)
+    ingest(("2024-01-01T11:05:00Z", 20))
+    # The watermark statement recomputes hour 10, hour 11 and the day; nothing is left
+    assert run_rollup(now=NOW) == 3
+    assert rollups("1h")[datetime.datetime(2024, 1, 1, 11, tzinfo=UTC)] == (1, 20.0)
+    assert RollupDirtyHour.query.count() == 0
@@ -0,0 +1,58 @@
+import pytest
+import requests
+import app as app_module
+from framework.outbound import CircuitBreaker, OutboundPolicy
+
+URL = "/api/${{values.app_name}}/v1/sample"
+
+
+class FakeResponse:
+    text = '{"value": "Chuck Norris can divide by zero."}'
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def joke_policy(monkeypatch):
+    policy = OutboundPolicy("joke_api_test", breaker=CircuitBreaker(min_calls=2, open_seconds=60), hedge=False)
+    monkeypatch.setattr(app_module, "joke_policy", policy)
+    monkeypatch.setattr(app_module, "last_joke", None)
+    return policy
+
+
+def fail(*args, **kwargs):
+    raise requests.ConnectionError("connection refused")
+
+
+def test_sample_returns_joke_and_weather(client, joke_policy, monkeypatch):
+    monkeypatch.setattr(app_module.requests, "get", lambda *args, **kwargs: FakeResponse())
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.json == {"api_data": FakeResponse.text, "weather": []}
+
+
+def test_upstream_failure_without_fallback_is_502(client, joke_policy, monkeypatch):
+    monkeypatch.setattr(app_module.requests, "get", fail)
+    response = client.get(URL)
+    assert response.status_code == 502
+    assert "connection refused" in response.json["error"]
+
+
+def test_upstream_failure_serves_the_last_joke(client, joke_policy, monkeypatch):
+    monkeypatch.setattr(app_module.requests, "get", lambda *args, **kwargs: FakeResponse())
+    client.get(URL)
+    monkeypatch.setattr(app_module.requests, "get", fail)
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.headers["X-Upstream-Fallback"] == "joke_api_test"
+    assert response.json["api_data"] == FakeResponse.text
+
+
+def test_open_circuit_without_fallback_is_503(client, joke_policy, monkeypatch):
+    monkeypatch.setattr(app_module.requests, "get", fail)
+    client.get(URL)
+    client.get(URL)
+    response = client.get(URL)
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
@@ -0,0 +1,76 @@
+import datetime
+import json
+import pytest
+from app import WeatherCurrent, db, parse_time
+
+URL = "/api/${{values.app_name}}/v1/weather"
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture
+def readings(database):
+    with db.engine.begin() as connection:
+        connection.execute(WeatherCurrent.__table__.insert(), [
+            {"collection_time": datetime.datetime(2024, 1, 1, hour, tzinfo=UTC), "temperature": hour,
+             "humidity": 50, "wind_speed": 2.5, "description": "clear"}
+            for hour in (12, 10, 11)
+        ])
+
+
+def instant(value):
+    # SQLite hands times back without their zone
+    return parse_time(value, "collection_time")
+
+
+def ndjson(response):
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_weather_streams_all_rows_oldest_first(client, readings):
+    rows = ndjson(client.get(URL))
+    assert [row["temperature"] for row in rows] == [10, 11, 12]
+    assert instant(rows[0].pop("collection_time")) == datetime.datetime(2024, 1, 1, 10, tzinfo=UTC)
+    assert rows[0] == {
+        "temperature": 10,
+        "temperature_min": None,
+        "temperature_max": None,
+        "humidity": 50,
+        "description": "clear",
+        "feels_like": None,
+        "wind_speed": 2.5,
+        "wind_direction": None,
+    }
+
+
+def test_weather_range_includes_from_and_excludes_to(client, readings):
+    rows = ndjson(client.get(URL, query_string={"from": "2024-01-01T11:00:00Z", "to": "2024-01-01T12:00:00Z"}))
+    assert [row["temperature"] for row in rows] == [11]
+    rows = ndjson(client.get(URL, query_string={"from": "2024-01-01T11:00:00"}))
+    assert [row["temperature"] for row in rows] == [11, 12]
+
+
+def test_weather_selects_fields(client, readings):
+    rows = ndjson(client.get(URL, query_string={"fields": "temperature,collection_time", "to": "2024-01-01T11:00:00"}))
+    assert list(rows[0]) == ["temperature", "collection_time"]
+    assert [(row["temperature"], instant(row["collection_time"])) for row in rows] == [
+        (10, datetime.datetime(2024, 1, 1, 10, tzinfo=UTC))
+    ]
+
+
+def test_weather_without_rows_is_empty(client, database):
+    assert ndjson(client.get(URL)) == []
+
+
+@pytest.mark.parametrize("query, error", [
+    ({"from": "yesterday"}, "'from' must be an ISO 8601 timestamp"),
+    ({"to": "2024-13-01"}, "'to' must be an ISO 8601 timestamp"),
+    ({"fields": "temperature,pressure"}, "Unknown fields: pressure"),
+    ({"from": "2024-01-01T12:00:00", "to": "2024-01-01T11:00:00"}, "'from' must be earlier than 'to'"),
+    ({"from": "2024-01-01T12:00:00", "to": "2024-01-01T12:00:00+00:00"}, "'from' must be earlier than 'to'"),
+])
+def test_weather_rejects_invalid_queries(client, database, query, error):
+    response = client.get(URL, query_string=query)
+    assert response.status_code == 400
+    assert error in response.json["error"]